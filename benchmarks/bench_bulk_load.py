@@ -0,0 +1,58 @@
+"""
+Compares serial and parallel loading of every table of the data folder.
+
+Usage (from the project root):
+    python -m benchmarks.bench_bulk_load --scales 1 10 100 --workers 4
+
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.scaled_data import write_scaled_copy
+from src.parsers.bulk_load import load_tables
+from src.parsers.parse_columns import parse_columns
+
+
+def load_serial(data_dir, names):
+    return {name: parse_columns(os.path.join(data_dir, f"{name}.csv"))
+            for name in names}
+
+
+def best_time(func, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data-dir', default=os.path.join('.', 'data'))
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'Scale':>6}  {'Size (MB)':>10}  {'Serial (s)':>11}  "
+          f"{'Parallel (s)':>13}  {'Speedup':>8}")
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as data_dir:
+            write_scaled_copy(args.data_dir, data_dir, scale)
+            names = sorted(filename[:-4] for filename in os.listdir(data_dir))
+            size = sum(os.path.getsize(os.path.join(data_dir, f"{name}.csv"))
+                       for name in names) / 1e6
+            repeats = args.repeats if scale < 100 else 1
+
+            serial = best_time(lambda: load_serial(data_dir, names), repeats)
+            parallel = best_time(lambda: load_tables(names, data_dir,
+                                                     workers=args.workers), repeats)
+            print(f"{scale:>6}  {size:>10.1f}  {serial:>11.3f}  "
+                  f"{parallel:>13.3f}  {serial / parallel:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
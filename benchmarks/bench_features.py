@@ -0,0 +1,181 @@
+"""
+Compares the feature engineering of the baseline clustering (one groupby per
+feature, Python lambdas per driver and outer merges), copied unchanged, with the
+single-pass one of the feature store, on synthetic data at several scales.
+
+Usage (from the project root):
+    python -m benchmarks.bench_features --scales 1 5 --repeats 5
+
+Both are timed on tables already loaded (read with pd.read_csv for the baseline,
+as it did, and from the data store for the single pass), without reading or
+writing the feature store. Their results are checked to hold the same values
+first; only the type of driverId differs (int64 against int32).
+
+"""
+import argparse
+import os
+import tempfile
+from functools import reduce
+
+import pandas as pd
+
+from benchmarks.bench_bulk_load import best_time
+from benchmarks.synthetic_data import generate
+from src.learning.feature_store import FEATURE_GROUPS, assemble
+from src.parsers.data_store import store
+
+BASELINE_TABLES = ['drivers', 'results', 'status', 'lap_times', 'pit_stops',
+                   'qualifying']
+
+
+def baseline_driver_features(drivers, results, status, lap_times, pit_stops,
+                             qualifying):
+    """
+    Feature engineering of cluster_driving_styles before the feature store,
+    copied unchanged as the reference of this benchmark. The tables are those
+    it read with pd.read_csv, and results, pit_stops and qualifying are modified.
+
+    """
+    # Cleaning types
+    results['positionOrder'] = pd.to_numeric(results['positionOrder'], errors='coerce')
+    results['grid'] = pd.to_numeric(results['grid'], errors='coerce')
+    results['statusId'] = pd.to_numeric(results['statusId'], errors='coerce')
+
+    # New variables
+    win_rate = (
+        results.groupby('driverId')['positionOrder'].apply(lambda x: (x == 1).mean())
+                                                    .reset_index(name='win_rate')
+    )
+    podium_rate = (
+        results.groupby('driverId')['positionOrder'].apply(lambda x: (x <= 3).mean())
+                                                    .reset_index(name='podium_rate')
+    )
+
+    finished_ids = (
+        status[status['status'].str.contains(r'Finished|\+')]['statusId'].astype(int)
+    )
+
+    results['finished'] = results['statusId'].isin(finished_ids)
+    finish_rate = (
+        results.groupby('driverId')['finished'].mean().reset_index(name='finish_rate')
+    )
+
+    results['position_gain'] = results['grid'] - results['positionOrder']
+    avg_position_gain = (
+        results.groupby('driverId')['position_gain'].mean()
+                                                    .reset_index(
+                                                        name='avg_position_gain')
+    )
+
+    lap_stats = (
+        lap_times.groupby('driverId')['milliseconds'].agg(avg_lap_time='mean',
+                                                          std_lap_time='std')
+                                                     .reset_index()
+    )
+
+    for q in ['q1', 'q2', 'q3']:
+        qualifying[q] = pd.to_numeric(qualifying[q], errors='coerce')
+    qualifying['mean_qualifying_position'] = qualifying[['q1', 'q2', 'q3']].mean(axis=1)
+    mean_qual = (
+        qualifying.groupby('driverId')['mean_qualifying_position'].mean().reset_index()
+    )
+
+    pit_stops['pit_time'] = pit_stops['milliseconds']
+    pit_agg = (
+        pit_stops.groupby('driverId')['pit_time'].agg(avg_pit_stop_time='mean',
+                                                      avg_pit_stop_count='count')
+                                                 .reset_index()
+    )
+
+    dfs = [avg_position_gain, win_rate, podium_rate,
+           finish_rate, lap_stats, mean_qual, pit_agg]
+    df_pilotes = reduce(lambda left, right: pd.merge(left, right,
+                                                     on='driverId', how='outer'), dfs)
+    df_pilotes = df_pilotes.merge(drivers[['driverId', 'forename', 'surname']],
+                                  on='driverId', how='left')
+    df_pilotes['name'] = df_pilotes['forename'] + ' ' + df_pilotes['surname']
+
+    mean_race_pos = (
+        results.groupby('driverId')['positionOrder'].mean()
+                                                    .reset_index(
+                                                        name='mean_race_position')
+    )
+
+    qualif_vs_race = mean_race_pos.merge(mean_qual, on='driverId')
+    qualif_vs_race['qualif_vs_race_delta'] = (
+        qualif_vs_race['mean_qualifying_position'] -
+        qualif_vs_race['mean_race_position']
+    )
+
+    position_std = (
+        results.groupby('driverId')['positionOrder'].std()
+                                                    .reset_index(name='position_std')
+    )
+
+    results['is_podium'] = results['positionOrder'] <= 3
+    results['is_finished'] = results['statusId'].isin(finished_ids)
+    filtered = results[results['is_finished']]
+    podium_when_finished = (
+        filtered.groupby('driverId')['is_podium'].mean()
+                                                 .reset_index(
+                                                     name='podium_when_finished_rate')
+    )
+
+    vars_to_merge = [qualif_vs_race[['driverId', 'qualif_vs_race_delta']],
+                     position_std, podium_when_finished]
+    for df in vars_to_merge:
+        df_pilotes = df_pilotes.merge(df, on='driverId', how='left')
+
+    return df_pilotes.fillna(0)
+
+
+def read_tables(data_dir):
+    """
+    Reads the tables of the baseline feature engineering as it did.
+
+    """
+    return {name: pd.read_csv(os.path.join(data_dir, f"{name}.csv"))
+            for name in BASELINE_TABLES}
+
+
+def baseline(tables):
+    copied = ('results', 'pit_stops', 'qualifying')
+    return baseline_driver_features(**{name: df.copy() if name in copied else df
+                                       for name, df in tables.items()})
+
+
+def single_pass():
+    return assemble({name: group['build']() for name, group in FEATURE_GROUPS.items()})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data-dir', default=os.path.join('.', 'data'))
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 5])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'Scale':>6}  {'Results':>9}  {'Baseline (s)':>13}  "
+          f"{'Single pass (s)':>16}  {'Speedup':>8}")
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as data_dir:
+            generate(data_dir, scale, args.seed, args.data_dir)
+            store.data_dir = data_dir
+            store.invalidate()
+            try:
+                tables = read_tables(data_dir)
+                pd.testing.assert_frame_equal(baseline(tables), single_pass(),
+                                              check_dtype=False)
+                rows = len(tables['results'])
+                before = best_time(lambda: baseline(tables), args.repeats)
+                after = best_time(single_pass, args.repeats)
+            finally:
+                store.data_dir = args.data_dir
+                store.invalidate()
+            print(f"{scale:>6}  {rows:>9}  {before:>13.3f}  "
+                  f"{after:>16.3f}  {before / after:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+"""
+Times every question, vanilla and pandas, and the clustering at several data scales,
+and measures the memory they use.
+
+Usage (from the project root):
+    python -m benchmarks.bench_questions --scales 1 10 100 --output bench.json
+    python -m benchmarks.bench_questions --baseline bench.json --max-regression 20
+
+The data is replayed `scale` times as later seasons (see
+scaled_data.write_scaled_history) in a temporary folder, or with --synthetic,
+generated for `scale` times as many seasons (see synthetic_data.generate).
+Tables the clustering needs but the data folder lacks (lap_times.csv is not
+always downloaded) are generated synthetically at the same scale.
+Results are written as JSON; with --baseline, the compute medians are compared
+with a previous run and the command fails if a question got slower than
+allowed, or fails or is missing where it was timed before.
+
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+
+import matplotlib
+
+from benchmarks.scaled_data import write_scaled_history
+from benchmarks.synthetic_data import generate
+
+
+def targets():
+    """
+    Returns the functions to time, as (name, function, arguments, setup), where
+    setup is called before every timed call (see compare.benchmark).
+
+    """
+    from src.analysis.questions import QUESTIONS, default_arguments
+    from src.learning import feature_store
+    from src.learning.clustering import cluster_driving_styles
+
+    functions = []
+    for entry in QUESTIONS:
+        arguments = default_arguments(entry)
+        functions.append((f"pandas.{entry['key']}", entry['pandas'], arguments,
+                          None))
+        if entry['vanilla'] is not None:
+            functions.append((f"homemade.{entry['key']}", entry['vanilla'],
+                              arguments, None))
+    # the saved features are forgotten so that their computation is timed
+    functions.append(('learning.clustering', cluster_driving_styles, [],
+                      feature_store.clear))
+    return functions
+
+
+def missing_tables(data_dir):
+    """
+    Returns the tables read by the clustering that data_dir has no CSV file
+    for.
+
+    """
+    from src.learning.feature_store import FEATURE_GROUPS
+
+    tables = sorted({table for group in FEATURE_GROUPS.values()
+                     for table in group['tables']})
+    return [table for table in tables
+            if not os.path.exists(os.path.join(data_dir, f"{table}.csv"))]
+
+
+def run_scale(src_dir, scale, repeats, warmup, seed=None):
+    """
+    Benchmarks every target on the data of src_dir replayed `scale` times, or
+    on synthetic data generated with this seed if it is not None.
+
+    Returns
+    -------
+    dict : target name -> {'load': summary, 'compute': summary, 'memory':
+        profile} (see compare.benchmark), or {'error': message} if the target
+        failed
+
+    """
+    from src.analysis.compare import benchmark
+    from src.analysis.result_cache import cache
+    from src.parsers.data_store import store
+
+    results = dict()
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as root:
+        data_dir = os.path.join(root, 'data')
+        if seed is None:
+            write_scaled_history(src_dir, data_dir, scale)
+            missing = missing_tables(data_dir)
+            if missing:
+                print(f"No {', '.join(missing)} in {src_dir}: generating "
+                      "synthetic ones for the clustering", file=sys.stderr)
+                generate(os.path.join(root, 'synthetic'), scale, 0, src_dir,
+                         tables=missing)
+                for table in missing:
+                    shutil.move(os.path.join(root, 'synthetic', f"{table}.csv"),
+                                data_dir)
+        else:
+            generate(data_dir, scale, seed, src_dir)
+        os.chdir(root)
+        try:
+            store.invalidate()
+            cache.clear()
+            for name, func, arguments, setup in targets():
+                try:
+                    report = benchmark(func, arguments, repeats, warmup,
+                                       setup=setup)
+                except Exception as e:
+                    results[name] = {'error': f"{type(e).__name__}: {e}"}
+                else:
+                    results[name] = {'load': report['load'],
+                                     'compute': report['compute'],
+                                     'memory': report['memory']}
+                print(f"{scale:>4}x  {name:<32} "
+                      + (f"{results[name]['compute']['median'] * 1000:>10.2f} ms "
+                         f"{results[name]['memory']['total']['peak'] / 2 ** 20:>9.2f}"
+                         " MiB peak"
+                         if 'error' not in results[name] else results[name]['error']),
+                      file=sys.stderr)
+        finally:
+            store.invalidate()
+            cache.clear()
+            os.chdir(cwd)
+    return results
+
+
+def find_regressions(current, baseline, max_regression=20.0, min_delta=0.001):
+    """
+    Compares the median compute times of two runs.
+
+    A target regresses when its median is more than max_regression percent
+    and more than min_delta seconds above the baseline (the absolute margin
+    ignores the noise of very fast questions), and when it was timed in the
+    baseline but failed or is missing in the current run. Targets that were
+    not timed in the baseline are ignored, as are the scales of the baseline
+    that were not run.
+
+    Returns
+    -------
+    list[dict] : 'scale', 'name', 'baseline', 'current' (seconds) and
+        'change' (percent) of every regression; for a target that failed or
+        is missing, 'current' and 'change' are None and 'error' says why
+
+    """
+    regressions = []
+    for scale, results in current['results'].items():
+        previous_results = baseline['results'].get(scale, dict())
+        for name in dict.fromkeys([*results, *previous_results]):
+            result = results.get(name, {'error': "missing from the run"})
+            previous = previous_results.get(name, dict())
+            if 'compute' not in previous:
+                continue
+            old = previous['compute']['median']
+            if 'compute' not in result:
+                regressions.append({'scale': scale, 'name': name, 'baseline': old,
+                                    'current': None, 'change': None,
+                                    'error': result.get('error', "not timed")})
+                continue
+            new = result['compute']['median']
+            if new > old * (1 + max_regression / 100) and new - old > min_delta:
+                regressions.append({'scale': scale, 'name': name, 'baseline': old,
+                                    'current': new,
+                                    'change': 100 * (new - old) / old})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data-dir', default=os.path.join('.', 'data'))
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--synthetic', action='store_true',
+                        help="time synthetic data instead of the replayed history")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="seed of the synthetic data (default: 0)")
+    parser.add_argument('--output', help="JSON file to write the results to")
+    parser.add_argument('--baseline', help="JSON results of a previous run")
+    parser.add_argument('--max-regression', type=float, default=20.0,
+                        help="allowed slowdown in percent (default: 20)")
+    args = parser.parse_args(argv)
+
+    matplotlib.use('Agg')
+    data_dir = os.path.abspath(args.data_dir)
+
+    run = {
+        'meta': {'date': datetime.datetime.now().isoformat(timespec='seconds'),
+                 'python': platform.python_version(),
+                 'platform': platform.platform(),
+                 'repeats': args.repeats, 'warmup': args.warmup,
+                 'data': (f"synthetic (seed {args.seed})" if args.synthetic
+                          else 'replayed'),
+                 'synthetic_tables': ([] if args.synthetic
+                                      else missing_tables(data_dir))},
+        'results': dict(),
+    }
+    for scale in args.scales:
+        # the largest scales are only timed once
+        repeats = args.repeats if scale < 100 else 1
+        warmup = args.warmup if scale < 100 else 0
+        run['results'][f"{scale}x"] = run_scale(data_dir, scale, repeats, warmup,
+                                                args.seed if args.synthetic else None)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(run, f, indent=2)
+    else:
+        json.dump(run, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(run, baseline, args.max_regression)
+        for regression in regressions:
+            if regression['current'] is None:
+                change = regression['error']
+            else:
+                change = (f"{regression['current'] * 1000:.2f} ms "
+                          f"(+{regression['change']:.0f}%)")
+            print(f"REGRESSION {regression['scale']} {regression['name']}: "
+                  f"{regression['baseline'] * 1000:.2f} ms -> {change}",
+                  file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,122 @@
+import csv
+import os
+import shutil
+
+from src.parsers.parse_columns import NULL
+
+
+def write_scaled_copy(src_dir, dst_dir, factor):
+    """
+    Copies the CSV files of src_dir into dst_dir, repeating the data lines of each
+    file `factor` times.
+
+    The copies keep the size and shape of a larger history but not its meaning
+    (identifiers are repeated): they are meant for parsing benchmarks only.
+
+    """
+    os.makedirs(dst_dir, exist_ok=True)
+    for filename in sorted(os.listdir(src_dir)):
+        if not filename.endswith('.csv'):
+            continue
+        src = os.path.join(src_dir, filename)
+        dst = os.path.join(dst_dir, filename)
+        if factor == 1:
+            shutil.copyfile(src, dst)
+            continue
+        with open(src, 'rb') as f:
+            header = f.readline()
+            body = f.read()
+        if body and not body.endswith(b'\n'):
+            body += b'\n'
+        with open(dst, 'wb') as f:
+            f.write(header)
+            for _ in range(factor):
+                f.write(body)
+
+
+# Columns shifted in every replay of the history by write_scaled_history:
+# references to races and seasons, and the primary keys of the fact tables.
+RACE_COLUMNS = ('raceId',)
+SEASON_COLUMNS = ('year',)
+KEY_COLUMNS = ('resultId', 'constructorResultsId', 'constructorStandingsId',
+               'driverStandingsId', 'qualifyId')
+
+
+def _split_raw(line):
+    """
+    Splits a CSV line on the commas outside of quotes, keeping every field as
+    written (quotes included) so that it can be joined back unchanged.
+
+    """
+    fields = []
+    start = 0
+    quoted = False
+    for i, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif char == ',' and not quoted:
+            fields.append(line[start:i])
+            start = i + 1
+    fields.append(line[start:])
+    return fields
+
+
+def _column_max(filepath, column):
+    with open(filepath, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        return max((int(row[column]) for row in reader if row[column] != NULL),
+                   default=0)
+
+
+def write_scaled_history(src_dir, dst_dir, factor):
+    """
+    Copies the CSV files of src_dir into dst_dir, replaying the whole history
+    `factor` times as later seasons.
+
+    Every replay shifts the raceIds by the largest raceId, the years by the
+    number of seasons and the primary keys of the fact tables (results,
+    standings, ...) by their largest value, while drivers, constructors,
+    circuits and statuses are kept. Unlike write_scaled_copy, the copies are
+    valid data that every question can be asked on. Files are written one
+    line at a time.
+
+    """
+    os.makedirs(dst_dir, exist_ok=True)
+    races = os.path.join(src_dir, 'races.csv')
+    race_step = _column_max(races, 'raceId')
+    with open(races, newline='', encoding='utf-8') as f:
+        years = [int(row['year']) for row in csv.DictReader(f)]
+    season_step = max(years) - min(years) + 1
+
+    for filename in sorted(os.listdir(src_dir)):
+        if not filename.endswith('.csv'):
+            continue
+        src = os.path.join(src_dir, filename)
+        dst = os.path.join(dst_dir, filename)
+        with open(src, newline='', encoding='utf-8') as f:
+            header = next(csv.reader(f))
+
+        steps = dict()
+        for index, column in enumerate(header):
+            if column in RACE_COLUMNS:
+                steps[index] = race_step
+            elif column in SEASON_COLUMNS:
+                steps[index] = season_step
+            elif column in KEY_COLUMNS:
+                steps[index] = _column_max(src, column)
+        if factor == 1 or not steps:
+            shutil.copyfile(src, dst)
+            continue
+
+        with open(dst, 'w', newline='', encoding='utf-8') as out:
+            for replay in range(factor):
+                with open(src, newline='', encoding='utf-8') as f:
+                    header_line = f.readline()
+                    if replay == 0:
+                        out.write(header_line)
+                    for line in f:
+                        fields = _split_raw(line.rstrip('\r\n'))
+                        for index, step in steps.items():
+                            if fields[index] != NULL:
+                                fields[index] = str(int(fields[index]) + replay * step)
+                        out.write(','.join(fields) + '\n')
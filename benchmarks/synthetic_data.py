@@ -0,0 +1,387 @@
+"""
+Writes a synthetic Ergast dataset of any size, for load tests.
+
+Usage (from the project root):
+    python -m benchmarks.synthetic_data --scale 100 --seed 0 --output /tmp/f1x100
+
+The drivers, constructors, circuits and statuses of the real data are kept;
+races, results, standings, qualifying, pit stops and lap times are generated
+for `scale` times as many seasons as the real history, one race at a time, so
+that memory does not grow with the size of the output.
+
+"""
+import argparse
+import csv
+import os
+import random
+import shutil
+
+from src.analysis.statuses import DNF, classify
+from src.parsers.parse_columns import NULL
+
+
+# Tables copied from the real data, whose ids the generated tables refer to.
+COPIED_TABLES = ('drivers', 'constructors', 'circuits', 'status')
+
+GENERATED_TABLES = ('seasons', 'races', 'results', 'driver_standings',
+                    'constructor_standings', 'qualifying', 'pit_stops', 'lap_times')
+
+HEADERS = {
+    'seasons': ['year', 'url'],
+    'races': ['raceId', 'year', 'round', 'circuitId', 'name', 'date', 'time', 'url',
+              'fp1_date', 'fp1_time', 'fp2_date', 'fp2_time', 'fp3_date', 'fp3_time',
+              'quali_date', 'quali_time', 'sprint_date', 'sprint_time'],
+    'results': ['resultId', 'raceId', 'driverId', 'constructorId', 'number', 'grid',
+                'position', 'positionText', 'positionOrder', 'points', 'laps', 'time',
+                'milliseconds', 'fastestLap', 'rank', 'fastestLapTime',
+                'fastestLapSpeed', 'statusId'],
+    'driver_standings': ['driverStandingsId', 'raceId', 'driverId', 'points',
+                         'position', 'positionText', 'wins'],
+    'constructor_standings': ['constructorStandingsId', 'raceId', 'constructorId',
+                              'points', 'position', 'positionText', 'wins'],
+    'qualifying': ['qualifyId', 'raceId', 'driverId', 'constructorId', 'number',
+                   'position', 'q1', 'q2', 'q3'],
+    'pit_stops': ['raceId', 'driverId', 'stop', 'lap', 'time', 'duration',
+                  'milliseconds'],
+    'lap_times': ['raceId', 'driverId', 'lap', 'position', 'time', 'milliseconds'],
+}
+
+FIRST_YEAR = 1950
+SEASONS = 75
+POINTS = [25, 18, 15, 12, 10, 8, 6, 4, 2, 1]
+
+# Seasons (as a fraction of the history) from which the real data records
+# qualifying sessions, lap times and pit stops.
+QUALIFYING_FROM = (1994 - FIRST_YEAR) / SEASONS
+LAP_TIMES_FROM = (1996 - FIRST_YEAR) / SEASONS
+PIT_STOPS_FROM = (2011 - FIRST_YEAR) / SEASONS
+
+
+def _quote(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _lap_time(milliseconds):
+    minutes, milliseconds = divmod(int(milliseconds), 60000)
+    return f"{minutes}:{milliseconds / 1000:06.3f}"
+
+
+def _race_time(milliseconds):
+    hours, milliseconds = divmod(int(milliseconds), 3600000)
+    return f"{hours}:{_lap_time(milliseconds)}"
+
+
+def _duration(milliseconds):
+    if milliseconds < 60000:
+        return f"{milliseconds / 1000:.3f}"
+    return _lap_time(milliseconds)
+
+
+def _read_ids(filepath, column):
+    with open(filepath, newline='', encoding='utf-8') as f:
+        return [int(row[column]) for row in csv.DictReader(f)]
+
+
+def _dnf_weights(src_dir):
+    """
+    Returns the DNF statuses and their frequencies in the real results.
+
+    """
+    with open(os.path.join(src_dir, 'status.csv'), newline='', encoding='utf-8') as f:
+        dnf_ids = {int(row['statusId']) for row in csv.DictReader(f)
+                   if classify(row['status']) & DNF}
+    counts = dict.fromkeys(sorted(dnf_ids), 0)
+    with open(os.path.join(src_dir, 'results.csv'), newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            status_id = int(row['statusId'])
+            if status_id in counts:
+                counts[status_id] += 1
+    return list(counts), [count + 1 for count in counts.values()]
+
+
+def _lapped_status_ids(src_dir):
+    """
+    Returns the statusId of 'Finished' and a dict laps down -> statusId.
+
+    """
+    finished, lapped = None, dict()
+    with open(os.path.join(src_dir, 'status.csv'), newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if row['status'] == 'Finished':
+                finished = int(row['statusId'])
+            elif row['status'].startswith('+') and 'Lap' in row['status']:
+                lapped[int(row['status'][1:].split()[0])] = int(row['statusId'])
+    return finished, lapped
+
+
+class _Writers:
+    """
+    Opened CSV files of the generated tables, written one line at a time.
+
+    """
+
+    def __init__(self, dst_dir, tables):
+        self.files = {name: open(os.path.join(dst_dir, f"{name}.csv"), 'w',
+                                 encoding='utf-8', newline='')
+                      for name in tables}
+        for name, f in self.files.items():
+            f.write(','.join(HEADERS[name]) + '\n')
+        self.next_ids = dict.fromkeys(('results', 'driver_standings',
+                                       'constructor_standings', 'qualifying'), 1)
+
+    def write(self, name, values):
+        f = self.files.get(name)
+        if f is not None:
+            f.write(','.join(str(value) for value in values) + '\n')
+
+    def next_id(self, name):
+        value = self.next_ids[name]
+        self.next_ids[name] += 1
+        return value
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+
+
+def _season_field(rng, previous, newcomers, queue, driver_ids, constructor_ids):
+    """
+    Draws the entries of a season from those of the previous one.
+
+    Teams keep part of their performance from one season to the next and the
+    drivers keep their seat for several seasons, so that careers (and the
+    number of wins of the best drivers) look like the real ones. At least
+    `newcomers` drivers make their debut, taken from `queue` (refilled with
+    the real drivers in a random order when it is empty), in the seats of
+    the drivers who retire, the weakest and the oldest ones first.
+
+    Returns
+    -------
+    list[dict] : 'driverId', 'constructorId', 'number' and 'pace' of every
+        entry (the higher the pace, the faster)
+
+    """
+    teams = {entry['constructorId']: entry['team'] for entry in previous}
+    while len(teams) < 10:
+        teams.setdefault(rng.choice(constructor_ids), rng.gauss(0, 1))
+    if len(teams) > 10 and rng.random() < 0.2:
+        del teams[rng.choice(list(teams))]
+    elif len(teams) < 13 and rng.random() < 0.2:
+        teams.setdefault(rng.choice(constructor_ids), rng.gauss(0, 1))
+
+    kept = [entry for entry in previous if entry['constructorId'] in teams]
+    retiring = min(len(kept), max(0, len(kept) + newcomers - 2 * len(teams)))
+    # the weakest and the oldest drivers are the most likely to retire
+    kept = sorted(kept, key=lambda entry: (entry['skill'] - 0.12 * entry['seasons']
+                                           + rng.gauss(0, 0.5)))[retiring:]
+    racing = {entry['driverId'] for entry in kept}
+    seats = {constructor_id: [] for constructor_id in teams}
+    for entry in kept:
+        seats[entry['constructorId']].append((entry['driverId'], entry['skill'],
+                                              entry['seasons'] + 1))
+
+    field = []
+    for constructor_id, team in teams.items():
+        team = 0.7 * team + rng.gauss(0, 0.7)
+        while len(seats[constructor_id]) < 2:
+            if not queue:
+                queue.extend(rng.sample(driver_ids, len(driver_ids)))
+            driver_id = queue.pop()
+            if driver_id not in racing:
+                racing.add(driver_id)
+                seats[constructor_id].append((driver_id, rng.gauss(0, 0.8), 1))
+        for driver_id, skill, seasons in seats[constructor_id]:
+            field.append({'driverId': driver_id, 'constructorId': constructor_id,
+                          'number': len(field) + 1, 'team': team, 'skill': skill,
+                          'seasons': seasons, 'pace': team + skill})
+    return field
+
+
+def _write_race(writers, rng, race_id, season_position, field, statuses, standings):
+    """
+    Generates the results, qualifying, pit stops, lap times and standings of
+    one race.
+
+    """
+    lapped_ids, dnf_ids, dnf_weights = statuses
+    race_laps = rng.randint(50, 75)
+    lap_ms = rng.randint(75000, 105000)
+
+    grid = sorted(field, key=lambda entry: -(entry['pace'] + rng.gauss(0, 0.7)))
+    race = sorted(field, key=lambda entry: -(entry['pace'] + rng.gauss(0, 1.0)))
+
+    outcomes = []
+    for entry in race:
+        if rng.random() < 0.15:
+            laps = rng.randint(0, race_laps - 1)
+            status_id = rng.choices(dnf_weights[0], dnf_weights[1])[0]
+        else:
+            down = (min(int(rng.expovariate(1.5)), max(lapped_ids))
+                    if len(outcomes) > 8 else 0)
+            laps = race_laps - down
+            status_id = lapped_ids[down]
+        outcomes.append((entry, laps, status_id))
+    classified = [outcome for outcome in outcomes if outcome[2] not in dnf_ids]
+    retired = sorted((outcome for outcome in outcomes if outcome[2] in dnf_ids),
+                     key=lambda outcome: -outcome[1])
+
+    winner_ms = race_laps * lap_ms + rng.randint(0, 30000)
+    fastest = sorted(((rng.gauss(lap_ms * 0.98, lap_ms * 0.01), entry['driverId'])
+                      for entry, laps, _ in outcomes if laps > 0))
+    fastest_rank = {driver_id: rank for rank, (_, driver_id) in enumerate(fastest, 1)}
+    fastest_ms = {driver_id: ms for ms, driver_id in fastest}
+
+    gap = 0
+    for order, (entry, laps, status_id) in enumerate(classified + retired, 1):
+        driver_id = entry['driverId']
+        is_classified = order <= len(classified)
+        points = POINTS[order - 1] if is_classified and order <= len(POINTS) else 0
+        if is_classified and laps == race_laps:
+            gap += 0 if order == 1 else int(rng.expovariate(1 / 8000))
+            time = _quote(_race_time(winner_ms) if order == 1 else f"+{gap / 1000:.3f}")
+            milliseconds = winner_ms + gap
+        else:
+            time, milliseconds = NULL, NULL
+        if driver_id in fastest_ms:
+            fastest_lap = rng.randint(1, laps)
+            rank = fastest_rank[driver_id]
+            fastest_time = _quote(_lap_time(fastest_ms[driver_id]))
+            speed = _quote(f"{5000 / fastest_ms[driver_id] * 3600:.3f}")
+        else:
+            fastest_lap, rank, fastest_time, speed = NULL, NULL, NULL, NULL
+        writers.write('results', [
+            writers.next_id('results'), race_id, driver_id, entry['constructorId'],
+            entry['number'], grid.index(entry) + 1,
+            order if is_classified else NULL,
+            _quote(str(order) if is_classified else 'R'), order, points, laps,
+            time, milliseconds, fastest_lap, rank, fastest_time, speed, status_id,
+        ])
+
+        driver = standings['drivers'].setdefault(driver_id, [0, 0])
+        driver[0] += points
+        driver[1] += order == 1
+        constructor = standings['constructors'].setdefault(entry['constructorId'],
+                                                           [0, 0])
+        constructor[0] += points
+        constructor[1] += order == 1
+
+        if season_position >= PIT_STOPS_FROM and laps > 1:
+            stop_laps = sorted(rng.sample(range(1, laps), min(laps - 1,
+                                                              rng.randint(1, 3))))
+            for stop, lap in enumerate(stop_laps, 1):
+                duration = (int(rng.lognormvariate(10.06, 0.15))
+                            if rng.random() > 0.005 else rng.randint(60000, 3000000))
+                clock = 14 * 3600 + lap * lap_ms // 1000
+                writers.write('pit_stops', [
+                    race_id, driver_id, stop, lap,
+                    _quote(f"{clock // 3600:02d}:{clock // 60 % 60:02d}:"
+                           f"{clock % 60:02d}"),
+                    _quote(_duration(duration)), duration,
+                ])
+
+        if season_position >= LAP_TIMES_FROM:
+            for lap in range(1, laps + 1):
+                milliseconds = int(rng.gauss(lap_ms, lap_ms * 0.02))
+                writers.write('lap_times', [race_id, driver_id, lap, order,
+                                            _quote(_lap_time(milliseconds)),
+                                            milliseconds])
+
+    if season_position >= QUALIFYING_FROM:
+        for position, entry in enumerate(grid, 1):
+            times = [_quote(_lap_time(lap_ms * (0.97 + 0.002 * (position + session))))
+                     if position <= limit else NULL
+                     for session, limit in enumerate((len(grid), 15, 10))]
+            writers.write('qualifying', [writers.next_id('qualifying'), race_id,
+                                         entry['driverId'], entry['constructorId'],
+                                         entry['number'], position, *times])
+
+    for name, key in (('driver_standings', 'drivers'),
+                      ('constructor_standings', 'constructors')):
+        ranking = sorted(standings[key].items(),
+                         key=lambda item: (-item[1][0], -item[1][1], item[0]))
+        for position, (competitor, (points, wins)) in enumerate(ranking, 1):
+            writers.write(name, [writers.next_id(name), race_id, competitor, points,
+                                 position, _quote(str(position)), wins])
+
+
+def generate(dst_dir, scale=1, seed=0, src_dir=os.path.join('.', 'data'),
+             tables=GENERATED_TABLES):
+    """
+    Writes a synthetic dataset with the columns of the Ergast files.
+
+    Parameters
+    ----------
+    dst_dir : folder to write the CSV files to
+    scale : number of times the real history (75 seasons) is generated
+    seed : seed of the random generator; the same seed gives the same files
+    src_dir : folder of the real data, whose drivers, constructors, circuits
+        and statuses are copied and referred to
+    tables : generated tables to write (default: all of them)
+
+    """
+    os.makedirs(dst_dir, exist_ok=True)
+    for name in COPIED_TABLES:
+        shutil.copyfile(os.path.join(src_dir, f"{name}.csv"),
+                        os.path.join(dst_dir, f"{name}.csv"))
+
+    rng = random.Random(seed)
+    driver_ids = _read_ids(os.path.join(src_dir, 'drivers.csv'), 'driverId')
+    constructor_ids = _read_ids(os.path.join(src_dir, 'constructors.csv'),
+                                'constructorId')
+    with open(os.path.join(src_dir, 'circuits.csv'), newline='', encoding='utf-8') as f:
+        locations = {int(row['circuitId']): row['location']
+                     for row in csv.DictReader(f)}
+    circuit_ids = list(locations)
+    finished_id, lapped_ids = _lapped_status_ids(src_dir)
+    lapped_ids = {0: finished_id, **{down: lapped_ids[down] for down in range(1, 10)
+                                     if down in lapped_ids}}
+    dnf_weights = _dnf_weights(src_dir)
+    statuses = (lapped_ids, set(dnf_weights[0]), dnf_weights)
+
+    seasons = SEASONS * scale
+    writers = _Writers(dst_dir, tables)
+    field, queue, race_id = [], [], 0
+    try:
+        for season in range(seasons):
+            year = FIRST_YEAR + season
+            writers.write('seasons', [year, _quote(f"https://example.org/{year}")])
+            # every real driver makes a debut once per SEASONS seasons
+            if season % SEASONS == 0:
+                queue[:] = rng.sample(driver_ids, len(driver_ids))
+            newcomers = -(-len(queue) // (SEASONS - season % SEASONS))
+            field = _season_field(rng, field, newcomers, queue, driver_ids,
+                                  constructor_ids)
+            standings = {'drivers': dict(), 'constructors': dict()}
+            rounds = rng.randint(8, 12) + int(12 * season / seasons)
+            for round_number in range(1, rounds + 1):
+                race_id += 1
+                circuit_id = rng.choice(circuit_ids)
+                month, day = 3 + (round_number - 1) * 9 // rounds, rng.randint(1, 28)
+                writers.write('races', [
+                    race_id, year, round_number, circuit_id,
+                    _quote(f"{locations[circuit_id]} Grand Prix"),
+                    _quote(f"{year}-{month:02d}-{day:02d}"), NULL,
+                    _quote(f"https://example.org/{year}/{round_number}"),
+                    *[NULL] * 10,
+                ])
+                _write_race(writers, rng, race_id, season / seasons, field,
+                            statuses, standings)
+    finally:
+        writers.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--output', required=True, help="folder of the CSV files")
+    parser.add_argument('--scale', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', default=os.path.join('.', 'data'),
+                        help="real data whose drivers, constructors, ... are kept")
+    parser.add_argument('--tables', nargs='+', default=list(GENERATED_TABLES),
+                        choices=GENERATED_TABLES)
+    args = parser.parse_args(argv)
+    generate(args.output, args.scale, args.seed, args.data_dir, args.tables)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,6 @@
-from .app import interface
-
 if __name__ == "__main__":
+    # imported here: the worker processes started with spawn (Windows, macOS)
+    # run this module again under another name, and must not build the GUI
+    from .app import interface
+
     interface.mainloop()
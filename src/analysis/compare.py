@@ -1,44 +1,324 @@
+"""
+Benchmark harness comparing the vanilla and pandas answers to the questions.
+
+Usage (from the project root):
+    python -m src.analysis.compare ranking --repeats 20
+    python -m src.analysis.compare --all --json
+
+"""
+import argparse
+import gc
+import inspect
+import json
+import math
+import statistics
 import time
 
+from src.parsers.data_store import store
+from src.tracing import STAGES, profile_memory, stage
 
-def compare_execution_time(fct_vanilla, fct_with_module, repeats=10):
-    """
-    Compare the average execution time of two functions over a number of repetitions.
 
-    The difference is computed with the average times rather than with the times of a
-    single execution, so that the influence of system variations is minimal.
+def time_calls(func, repeats=10, warmup=2, setup=None, disable_gc=True):
+    """
+    Times repeated calls of a function.
 
     Parameters
     ----------
-    fct_vanilla : function without external modules
-    fct_with_module : function using a module like pandas
-    repeats : int - number of times each function should be executed (default: 10)
+    func : function without parameters
+    repeats : number of timed calls
+    warmup : number of untimed calls made first (imports, caches of the system)
+    setup : function without parameters called before every call, outside of
+        the timed section
+    disable_gc : if True, the garbage collector is run before every call and
+        disabled during it, so that collections do not land in the timings
+
+    Returns
+    -------
+    list[float] : duration of every timed call, in seconds
+
+    """
+    gc_was_enabled = gc.isenabled()
+    times = []
+    try:
+        for i in range(warmup + repeats):
+            if setup is not None:
+                setup()
+            if disable_gc:
+                gc.collect()
+                gc.disable()
+            start = time.perf_counter()
+            func()
+            duration = time.perf_counter() - start
+            if gc_was_enabled:
+                gc.enable()
+            if i >= warmup:
+                times.append(duration)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return times
+
+
+def summarize(times):
+    """
+    Returns
+    -------
+    dict : 'repeats', 'min', 'median', 'p95', 'mean' and 'std' of durations
+
+    """
+    ordered = sorted(times)
+    p95 = ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+    return {
+        'repeats': len(times),
+        'min': ordered[0],
+        'median': statistics.median(ordered),
+        'p95': p95,
+        'mean': statistics.fmean(ordered),
+        'std': statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+    }
+
+
+def difference_interval(times_a, times_b, confidence=0.95):
+    """
+    Confidence interval of the difference of the mean durations (a - b), with
+    Welch's approximation and a normal quantile.
+
+    Returns
+    -------
+    tuple : (difference, low, high)
+
+    """
+    difference = statistics.fmean(times_a) - statistics.fmean(times_b)
+    variance = sum(statistics.variance(times) / len(times) if len(times) > 1 else 0.0
+                   for times in (times_a, times_b))
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    margin = z * math.sqrt(variance)
+    return difference, difference - margin, difference + margin
+
+
+def _form(func):
+    return 'columns' if '.homemade.' in inspect.unwrap(func).__module__ else 'pandas'
+
+
+def _load(name, form):
+    return store.columns(name) if form == 'columns' else store.table(name)
+
+
+def _phases(func):
+    """
+    Returns the uncached question and the functions forgetting and loading the
+    tables it depends on.
+
+    """
+    tables = getattr(func, 'tables', ())
+    form = _form(func)
+
+    def invalidate():
+        for name in tables:
+            store.invalidate(name)
+
+    def load():
+        for name in tables:
+            _load(name, form)
+
+    return inspect.unwrap(func), invalidate, load
+
+
+def memory_profile(func, args=(), setup=None):
+    """
+    Measures the memory used by a question in one untimed call, split in three
+    stages (see tracing.MemoryProfile):
+
+    - load: reading the tables the question depends on;
+    - transform: answering the question from the loaded tables, with the
+      derived values computed again, but not formatting the answer;
+    - format: formatting the answer (the code marked with tracing.stage).
+
+    setup, if given, is called before, as before every compute call of
+    `benchmark`.
 
     Returns
     -------
-    tuple containing :
-        - the average time for fct_vanilla
-        - the average time for fct_with_module
-        - the difference between the two average execution times
+    dict : stage -> 'time', 'peak', 'net' and 'rss', plus 'total'
+
+    """
+    uncached, invalidate, load = _phases(func)
+    invalidate()
+    store.clear_derived()
+    if setup is not None:
+        setup()
+    with profile_memory(default='load') as profile:
+        load()
+        with stage('transform'):
+            uncached(*args)
+    return profile.summary()
 
+
+def benchmark(func, args=(), repeats=10, warmup=2, disable_gc=True, memory=True,
+              setup=None):
     """
-    total_time_vanilla = 0
-    total_time_other = 0
+    Times a question in two phases.
 
-    for _ in range(repeats):
-        start = time.perf_counter()
-        fct_vanilla()
-        total_time_vanilla += time.perf_counter() - start
+    - load: reading the CSV files of the tables the question depends on (the
+      `tables` attribute set by result_cache.cached), in the form it uses;
+    - compute: answering the question once these tables are loaded, without
+      the cache of the answers and with the derived values (indexes,
+      aggregate tables, ...) computed again every time. setup, if given, is
+      called before every call too, untimed, to forget what the question
+      keeps elsewhere (such as the saved features of the clustering).
 
-        start = time.perf_counter()
-        fct_with_module()
-        total_time_other += time.perf_counter() - start
+    With memory=True, the memory of the stages is measured in one more call
+    (see memory_profile), after the timed ones.
 
-    avg_time_vanilla = total_time_vanilla / repeats
-    avg_time_other = total_time_other / repeats
+    Returns
+    -------
+    dict : 'load' and 'compute' summaries (see summarize), plus the raw
+        durations in 'load_times' and 'compute_times', and the 'memory'
+        profile if it was measured
 
+    """
+    uncached, invalidate, load = _phases(func)
+    tables = getattr(func, 'tables', ())
+
+    load_times = (time_calls(load, repeats, warmup, invalidate, disable_gc)
+                  if tables else [0.0])
+    load()
+
+    def forget():
+        store.clear_derived()
+        if setup is not None:
+            setup()
+
+    compute_times = time_calls(lambda: uncached(*args), repeats, warmup, forget,
+                               disable_gc)
+    report = {
+        'load': summarize(load_times),
+        'compute': summarize(compute_times),
+        'load_times': load_times,
+        'compute_times': compute_times,
+    }
+    if memory:
+        report['memory'] = memory_profile(func, args, setup)
+    return report
+
+
+def compare_implementations(func_vanilla, func_pandas, args=(), repeats=10,
+                            warmup=2, confidence=0.95, disable_gc=True, memory=True):
+    """
+    Benchmarks the vanilla and pandas versions of a question (see benchmark).
+
+    Returns
+    -------
+    dict : 'vanilla' and 'pandas' benchmarks, and 'difference': the difference
+        of the mean compute times (vanilla - pandas) with its confidence
+        interval ('low', 'high') at the given confidence level
+
+    """
+    vanilla = benchmark(func_vanilla, args, repeats, warmup, disable_gc, memory)
+    pandas = benchmark(func_pandas, args, repeats, warmup, disable_gc, memory)
+    difference, low, high = difference_interval(vanilla['compute_times'],
+                                                pandas['compute_times'], confidence)
     return {
-        "vanilla": avg_time_vanilla,
-        "modules": avg_time_other,
-        "difference": avg_time_vanilla - avg_time_other
+        'vanilla': vanilla,
+        'pandas': pandas,
+        'difference': {'mean': difference, 'low': low, 'high': high,
+                       'confidence': confidence},
     }
+
+
+def format_report(report):
+    """
+    Formats the result of compare_implementations as a table, in milliseconds.
+
+    """
+    lines = [f"{'':<18}{'min':>9}{'median':>9}{'p95':>9}{'std':>9}",
+             "-" * 54]
+    for name in ('vanilla', 'pandas'):
+        for phase in ('load', 'compute'):
+            summary = report[name][phase]
+            lines.append(f"{f'{name} {phase}':<18}"
+                         + "".join(f"{summary[stat] * 1000:>9.2f}"
+                                   for stat in ('min', 'median', 'p95', 'std')))
+    difference = report['difference']
+    lines += ["-" * 54,
+              f"Compute difference (vanilla - pandas): "
+              f"{difference['mean'] * 1000:.2f} ms",
+              f"{difference['confidence']:.0%} confidence interval: "
+              f"[{difference['low'] * 1000:.2f}, {difference['high'] * 1000:.2f}] ms",
+              f"Repeats: {report['vanilla']['compute']['repeats']}"]
+    if 'memory' in report['vanilla']:
+        lines += ["", format_memory({name: report[name]['memory']
+                                     for name in ('vanilla', 'pandas')})]
+    return "\n".join(lines)
+
+
+def _mib(size):
+    return "n/a" if size is None else f"{size / 2 ** 20:.2f}"
+
+
+def format_memory(profiles):
+    """
+    Formats memory profiles (see memory_profile) as a table, in MiB.
+
+    Parameters
+    ----------
+    profiles : dict, name of the implementation -> profile
+
+    """
+    lines = [f"{'MiB':<18}{'peak':>9}{'net':>9}{'rss':>9}{'ms':>9}",
+             "-" * 54]
+    for name, profile in profiles.items():
+        for phase in STAGES + ('total',):
+            if phase not in profile:
+                continue
+            entry = profile[phase]
+            lines.append(f"{f'{name} {phase}':<18}{_mib(entry['peak']):>9}"
+                         f"{_mib(entry['net']):>9}{_mib(entry['rss']):>9}"
+                         f"{entry['time'] * 1000:>9.2f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    from src.analysis.questions import QUESTIONS, default_arguments, question
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('questions', nargs='*',
+                        help="keys of the questions (see src/analysis/questions.py)")
+    parser.add_argument('--all', action='store_true',
+                        help="compare every question that has a vanilla version")
+    parser.add_argument('--repeats', type=int, default=10)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--confidence', type=float, default=0.95)
+    parser.add_argument('--keep-gc', action='store_true',
+                        help="leave the garbage collector enabled while timing")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="do not measure the memory of the stages")
+    parser.add_argument('--json', action='store_true', help="print JSON")
+    args = parser.parse_args(argv)
+
+    if args.all:
+        entries = [entry for entry in QUESTIONS if entry['vanilla'] is not None]
+    else:
+        entries = [question(key) for key in args.questions]
+    if not entries:
+        parser.error("give the keys of some questions, or --all")
+
+    reports = dict()
+    for entry in entries:
+        if entry['vanilla'] is None:
+            parser.error(f"{entry['key']} has no vanilla version")
+        reports[entry['key']] = compare_implementations(
+            entry['vanilla'], entry['pandas'], default_arguments(entry),
+            args.repeats, args.warmup, args.confidence, not args.keep_gc,
+            not args.no_memory
+        )
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        for key, report in reports.items():
+            print(f"{key}\n{format_report(report)}\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+from src.analysis.statuses import DNF, TECHNICAL, result_classes
+from src.parsers.data_store import store
+
+
+CAREER_FIELDS = ('starts', 'wins', 'podiums', 'grid_sum', 'grid_count', 'dnfs',
+                 'technical_failures')
+
+
+def build_career_table():
+    """
+    Computes the career statistics of every driver in a single pass over the
+    results.
+
+    Returns
+    -------
+    dict : driverId -> dict with, for this driver:
+        - 'starts' : number of entries in results
+        - 'wins' : number of races finished first
+        - 'podiums' : number of races finished in the top 3
+        - 'grid_sum', 'grid_count' : sum and number of starting positions
+        - 'dnfs' : number of races not finished (DNF class)
+        - 'technical_failures' : number of technical failures (TECHNICAL class)
+
+    """
+    results = store.columns('results')
+
+    career = dict()
+    for driver_id, position_order, grid, status_class in zip(results['driverId'],
+                                                             results['positionOrder'],
+                                                             results['grid'],
+                                                             result_classes()):
+        stats = career.get(driver_id)
+        if stats is None:
+            stats = career[driver_id] = dict.fromkeys(CAREER_FIELDS, 0)
+        stats['starts'] += 1
+        stats['wins'] += position_order == 1
+        stats['podiums'] += position_order <= 3
+        stats['grid_sum'] += grid
+        stats['grid_count'] += 1
+        stats['dnfs'] += bool(status_class & DNF)
+        stats['technical_failures'] += bool(status_class & TECHNICAL)
+    return career
+
+
+def career_table():
+    """
+    Returns the career statistics of every driver (see build_career_table),
+    computed once and kept until the results or statuses change.
+
+    """
+    return store.derived('homemade.career', build_career_table,
+                         ('results', 'status'))
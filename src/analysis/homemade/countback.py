@@ -0,0 +1,103 @@
+from src.analysis.homemade.engine import lookup
+from src.analysis.seasons import season, season_index
+from src.parsers.data_store import store
+
+
+# Competitors of each standings table: name -> (id column, standings table).
+ENTITIES = {
+    'driver': ('driverId', 'driver_standings'),
+    'constructor': ('constructorId', 'constructor_standings'),
+}
+
+
+def build_countback(entity):
+    """
+    Ranks the competitors of every season at once, breaking ties on points by
+    countback: the most 1st places, then the most 2nd places, and so on.
+
+    Only classified finishes (position not null in results) are counted. The
+    histograms of finishing positions are filled in a single pass over the
+    results, then all the final standings are ordered with a single sort.
+
+    Parameters
+    ----------
+    entity : 'driver' or 'constructor'
+
+    Returns
+    -------
+    dict : year -> list of dicts, in ranking order, with:
+        - the id column (driverId or constructorId)
+        - 'points' : points after the final round
+        - 'rank'
+        - 'finishes' : list of the numbers of 1st, 2nd, ... places
+
+    """
+    key, standings_name = ENTITIES[entity]
+    races = store.columns('races')
+    results = store.columns('results')
+    standings = store.columns(standings_name)
+
+    year_of = lookup(races, 'raceId', 'year')
+
+    counts = dict()
+    max_position = 0
+    for race_id, competitor, position in zip(results['raceId'], results[key],
+                                             results['position']):
+        if position is None:
+            continue
+        finishes = counts.setdefault((year_of[race_id], competitor), dict())
+        finishes[position] = finishes.get(position, 0) + 1
+        max_position = max(max_position, position)
+
+    final_races = {entry['final_race_id']: year
+                   for year, entry in season_index().items()}
+
+    rows = []
+    for race_id, competitor, points in zip(standings['raceId'], standings[key],
+                                           standings['points']):
+        year = final_races.get(race_id)
+        if year is None:
+            continue
+        finishes = counts.get((year, competitor), dict())
+        rows.append({
+            key: competitor,
+            'year': year,
+            'points': float(points),
+            'finishes': [finishes.get(pos, 0) for pos in range(1, max_position + 1)],
+        })
+
+    # year ascending, then points and finishes descending
+    rows.sort(key=lambda row: (-row['year'], row['points'], row['finishes']),
+              reverse=True)
+
+    table = dict()
+    for row in rows:
+        ranking = table.setdefault(row.pop('year'), [])
+        row['rank'] = len(ranking) + 1
+        ranking.append(row)
+    return table
+
+
+def countback(entity='driver'):
+    """
+    Returns the final standings of every season (see build_countback), computed
+    once and kept until the tables they come from change.
+
+    """
+    _, standings_name = ENTITIES[entity]
+    return store.derived(f'homemade.countback.{entity}',
+                         lambda: build_countback(entity),
+                         ('races', 'results', standings_name))
+
+
+def final_standings(yy, entity='driver'):
+    """
+    Returns the final standings of one season, in ranking order.
+
+    Raises
+    ------
+    ValueError : if no race took place that year
+
+    """
+    season(yy)
+    return countback(entity).get(yy, [])
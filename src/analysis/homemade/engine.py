@@ -0,0 +1,237 @@
+import heapq
+
+from src.parsers.iter_csv import compile_condition
+from src.parsers.parse_columns import DictColumn
+from src.tracing import traced
+
+
+# Small relational engine on tables given as dictionaries of columns (the
+# columns form of the DataStore, or the tables built by the functions below).
+# Every operation is a single pass over its inputs, with dictionaries as hash
+# indexes, so that questions never compare every row with every other one.
+
+
+def num_rows(table):
+    """
+    Returns the number of rows of a table.
+
+    """
+    return len(next(iter(table.values()), ()))
+
+
+def _column_test(column, condition):
+    """
+    Returns the values to test and the test of a condition on a column.
+
+    Conditions on the strings of a dictionary-encoded column are translated
+    into conditions on its integer codes, in the string table of the column.
+
+    """
+    if isinstance(column, DictColumn) and not callable(condition):
+        strings = column.table
+        if isinstance(condition, str):
+            return column.codes, compile_condition(strings.codes.get(condition, -2))
+        return column.codes, compile_condition(strings.lookup(condition))
+    return column, compile_condition(condition)
+
+
+@traced(name='filter')
+def where(table, **conditions):
+    """
+    Returns the indices of the rows meeting every condition.
+
+    Parameters
+    ----------
+    table : dict of columns
+    conditions : column name -> condition, as in iter_csv:
+        - a single value : the value in the column must be equal to it
+        - a container (set, list, ...) : the value must belong to it
+        - a function : the value must satisfy it
+
+    Returns
+    -------
+    list[int]
+
+    """
+    selected = range(num_rows(table))
+    for name, condition in conditions.items():
+        values, test = _column_test(table[name], condition)
+        selected = [i for i in selected if test(values[i])]
+    return list(selected)
+
+
+@traced(name='filter')
+def select(table, columns=None, **conditions):
+    """
+    Keeps some columns of the rows meeting every condition (see `where`).
+
+    Returns
+    -------
+    dict : column name -> list of values
+
+    """
+    rows = where(table, **conditions) if conditions else range(num_rows(table))
+    return {name: [table[name][i] for i in rows] for name in columns or table}
+
+
+@traced(name='index')
+def unique_index(table, key):
+    """
+    Builds a hash index on a primary key: value -> row index.
+
+    """
+    positions = dict()
+    for i, value in enumerate(table[key]):
+        if value in positions:
+            raise ValueError(f"Duplicate value {value} in column {key}")
+        positions[value] = i
+    return positions
+
+
+@traced(name='index')
+def index(table, key):
+    """
+    Builds a hash index on a foreign key: value -> list of row indices.
+
+    """
+    positions = dict()
+    for i, value in enumerate(table[key]):
+        positions.setdefault(value, []).append(i)
+    return positions
+
+
+@traced(name='join')
+def lookup(table, key, columns):
+    """
+    Maps each value of a primary key to the values of other columns of its row.
+
+    Returns
+    -------
+    dict : key value -> value of the column (or tuple of values if several
+        columns are given)
+
+    """
+    if isinstance(columns, str):
+        return dict(zip(table[key], table[columns]))
+    return dict(zip(table[key], zip(*(table[name] for name in columns))))
+
+
+@traced(name='join')
+def hash_join(left, right, on, columns=None):
+    """
+    Inner join of two tables on one column, in a single pass over each of them.
+
+    An index is built on the join column of `right`, then each row of `left`
+    is matched with the rows of `right` sharing its value.
+
+    Parameters
+    ----------
+    left, right : dict of columns
+    on : name of the join column, present in both tables
+    columns : columns of `right` added to the columns of `left` (default: all
+        the columns of `right` except `on`)
+
+    Returns
+    -------
+    dict : column name -> list of values
+
+    """
+    if columns is None:
+        columns = [name for name in right if name != on]
+    right_index = index(right, on)
+
+    joined = {name: [] for name in [*left, *columns]}
+    for i, value in enumerate(left[on]):
+        for j in right_index.get(value, ()):
+            for name in left:
+                joined[name].append(left[name][i])
+            for name in columns:
+                joined[name].append(right[name][j])
+    return joined
+
+
+def _count(values):
+    return len(values)
+
+
+def _mean(values):
+    return sum(values) / len(values)
+
+
+AGGREGATES = {'count': _count, 'sum': sum, 'mean': _mean, 'min': min, 'max': max}
+
+
+@traced(name='aggregate')
+def group_by(table, keys, rows=None, **aggregates):
+    """
+    Groups the rows of a table and aggregates each group.
+
+    Parameters
+    ----------
+    table : dict of columns
+    keys : name of the grouping column, or tuple of names
+    rows : indices of the rows to group (default: all of them)
+    aggregates : result name -> (function, column name), where function is
+        'count', 'sum', 'mean', 'min', 'max' or any function of a list of
+        values. The column is ignored by 'count'.
+
+    Returns
+    -------
+    dict : group key -> dict of aggregated values, with groups in order of
+        first appearance
+
+    """
+    if rows is None:
+        rows = range(num_rows(table))
+    if isinstance(keys, str):
+        key_values = table[keys]
+        group_of = key_values.__getitem__
+    else:
+        key_columns = [table[name] for name in keys]
+
+        def group_of(i):
+            return tuple(column[i] for column in key_columns)
+
+    functions = {name: (AGGREGATES.get(function, function), column)
+                 for name, (function, column) in aggregates.items()}
+    needed = {column for _, column in functions.values()
+              if column is not None}
+
+    groups = dict()
+    for i in rows:
+        key = group_of(i)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = [0, {column: [] for column in needed}]
+        group[0] += 1
+        for column in needed:
+            group[1][column].append(table[column][i])
+
+    return {
+        key: {name: (count if function is _count else function(values[column]))
+              for name, (function, column) in functions.items()}
+        for key, (count, values) in groups.items()
+    }
+
+
+@traced(name='sort')
+def top_k(groups, k, key):
+    """
+    Returns the k groups with the largest values of an aggregate, in
+    decreasing order (ties keep the order of the groups).
+
+    Parameters
+    ----------
+    groups : dict returned by group_by
+    k : number of groups to keep (None keeps all of them)
+    key : name of the aggregate to sort on
+
+    Returns
+    -------
+    list[tuple] : (group key, aggregates)
+
+    """
+    items = groups.items()
+    if k is None:
+        return sorted(items, key=lambda item: item[1][key], reverse=True)
+    return heapq.nlargest(k, items, key=lambda item: item[1][key])
@@ -1,9 +1,15 @@
-from src.parsers.parse_csv import parse_csv
+from src.analysis.homemade.career import career_table
+from src.analysis.homemade.engine import lookup, top_k
+from src.analysis.result_cache import cached
+from src.parsers.data_store import store
+from src.tracing import stage, traced
 
 
 # Which drivers have won 30 or more races in their careers?
 
 
+@traced
+@cached(('results', 'status', 'drivers'))
 def at_least_n_races_nopd(n: int):
     """
     Finds pilots who won at least n races
@@ -19,42 +25,22 @@ def at_least_n_races_nopd(n: int):
         A string that contains the drivers and their numbers of wins.
 
     """
-    drivers = parse_csv('./data/drivers.csv')
-    results = parse_csv('./data/results.csv')
-
-    wins = []
-    for line in results:
-        if line['positionOrder'] == '1':
-            wins.append(line)
-
-    wins_by_driver = dict()
-    for win in wins:
-        if win['driverId'] in wins_by_driver.keys():
-            wins_by_driver[win['driverId']] += 1
-        else:
-            wins_by_driver[win['driverId']] = 1
-
-    more_than_n_wins_by_driver = dict()
-    for driver in wins_by_driver.keys():
-        if wins_by_driver[driver] >= n:
-            more_than_n_wins_by_driver[driver] = wins_by_driver[driver]
-
-    drivers_fullnames = {
-        driver_id: None for driver_id in more_than_n_wins_by_driver.keys()
+    drivers = store.columns('drivers')
+
+    career = career_table()
+
+    with stage('filter'):
+        more_than_n_wins_by_driver = {
+            driver_id: stats
+            for driver_id, stats in career.items()
+            if stats['wins'] >= n
         }
 
-    for driver in drivers:
-        for id in drivers_fullnames.keys():
-            if driver['driverId'] == id:
-                drivers_fullnames[id] = driver['forename'] + ' ' + driver['surname']
+    drivers_fullnames = lookup(drivers, 'driverId', ('forename', 'surname'))
 
     more_than_n_wins_by_driver_named = {
-        drivers_fullnames[driver_id]: count
-        for driver_id, count in sorted(
-            more_than_n_wins_by_driver.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )
+        ' '.join(drivers_fullnames[driver_id]): aggregates['wins']
+        for driver_id, aggregates in top_k(more_than_n_wins_by_driver, None, 'wins')
     }
 
     def format_dict(dico, title):
@@ -70,5 +56,6 @@ def at_least_n_races_nopd(n: int):
 
         return "\n".join([title, line, header, line] + rows + [line])
 
-    return format_dict(more_than_n_wins_by_driver_named,
-                       f"Drivers who won more than {n} races")
+    with stage('format'):
+        return format_dict(more_than_n_wins_by_driver_named,
+                           f"Drivers who won more than {n} races")
@@ -1,9 +1,15 @@
-from src.parsers.parse_csv import parse_csv
+from src.analysis.homemade.countback import final_standings
+from src.analysis.homemade.engine import lookup
+from src.analysis.result_cache import cached
+from src.parsers.data_store import store
+from src.tracing import stage, traced
 
 
 # What was the final drivers ranking for the 2023 season?
 
 
+@traced
+@cached(('races', 'results', 'driver_standings', 'drivers'))
 def ranking_nopd(yy):
     """
     Establishes the drivers standings for a specified year, and deals with
@@ -19,63 +25,17 @@ def ranking_nopd(yy):
         A string that contains the drivers, their ranks, and their numbers of points.
 
     """
-    drivers = parse_csv('./data/drivers.csv')
-    results = parse_csv('./data/results.csv')
-    driver_standings = parse_csv('./data/driver_standings.csv')
-    races = parse_csv('./data/races.csv')
-
-    races_yy = []
-    for line in races:
-        if int(line['year']) == yy:
-            races_yy.append(line)
-
-    races_yy_ids = []
-    for race in races_yy:
-        races_yy_ids.append(race['raceId'])
-
-    id_last_race_yy = max(races_yy_ids)
-
-    ranking_with_exaequos = dict()
-    for line in driver_standings:
-        if line['raceId'] == id_last_race_yy:
-            ranking_with_exaequos[line['driverId']] = line['points']
-
-    ranking_sorted = dict(sorted(
-        ranking_with_exaequos.items(),
-        key=lambda item: float(item[1]),
-        reverse=True
-    ))
-
-    ranking_sorted
+    drivers = store.columns('drivers')
 
     id_to_name = {
-        driver['driverId']: f"{driver['forename']} {driver['surname']}"
-        for driver in drivers
+        driver_id: f"{forename} {surname}"
+        for driver_id, (forename, surname) in lookup(drivers, 'driverId',
+                                                     ('forename', 'surname')).items()
     }
 
-    from collections import defaultdict
-
-    finishes = defaultdict(lambda: [0]*10)
-
-    for result in results:
-        if result['raceId'] in races_yy_ids:
-            position = result['position']
-            driver_id = result['driverId']
-
-            if position.isdigit():
-                pos = int(position)
-                if 1 <= pos <= 10:
-                    finishes[driver_id][pos - 1] += 1
-
-    final_ranking_ids = sorted(
-        ranking_with_exaequos.keys(),
-        key=lambda d: (float(ranking_with_exaequos[d]), finishes[d]),
-        reverse=True
-    )
-
     final_ranking_named = [
-        (rank, id_to_name[driver_id], float(ranking_with_exaequos[driver_id]))
-        for rank, driver_id in enumerate(final_ranking_ids, 1)
+        (row['rank'], id_to_name[row['driverId']], row['points'])
+        for row in final_standings(yy, 'driver')
     ]
 
     def format_list(standings, title):
@@ -99,4 +59,5 @@ def ranking_nopd(yy):
 
         return "\n".join([title, separator, header, separator] + rows + [separator])
 
-    return format_list(final_ranking_named, f"Drivers' ranking - Season {yy}")
+    with stage('format'):
+        return format_list(final_ranking_named, f"Drivers' ranking - Season {yy}")
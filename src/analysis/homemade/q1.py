@@ -1,9 +1,15 @@
-from src.parsers.parse_csv import parse_csv
+from src.analysis.homemade.career import career_table
+from src.analysis.homemade.engine import select
+from src.analysis.result_cache import cached
+from src.parsers.data_store import store
+from src.tracing import traced
 
 
 # What is Lewis Hamilton's average starting position?
 
 
+@traced
+@cached(('drivers', 'results', 'status'))
 def driver_mean_grid_nopd(first_name, last_name):
     """
     Compute the average starting position of a Formula 1 driver across
@@ -23,18 +29,14 @@ def driver_mean_grid_nopd(first_name, last_name):
         A sentence that specifies the average grid of the specified driver.
 
     """
-    drivers = parse_csv("./data/drivers.csv")
-    results = parse_csv("./data/results.csv")
+    drivers = store.columns('drivers')
 
-    for line in drivers:
-        if (line['forename'] == first_name and line['surname'] == last_name):
-            driver_Id = line['driverId']
-            break
+    found = select(drivers, ['driverId'], forename=first_name, surname=last_name)
+    if not found['driverId']:
+        raise ValueError('Driver not found')
+    driver_Id = found['driverId'][0]
 
-    driver_grid_list = []
-    for line in results:
-        if line['driverId'] == driver_Id:
-            driver_grid_list.append(int(line['grid']))
+    career = career_table()[driver_Id]
 
     return (f"{first_name} {last_name}'s mean position on the grid is "
-            f"{round(sum(driver_grid_list)/len(driver_grid_list))}")
+            f"{round(career['grid_sum']/career['grid_count'])}")
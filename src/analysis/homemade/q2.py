@@ -1,9 +1,15 @@
-from src.parsers.parse_csv import parse_csv
+from src.analysis.homemade.career import career_table
+from src.analysis.homemade.engine import lookup, top_k
+from src.analysis.result_cache import cached
+from src.parsers.data_store import store
+from src.tracing import stage, traced
 
 
 # Which drivers have recorded the most DNFs in their careers?
 
 
+@traced
+@cached(('results', 'status', 'drivers'))
 def get_driver_with_most_dnfs_nopd():
     """
     Finds the 3 drivers who did not finish (DNF) the most races in their career.
@@ -14,44 +20,13 @@ def get_driver_with_most_dnfs_nopd():
         A string that contains the 3 drivers as well as their numbers of DNFs.
 
     """
-    results = parse_csv('./data/results.csv')
-    status = parse_csv('./data/status.csv')
-    drivers = parse_csv('./data/drivers.csv')
+    drivers = store.columns('drivers')
 
-    finished_and_excluded_status = ["Finished", "+1 Lap", "Withdrew",
-                                    "Did not start", "Did not qualify",
-                                    "Did not prequalify", "107% Rule"]
-
-    for i in range(2, 100):
-        finished_and_excluded_status.append(f"+{i} Laps")
-
-    dnf_status_ids = []
-    for line in status:
-        if line['status'] not in finished_and_excluded_status:
-            dnf_status_ids.append(line['statusId'])
-
-    dnf_results = []
-    for line in results:
-        if line['statusId'] in dnf_status_ids:
-            dnf_results.append(line)
-
-    dnf_counts = dict()
-
-    for line in dnf_results:
-        if line['driverId'] in dnf_counts.keys():
-            dnf_counts[line['driverId']] += 1
-        else:
-            dnf_counts[line['driverId']] = 1
-
-    top3_dnf = dict(
-        sorted(dnf_counts.items(), key=lambda x: x[1], reverse=True)[:3]
-    )
-
-    id_to_name = {d['driverId']: f"{d['forename']} {d['surname']}" for d in drivers}
+    id_to_name = lookup(drivers, 'driverId', ('forename', 'surname'))
 
     top3_dnf_named = {
-        id_to_name[driver_id]: count
-        for driver_id, count in top3_dnf.items()
+        ' '.join(id_to_name[driver_id]): aggregates['dnfs']
+        for driver_id, aggregates in top_k(career_table(), 3, 'dnfs')
     }
 
     def format_dict(dico, title):
@@ -67,4 +42,5 @@ def get_driver_with_most_dnfs_nopd():
 
         return "\n".join([title, line, header, line] + rows + [line])
 
-    return format_dict(top3_dnf_named, "Drivers with most DNFs")
+    with stage('format'):
+        return format_dict(top3_dnf_named, "Drivers with most DNFs")
@@ -0,0 +1,49 @@
+import pandas as pd
+
+from src.analysis.pandas.statuses import results_with_status
+from src.analysis.statuses import DNF, TECHNICAL
+from src.parsers.data_store import store
+
+
+def build_career_frame():
+    """
+    Computes the career statistics of every driver with a single groupby over
+    the results.
+
+    Returns
+    -------
+    pd.DataFrame
+        Indexed by driverId, with the columns 'starts', 'wins', 'podiums',
+        'grid_sum', 'grid_count', 'dnfs' and 'technical_failures' (see
+        src.analysis.homemade.career.build_career_table).
+
+    """
+    results = results_with_status()
+
+    flags = pd.DataFrame({
+        'driverId': results['driverId'],
+        'win': results['positionOrder'] == 1,
+        'podium': results['positionOrder'] <= 3,
+        'grid': results['grid'],
+        'dnf': (results['status_class'] & DNF) != 0,
+        'technical_failure': (results['status_class'] & TECHNICAL) != 0,
+    })
+
+    return flags.groupby('driverId').agg(
+        starts=('grid', 'size'),
+        wins=('win', 'sum'),
+        podiums=('podium', 'sum'),
+        grid_sum=('grid', 'sum'),
+        grid_count=('grid', 'count'),
+        dnfs=('dnf', 'sum'),
+        technical_failures=('technical_failure', 'sum'),
+    )
+
+
+def career_frame():
+    """
+    Returns the career statistics of every driver (see build_career_frame),
+    computed once and kept until the results or statuses change.
+
+    """
+    return store.derived('pandas.career', build_career_frame, ('results', 'status'))
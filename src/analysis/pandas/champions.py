@@ -0,0 +1,70 @@
+import pandas as pd
+
+from src.parsers.data_store import store
+
+
+def build_champions_by_season():
+    """
+    Finds the drivers' and constructors' champions of every season at once.
+
+    The final round of each season is found with a single groupby over the
+    races, then the leaders of the standings after these rounds are attached
+    with one merge per standings table.
+
+    Returns
+    -------
+    pd.DataFrame
+        Indexed by year, with the columns 'raceId' (final round), 'driverId',
+        'driver' (full name), 'constructorId' and 'constructor' (name). The
+        champion columns are NaN when the standings of the final round are
+        missing (e.g. no constructors' championship before 1958).
+
+    """
+    races = store.table('races')
+    driver_standings = store.table('driver_standings')
+    constructor_standings = store.table('constructor_standings')
+    drivers = store.table('drivers')
+    constructors = store.table('constructors')
+
+    final_rounds = races.loc[races.groupby('year')['round'].idxmax(),
+                             ['year', 'raceId']]
+
+    driver_leaders = (
+        driver_standings[driver_standings['position'] == 1]
+        .drop_duplicates('raceId')[['raceId', 'driverId']]
+    )
+    constructor_leaders = (
+        constructor_standings[constructor_standings['position'] == 1]
+        .drop_duplicates('raceId')[['raceId', 'constructorId']]
+    )
+
+    driver_names = pd.DataFrame({
+        'driverId': drivers['driverId'],
+        'driver': (drivers['forename'].astype(str) + ' '
+                   + drivers['surname'].astype(str)),
+    })
+    constructor_names = pd.DataFrame({
+        'constructorId': constructors['constructorId'],
+        'constructor': constructors['name'].astype(str),
+    })
+
+    champions = (
+        final_rounds
+        .merge(driver_leaders, on='raceId', how='left')
+        .merge(constructor_leaders, on='raceId', how='left')
+        .merge(driver_names, on='driverId', how='left')
+        .merge(constructor_names, on='constructorId', how='left')
+    )
+
+    return champions.set_index('year').sort_index()
+
+
+def champions_by_season():
+    """
+    Returns the champions of every season (see build_champions_by_season),
+    computed once and kept until one of the tables they come from changes.
+
+    """
+    return store.derived('pandas.champions', build_champions_by_season,
+                         ('races', 'driver_standings', 'constructor_standings',
+                          'drivers', 'constructors'))
@@ -0,0 +1,94 @@
+import pandas as pd
+
+from src.analysis.seasons import season, season_index
+from src.parsers.data_store import store
+
+
+# Competitors of each standings table: name -> (id column, standings table).
+ENTITIES = {
+    'driver': ('driverId', 'driver_standings'),
+    'constructor': ('constructorId', 'constructor_standings'),
+}
+
+
+def build_countback(entity):
+    """
+    Ranks the competitors of every season at once, breaking ties on points by
+    countback: the most 1st places, then the most 2nd places, and so on.
+
+    Only classified finishes (non-null position in results) are counted. The
+    histogram of finishing positions of every (season, competitor) is computed
+    with one groupby, and all the final standings are ordered with one sort on
+    the year, the points and the histogram.
+
+    Parameters
+    ----------
+    entity : 'driver' or 'constructor'
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per competitor in the standings after the final round of each
+        season, in ranking order, with the columns 'year', the id column,
+        'points', 'rank' and one column per finishing position (1, 2, ...).
+
+    """
+    key, standings_name = ENTITIES[entity]
+    races = store.table('races')
+    results = store.table('results')
+    standings = store.table(standings_name)
+
+    classified = results[results['position'].notna()].merge(
+        races[['raceId', 'year']], on='raceId'
+    )
+    histogram = (
+        classified
+        .groupby(['year', key, classified['position'].astype(int)])
+        .size()
+        .unstack(fill_value=0)
+    )
+    positions = list(histogram.columns)
+
+    final_rounds = pd.DataFrame(
+        [(year, entry['final_race_id']) for year, entry in season_index().items()],
+        columns=['year', 'raceId']
+    )
+    table = (
+        final_rounds
+        .merge(standings[['raceId', key, 'points']], on='raceId')
+        .merge(histogram, left_on=['year', key], right_index=True, how='left')
+        .drop(columns='raceId')
+    )
+    table[positions] = table[positions].fillna(0).astype(int)
+
+    sort_by = ['year', 'points'] + positions
+    table = table.sort_values(sort_by, ascending=[True] + [False]*(len(sort_by)-1),
+                              ignore_index=True)
+    table.insert(3, 'rank', table.groupby('year').cumcount() + 1)
+    return table
+
+
+def countback(entity='driver'):
+    """
+    Returns the final standings of every season (see build_countback), computed
+    once and kept until the tables they come from change.
+
+    """
+    _, standings_name = ENTITIES[entity]
+    return store.derived(f'pandas.countback.{entity}',
+                         lambda: build_countback(entity),
+                         ('races', 'results', standings_name))
+
+
+def final_standings(yy, entity='driver'):
+    """
+    Returns the final standings of one season, in ranking order.
+
+    Raises
+    ------
+    ValueError : if no race took place that year
+
+    """
+    season(yy)
+    table = countback(entity)
+    return table[table['year'] == yy].reset_index(drop=True)
@@ -0,0 +1,126 @@
+import pandas as pd
+
+from src.analysis.pandas.statuses import results_with_status
+from src.analysis.statuses import ACCIDENT, DNF, TECHNICAL
+from src.parsers.data_store import store
+
+
+# Incident classes counted in the cube: name -> bit of the status class.
+INCIDENT_CLASSES = {
+    'accident': ACCIDENT,
+    'technical': TECHNICAL,
+    'dnf': DNF,
+}
+
+
+def build_incident_cube():
+    """
+    Counts the incidents of every class by circuit, country and season, in a
+    single pass over the results joined to the races and circuits.
+
+    Returns
+    -------
+    pd.Series
+        Number of incidents, indexed by ('circuitId', 'country', 'year',
+        'incident'), where incident is a key of INCIDENT_CLASSES. Only non-zero
+        counts are kept.
+
+    """
+    results = results_with_status()
+    races = store.table('races')
+    circuits = store.table('circuits')
+
+    incidents = pd.DataFrame({
+        name: (results['status_class'] & bit) != 0
+        for name, bit in INCIDENT_CLASSES.items()
+    })
+    incidents['raceId'] = results['raceId']
+
+    incidents = (
+        incidents
+        .merge(races[['raceId', 'circuitId', 'year']], on='raceId')
+        .merge(circuits[['circuitId', 'country']].astype({'country': str}),
+               on='circuitId')
+    )
+
+    cube = (
+        incidents
+        .groupby(['circuitId', 'country', 'year'])[list(INCIDENT_CLASSES)]
+        .sum()
+        .rename_axis(columns='incident')
+        .stack()
+    )
+    return cube[cube > 0].rename('count')
+
+
+def incident_cube():
+    """
+    Returns the incident cube (see build_incident_cube), computed once and kept
+    until one of the tables it comes from changes.
+
+    """
+    return store.derived('pandas.incidents', build_incident_cube,
+                         ('results', 'status', 'races', 'circuits'))
+
+
+def incident_counts(incident='accident', country=None, first_year=None,
+                    last_year=None):
+    """
+    Counts the incidents of one class by circuit, from the incident cube.
+
+    Parameters
+    ----------
+    incident : key of INCIDENT_CLASSES
+    country : only keep the circuits of this country (default: all countries)
+    first_year, last_year : only keep the seasons in this range, bounds
+        included (default: no bound)
+
+    Returns
+    -------
+    pd.Series
+        Number of incidents indexed by circuitId, in decreasing order.
+
+    """
+    if incident not in INCIDENT_CLASSES:
+        raise ValueError(f"Unknown incident class: {incident}")
+
+    cube = incident_cube()
+    keep = cube.index.get_level_values('incident') == incident
+    if country:
+        keep &= cube.index.get_level_values('country') == country
+    years = cube.index.get_level_values('year')
+    if first_year is not None:
+        keep &= years >= first_year
+    if last_year is not None:
+        keep &= years <= last_year
+
+    counts = cube[keep].groupby(level='circuitId').sum()
+    return counts.sort_values(ascending=False, kind='stable')
+
+
+def most_dangerous_by_country(incident='accident', first_year=None, last_year=None):
+    """
+    Finds the circuit with the most incidents of one class in every country.
+
+    Returns
+    -------
+    pd.DataFrame
+        Indexed by country, with the columns 'circuitId' and 'count', in
+        decreasing order of count.
+
+    """
+    if incident not in INCIDENT_CLASSES:
+        raise ValueError(f"Unknown incident class: {incident}")
+
+    cube = incident_cube().xs(incident, level='incident')
+    years = cube.index.get_level_values('year')
+    if first_year is not None:
+        cube = cube[years >= first_year]
+        years = cube.index.get_level_values('year')
+    if last_year is not None:
+        cube = cube[years <= last_year]
+
+    by_circuit = cube.groupby(level=['country', 'circuitId']).sum()
+    ranked = by_circuit.sort_values(ascending=False, kind='stable').reset_index()
+    return (ranked.drop_duplicates('country')
+                  .set_index('country')[['circuitId', 'count']])
@@ -1,9 +1,16 @@
 import pandas as pd
 
+from src.analysis.pandas.career import career_frame
+from src.analysis.result_cache import cached
+from src.parsers.data_store import store
+from src.tracing import stage, traced
+
 
 # Which drivers have won 30 or more races in their careers?
 
 
+@traced
+@cached(('results', 'status', 'drivers'))
 def at_least_n_races(n: int):
     """
     Finds pilots who won at least n races
@@ -19,31 +26,35 @@ def at_least_n_races(n: int):
         A string that contains the drivers and their numbers of wins.
 
     """
-    drivers = pd.read_csv("./data/drivers.csv")
-    results = pd.read_csv("./data/results.csv")
-
-    wins = results[results["positionOrder"] == 1]
-
-    wins_by_driver = wins.groupby("driverId").size().reset_index(name="win_count")
+    drivers = store.table('drivers')
+    career = career_frame()
 
-    top_winners = wins_by_driver[wins_by_driver["win_count"] >= n]
+    with stage('filter'):
+        top_winners = (
+            career[career["wins"] >= n]["wins"]
+            .reset_index(name="win_count")
+        )
 
-    top_winners_named = pd.merge(top_winners, drivers, on="driverId")
+    with stage('join'):
+        top_winners_named = pd.merge(top_winners, drivers, on="driverId")
 
-    top_winners_named = top_winners_named[["forename", "surname", "win_count"]]
+        top_winners_named = top_winners_named[["forename", "surname", "win_count"]]
 
-    top_winners_named = top_winners_named.sort_values(by="win_count", ascending=False)
+    with stage('sort'):
+        top_winners_named = top_winners_named.sort_values(by="win_count",
+                                                          ascending=False)
 
-    lines = []
-    lines.append(f"Drivers who won more than {n} races")
-    lines.append("------------------------------------------------")
-    lines.append(f"{'Driver':<30}{'Wins'}")
-    lines.append("------------------------------------------------")
+    with stage('format'):
+        lines = []
+        lines.append(f"Drivers who won more than {n} races")
+        lines.append("------------------------------------------------")
+        lines.append(f"{'Driver':<30}{'Wins'}")
+        lines.append("------------------------------------------------")
 
-    for _, row in top_winners_named.iterrows():
-        full_name = f"{row['forename']} {row['surname']}"
-        lines.append(f"{full_name:<30}{row['win_count']:>9}")
+        for _, row in top_winners_named.iterrows():
+            full_name = f"{row['forename']} {row['surname']}"
+            lines.append(f"{full_name:<30}{row['win_count']:>9}")
 
-    lines.append("------------------------------------------------")
+        lines.append("------------------------------------------------")
 
-    return "\n".join(lines)
+        return "\n".join(lines)
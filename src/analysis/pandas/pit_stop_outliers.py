@@ -0,0 +1,102 @@
+import numpy as np
+
+from src.parsers.data_store import detached_copy, store
+
+
+# Scale factor making the MAD a consistent estimator of the standard deviation
+# of normally distributed values.
+MAD_SCALE = 0.6745
+
+DEFAULT_THRESHOLD = 3.5
+
+# Columns added to the pit stops by build_robust_scores
+SCORE_COLUMNS = ['race_median', 'race_mad', 'robust_z']
+
+
+def build_robust_scores():
+    """
+    Scores every pit stop against the other stops of its race with the median
+    absolute deviation (MAD), in one groupby-transform pass per statistic.
+
+    Returns
+    -------
+    pd.DataFrame
+        The pit stops with the columns 'race_median' and 'race_mad' (in
+        milliseconds) and 'robust_z' = 0.6745 * (milliseconds - median) / MAD.
+        When the MAD of a race is 0, stops equal to the median score 0 and the
+        others score infinity.
+
+    """
+    pit_stops = store.table('pit_stops')
+
+    by_race = pit_stops.groupby('raceId')['milliseconds']
+    pit_stops['race_median'] = by_race.transform('median')
+    deviation = pit_stops['milliseconds'] - pit_stops['race_median']
+    pit_stops['race_mad'] = (deviation.abs()
+                             .groupby(pit_stops['raceId'])
+                             .transform('median'))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        robust_z = MAD_SCALE * deviation / pit_stops['race_mad']
+    pit_stops['robust_z'] = robust_z.fillna(0)
+    return pit_stops
+
+
+def robust_scores():
+    """
+    Returns the scored pit stops (see build_robust_scores), computed once and
+    kept until pit_stops.csv changes, so that any threshold can be applied
+    without scoring the stops again. As with DataStore.table, columns can be
+    added or replaced and the score columns can be modified in place without
+    affecting the other callers, but the columns of the pit stops cannot be.
+
+    """
+    scores = store.derived('pandas.pit_stop_scores', build_robust_scores,
+                           ('pit_stops',))
+    return detached_copy(scores, SCORE_COLUMNS)
+
+
+def flag_outliers(threshold=DEFAULT_THRESHOLD):
+    """
+    Flags the pit stops whose robust z-score exceeds threshold in absolute
+    value (red flags, drive-throughs, ...).
+
+    Returns
+    -------
+    pd.Series : boolean mask aligned with the pit stops
+
+    """
+    return robust_scores()['robust_z'].abs() > threshold
+
+
+def cleaned_pit_stops(threshold=DEFAULT_THRESHOLD):
+    """
+    Returns the pit stops that are not outliers (see flag_outliers).
+
+    """
+    scores = robust_scores()
+    return scores[scores['robust_z'].abs() <= threshold]
+
+
+def cleaned_statistics(threshold=DEFAULT_THRESHOLD):
+    """
+    Computes the statistics of the pit stop durations without the outliers.
+
+    Returns
+    -------
+    dict : 'count', 'mean', 'std', 'min', 'max', 'p50', 'p90' and 'p99', in
+        milliseconds
+
+    """
+    durations = cleaned_pit_stops(threshold)['milliseconds']
+    quantiles = durations.quantile([0.5, 0.9, 0.99])
+    return {
+        'count': len(durations),
+        'mean': durations.mean(),
+        'std': durations.std(),
+        'min': durations.min(),
+        'max': durations.max(),
+        'p50': quantiles[0.5],
+        'p90': quantiles[0.9],
+        'p99': quantiles[0.99],
+    }
@@ -1,9 +1,16 @@
 import pandas as pd
 
+from src.analysis.pandas.career import career_frame
+from src.analysis.result_cache import cached
+from src.parsers.data_store import store
+from src.tracing import traced
+
 
 # What is Lewis Hamilton's average starting position?
 
 
+@traced
+@cached(('drivers', 'results', 'status'))
 def driver_mean_grid(first_name, last_name):
     """
     Compute the average starting position of a Formula 1 driver across
@@ -23,7 +30,7 @@ def driver_mean_grid(first_name, last_name):
         A sentence that specifies the average grid of the specified driver.
 
     """
-    drivers = pd.read_csv('./data/drivers.csv')
+    drivers = store.table('drivers')
 
     driver_id = drivers[(drivers['forename'] == first_name) &
                         (drivers['surname'] == last_name)]['driverId'].squeeze()
@@ -31,7 +38,7 @@ def driver_mean_grid(first_name, last_name):
     if pd.isna(driver_id):
         raise ValueError('Driver not found')
 
-    results = pd.read_csv('./data/results.csv')
+    career = career_frame().loc[driver_id]
 
     return (f"{first_name} {last_name}'s mean position on the grid is "
-            f"{round(results[results['driverId'] == driver_id]['grid'].mean())}")
+            f"{round(career['grid_sum'] / career['grid_count'])}")
@@ -1,10 +1,15 @@
-import pandas as pd
+from src.analysis.pandas.incidents import incident_counts
+from src.analysis.result_cache import cached
+from src.parsers.data_store import store
+from src.tracing import traced
 
 
 # Which circuit has been the most dangerous historically?
 
 
-def most_dangerous_circuit(country=None):
+@traced
+@cached(('results', 'status', 'races', 'circuits'))
+def most_dangerous_circuit(country=None, first_year=None, last_year=None):
     """
     Finds the circuit where most accidents took place.
     If country is specified, finds the most dangerous circuit in country.
@@ -12,45 +17,26 @@ def most_dangerous_circuit(country=None):
     Parameters
     ----------
     country : str
+    first_year, last_year : int
+        Only count the accidents of the seasons in this range (default: all)
 
     Returns
     -------
     str : Name of the circuit
 
     """
-    results = pd.read_csv('./data/results.csv')
-    status = pd.read_csv('./data/status.csv')
-    races = pd.read_csv('./data/races.csv')
-    circuits = pd.read_csv('./data/circuits.csv')
+    circuits = store.table('circuits')
 
-    status_ids = status[
-                     (status['status'] == 'Accident') |
-                     (status['status'] == 'Collision') |
-                     (status['status'] == 'Spun off') |
-                     (status['status'] == 'Damage') |
-                     (status['status'] == 'Debris')
-                 ]['statusId'].tolist()
-
-    accidents = results[results['statusId'].isin(status_ids)]
-
-    accidents = accidents.merge(races[['raceId', 'circuitId']],
-                                on='raceId',
-                                how='left')
-
-    accidents = accidents.merge(circuits[['circuitId', 'name', 'country']],
-                                on='circuitId',
-                                how='left')
-
-    if country:
-        accidents = accidents[accidents['country'] == country]
-
-    circuits_counts = accidents['name'].value_counts()
+    circuits_counts = incident_counts('accident', country, first_year, last_year)
 
     if circuits_counts.empty:
         return None
 
+    circuit_names = circuits.set_index('circuitId')['name']
+    circuit_name = circuit_names[circuits_counts.idxmax()]
+
     if not country:
         return (f"The most dangerous circuit in the world is "
-                f"the {circuits_counts.idxmax()}")
+                f"the {circuit_name}")
 
-    return f"{country}'s most dangerous circuit is the {circuits_counts.idxmax()}"
+    return f"{country}'s most dangerous circuit is the {circuit_name}"
@@ -1,9 +1,16 @@
 import pandas as pd
 
+from src.analysis.pandas.champions import champions_by_season
+from src.analysis.result_cache import cached
+from src.tracing import traced
+
 
 # Which constructor won the Constructors’ Championship in 2023?
 
 
+@traced
+@cached(('races', 'driver_standings', 'constructor_standings',
+         'drivers', 'constructors'))
 def constructor_winner(yy):
     """
     Finds which constructor won the yy-championship
@@ -17,38 +24,11 @@ def constructor_winner(yy):
     str : name of the constructor
 
     """
-    races = pd.read_csv('./data/races.csv')
-
-    races_yy = races[races['year'] == yy]
-
-    nb_races_yy = races_yy['round'].max()
-
-    race_id_last_race_yy = (
-        races[
-            (races['round'] == nb_races_yy) &
-            (races['year'] == yy)
-        ]['raceId']
-        .squeeze()
-    )
-
-    constructor_standings = pd.read_csv('./data/constructor_standings.csv')
-
-    constructor_id_champion_yy = (
-        constructor_standings[
-            (constructor_standings['raceId'] == race_id_last_race_yy) &
-            (constructor_standings['position'] == 1)
-        ]['constructorId']
-        .squeeze()
-    )
-
-    if isinstance(constructor_id_champion_yy, pd.Series):
-        if constructor_id_champion_yy.empty:
-            return None
-        constructor_id_champion_yy = constructor_id_champion_yy.iloc[0]
+    champions = champions_by_season()
 
-    constructors = pd.read_csv('./data/constructors.csv')
+    if yy not in champions.index:
+        return None
 
-    name = (constructors[constructors['constructorId'] == constructor_id_champion_yy]
-            ['name'].squeeze())
+    name = champions.at[yy, 'constructor']
 
-    return name
+    return None if pd.isna(name) else name
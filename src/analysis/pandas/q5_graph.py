@@ -1,10 +1,13 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 
+from src.analysis.pandas.champions import champions_by_season
+from src.tracing import stage, traced
+
 
 # Which constructors have won the most Constructors’ Championships?
 
 
+@traced
 def most_constructor_championships_won(save_path=None):
     """
     Plots the top 5 of the constructors who won the most constructor championships
@@ -14,39 +17,32 @@ def most_constructor_championships_won(save_path=None):
     None : Displays the graph
 
     """
-    from src.analysis.pandas.q4 import constructor_winner
-    constructors_champions = []
+    constructors_champions = champions_by_season()['constructor'].dropna()
+
+    with stage('aggregate'):
+        counts = constructors_champions.groupby(constructors_champions,
+                                                sort=False).size()
+
+    with stage('sort'):
+        counts_df = counts.to_frame('championships')
+        counts_df = counts_df.sort_values(by='championships', ascending=False)
+
+        top5 = counts_df.head(5)
 
-    for year in range(1958, 2025):
-        constructors_champions.append(constructor_winner(year))
+    with stage('format'):
+        top5.plot(kind='barh', legend=False, color='purple')
 
-    counts = dict()
+        plt.title("Top 5 Constructors with Most Championships")
+        plt.xlabel('Number of Championships')
+        plt.ylabel('Constructor')
+        plt.gca().invert_yaxis()
+        plt.tight_layout()
+        for index, value in enumerate(top5['championships']):
+            plt.text(value + 0.1, index, str(value), va='center')
+        plt.gca().axes.get_xaxis().set_visible(False)
 
-    for elt in constructors_champions:
-        if elt in counts.keys():
-            counts[elt] += 1
+        if save_path:
+            plt.savefig(save_path)
         else:
-            counts[elt] = 1
-
-    counts_df = pd.DataFrame.from_dict(counts, orient='index',
-                                       columns=['championships'])
-    counts_df = counts_df.sort_values(by='championships', ascending=False)
-
-    top5 = counts_df.head(5)
-
-    top5.plot(kind='barh', legend=False, color='purple')
-
-    plt.title("Top 5 Constructors with Most Championships")
-    plt.xlabel('Number of Championships')
-    plt.ylabel('Constructor')
-    plt.gca().invert_yaxis()
-    plt.tight_layout()
-    for index, value in enumerate(top5['championships']):
-        plt.text(value + 0.1, index, str(value), va='center')
-    plt.gca().axes.get_xaxis().set_visible(False)
-
-    if save_path:
-        plt.savefig(save_path)
-    else:
-        plt.show()
-    plt.close()
+            plt.show()
+        plt.close()
@@ -1,9 +1,15 @@
-import pandas as pd
+from src.analysis.pandas.statuses import results_with_status
+from src.analysis.result_cache import cached
+from src.analysis.statuses import TECHNICAL
+from src.parsers.data_store import store
+from src.tracing import stage, traced
 
 
 # Which constructors have encountered the most technical failures?
 
 
+@traced
+@cached(('results', 'status', 'constructors'))
 def most_technical_issues_constructors(top_n=5):
     """
     Finds the top_n constructors with the highests technical issues records.
@@ -19,34 +25,29 @@ def most_technical_issues_constructors(top_n=5):
 
     """
 
-    results = pd.read_csv('./data/results.csv')
-    status = pd.read_csv('./data/status.csv')
-    constructors = pd.read_csv('./data/constructors.csv')
-
-    technical_statuses = [
-        'Engine', 'Transmission', 'Clutch', 'Hydraulics', 'Electrical',
-        'Suspension', 'Overheating', 'Fuel pressure', 'Fuel system',
-        'Oil leak', 'Water leak', 'Driveshaft', 'Exhaust',
-        'Power loss', 'Wheel', 'Brake failure', 'Chassis', 'Turbo'
-    ]
-
-    tech_status_ids = status[status['status'].isin(technical_statuses)]['statusId']
-    tech_failures = results[results['statusId'].isin(tech_status_ids)]
-
-    failure_counts = tech_failures['constructorId'].value_counts().head(top_n)
-
-    failure_counts_named = (
-        failure_counts.rename(
-            index=lambda i: constructors.loc[constructors['constructorId'] == i,
-                                             'name'].values[0]
-            )
-    )
-
-    lines = []
-    lines.append("Constructor                 Technical failures")
-    lines.append("----------------------------------------------")
-    for name, count in failure_counts_named.items():
-        lines.append(f"{name:<25} {count:>20}")
-    lines.append("----------------------------------------------")
-
-    return "\n".join(lines)
+    results = results_with_status()
+    constructors = store.table('constructors')
+
+    with stage('filter'):
+        tech_failures = results[(results['status_class'] & TECHNICAL) != 0]
+
+    with stage('aggregate'):
+        failure_counts = tech_failures['constructorId'].value_counts().head(top_n)
+
+    with stage('join'):
+        failure_counts_named = (
+            failure_counts.rename(
+                index=lambda i: constructors.loc[constructors['constructorId'] == i,
+                                                 'name'].values[0]
+                )
+        )
+
+    with stage('format'):
+        lines = []
+        lines.append("Constructor                 Technical failures")
+        lines.append("----------------------------------------------")
+        for name, count in failure_counts_named.items():
+            lines.append(f"{name:<25} {count:>20}")
+        lines.append("----------------------------------------------")
+
+        return "\n".join(lines)
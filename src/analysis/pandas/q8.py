@@ -1,12 +1,27 @@
-import pandas as pd
+import numpy as np
+
+from src.analysis.pandas.pit_stop_outliers import (DEFAULT_THRESHOLD,
+                                                   cleaned_statistics)
+from src.analysis.pit_stop_stats import PitStopStats, pit_stop_stats
+from src.analysis.result_cache import cached
+from src.tracing import stage, traced
 
 
 # What is the average pit stop time across races? The maximum? The minimum?
 
 
-def average_pit_stop_time(outliers=False, sup=60):
+def _seconds(milliseconds):
+    # rounded as a numpy float, as the pandas statistics always were: 59555 ms
+    # gives 59.56 s, where round on the Python float 59.555 gives 59.55
+    return round(np.float64(milliseconds) / 1000, 2)
+
+
+@traced
+@cached(('pit_stops', 'races', 'results'))
+def average_pit_stop_time(outliers=False, sup=60, method='sup',
+                          threshold=DEFAULT_THRESHOLD):
     """
-    Computes the average, minimum, and maximum pit stop times,
+    Computes the average, minimum, maximum and quantiles of the pit stop times,
     optionally excluding outliers.
 
     Parameters
@@ -16,6 +31,13 @@ def average_pit_stop_time(outliers=False, sup=60):
         If False, considers all pit stops.
     sup : float, optional
         Threshold value in seconds to define an outlier (default is 60 seconds).
+    method : str, optional
+        'sup' excludes the pit stops longer than `sup` seconds, 'mad' excludes
+        the pit stops that are anomalous within their race (robust z-score
+        based on the median absolute deviation, see pit_stop_outliers).
+    threshold : float, optional
+        Robust z-score above which a pit stop is an outlier with method 'mad'
+        (default is 3.5).
 
     Returns
     -------
@@ -24,26 +46,41 @@ def average_pit_stop_time(outliers=False, sup=60):
             - 'Mean' : average pit stop time in seconds (float)
             - 'Min' : shortest pit stop time in seconds (float)
             - 'Max' : longest pit stop time in seconds (float)
+            - 'Std' : standard deviation in seconds (float)
+            - 'P50', 'P90', 'P99' : quantiles in seconds, within 1% (float)
 
     """
 
-    pit_stops = pd.read_csv('./data/pit_stops.csv')
+    if method not in ('sup', 'mad'):
+        raise ValueError(f"Unknown outlier method: {method}")
 
-    if not outliers:
-        pit_stops = pit_stops[pit_stops['milliseconds']/1000 <= sup]
+    if not outliers and method == 'mad':
+        summary = cleaned_statistics(threshold)
+    else:
+        max_milliseconds = None if outliers else sup * 1000
+        # no group at all when every pit stop is excluded: NaN statistics
+        stats = pit_stop_stats(max_milliseconds)['global'].get(None, PitStopStats())
+        summary = stats.summary()
 
-    avg = round(pit_stops['milliseconds'].mean() / 1000, 2)
-    min_time = round(pit_stops['milliseconds'].min() / 1000, 2)
-    max_time = round(pit_stops['milliseconds'].max() / 1000, 2)
+    with stage('format'):
+        avg = _seconds(summary['mean'])
+        min_time = _seconds(summary['min'])
+        max_time = _seconds(summary['max'])
+        std = _seconds(summary['std'])
+        quantiles = {name: _seconds(summary[name]) for name in ('p50', 'p90', 'p99')}
 
-    tableau = (
-        "-------------------------------------\n"
-        " Statistic                     Value \n"
-        "--------------------------------------\n"
-        f" Mean                      {avg:10.2f} s \n"
-        f" Min                  {min_time:10.2f} s \n"
-        f" Max                  {max_time:10.2f} s \n"
-        "-------------------------------------"
-    )
+        tableau = (
+            "-------------------------------------\n"
+            " Statistic                     Value \n"
+            "--------------------------------------\n"
+            f" Mean                      {avg:10.2f} s \n"
+            f" Min                  {min_time:10.2f} s \n"
+            f" Max                  {max_time:10.2f} s \n"
+            f" Std                  {std:10.2f} s \n"
+            f" P50                  {quantiles['p50']:10.2f} s \n"
+            f" P90                  {quantiles['p90']:10.2f} s \n"
+            f" P99                  {quantiles['p99']:10.2f} s \n"
+            "-------------------------------------"
+        )
 
-    return tableau
+        return tableau
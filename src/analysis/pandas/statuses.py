@@ -0,0 +1,41 @@
+from src.analysis.statuses import classify
+from src.parsers.data_store import detached_copy, store
+
+
+def build_results_with_status():
+    """
+    Adds the status class of every result (see src.analysis.statuses) to the
+    results, as a bitmask column 'status_class' of type uint8.
+
+    The 141 statuses are classified once, then mapped onto the results with a
+    single vectorized lookup.
+
+    Returns
+    -------
+    pd.DataFrame
+
+    """
+    results = store.table('results')
+    status = store.table('status')
+
+    classes = status['status'].astype(str).map(classify)
+    classes.index = status['statusId']
+
+    results['status_class'] = (
+        results['statusId'].map(classes).fillna(0).astype('uint8')
+    )
+    return results
+
+
+def results_with_status():
+    """
+    Returns the results with their status class (see
+    build_results_with_status), computed once and kept until the results or
+    statuses change. As with DataStore.table, columns can be added or replaced
+    and 'status_class' can be modified in place without affecting the other
+    callers, but the columns of the results cannot be modified in place.
+
+    """
+    results = store.derived('pandas.results_with_status', build_results_with_status,
+                            ('results', 'status'))
+    return detached_copy(results, ['status_class'])
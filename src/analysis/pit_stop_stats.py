@@ -0,0 +1,323 @@
+import csv
+import io
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+from src.analysis.homemade.engine import lookup
+from src.parsers.bulk_load import CHUNK_SIZE, line_ranges, read_header
+from src.parsers.data_store import store
+
+
+# Statistics of the pit stop durations computed while streaming pit_stops.csv.
+# Every accumulator uses a bounded amount of memory and can be merged with
+# another one, so that chunks of the file are summarized by separate processes
+# and their partial results combined afterwards.
+
+BREAKDOWNS = ('global', 'race', 'season', 'constructor')
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+# Lookups of the worker processes of stream_pit_stop_stats, sent once to each
+# process by _set_lookups rather than with every chunk
+LOOKUPS = None
+
+
+class RunningStats:
+    """
+    Count, mean, variance, minimum and maximum of a stream of values, updated
+    with Welford's algorithm.
+
+    """
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        """
+        Adds the values summarized by another RunningStats (Chan et al.).
+
+        """
+        if other.count == 0:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    def std(self):
+        return math.sqrt(self.variance())
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with a relative accuracy guarantee (as DDSketch).
+
+    Positive values are counted in logarithmic buckets [gamma^(k-1), gamma^k),
+    so that any quantile is estimated within relative_accuracy of a value of
+    the stream. The number of buckets only depends on the range of the values;
+    beyond max_bins the lowest buckets are collapsed, which keeps the memory
+    bounded and only affects the accuracy of the lowest quantiles. Estimates
+    are clamped to the smallest and largest values of the stream.
+
+    """
+    __slots__ = ('relative_accuracy', 'gamma', 'log_gamma', 'max_bins', 'bins',
+                 'zeros', 'count', 'min', 'max')
+
+    def __init__(self, relative_accuracy=0.01, max_bins=2048):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.max_bins = max_bins
+        self.bins = dict()
+        self.zeros = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value <= 0:
+            self.zeros += 1
+            return
+        key = math.ceil(math.log(value) / self.log_gamma)
+        self.bins[key] = self.bins.get(key, 0) + 1
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def _collapse(self):
+        keys = sorted(self.bins)
+        excess = keys[:len(keys) - self.max_bins + 1]
+        target = keys[len(excess)]
+        self.bins[target] += sum(self.bins.pop(key) for key in excess)
+
+    def merge(self, other):
+        """
+        Adds the values summarized by another sketch of the same accuracy.
+
+        """
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches of different accuracies")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+        return self
+
+    def quantile(self, q):
+        """
+        Returns an estimate of the q-quantile (0 <= q <= 1), or NaN if the
+        sketch is empty.
+
+        """
+        if self.count == 0:
+            return math.nan
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if seen > rank:
+            return 0.0
+        key = max(self.bins)
+        for bin_key in sorted(self.bins):
+            seen += self.bins[bin_key]
+            if seen > rank:
+                key = bin_key
+                break
+        # the middle of the bucket can lie beyond the values it holds
+        estimate = 2 * self.gamma ** key / (self.gamma + 1)
+        return min(max(estimate, self.min), self.max)
+
+
+class PitStopStats:
+    """
+    Summary of a stream of pit stop durations: running statistics plus a
+    quantile sketch.
+
+    """
+    __slots__ = ('stats', 'sketch')
+
+    def __init__(self):
+        self.stats = RunningStats()
+        self.sketch = QuantileSketch()
+
+    def add(self, value):
+        self.stats.add(value)
+        self.sketch.add(value)
+
+    def merge(self, other):
+        self.stats.merge(other.stats)
+        self.sketch.merge(other.sketch)
+        return self
+
+    def summary(self):
+        """
+        Returns
+        -------
+        dict : 'count', 'mean', 'std', 'min', 'max' and one entry per quantile
+            of QUANTILES ('p50', 'p90', 'p99')
+
+        """
+        summary = {
+            'count': self.stats.count,
+            'mean': self.stats.mean if self.stats.count else math.nan,
+            'std': self.stats.std(),
+            'min': self.stats.min if self.stats.count else math.nan,
+            'max': self.stats.max if self.stats.count else math.nan,
+        }
+        for q in QUANTILES:
+            summary[f"p{round(q * 100)}"] = self.sketch.quantile(q)
+        return summary
+
+
+def collect_range(filepath, start, end, year_of, constructor_of,
+                  max_milliseconds=None):
+    """
+    Summarizes the pit stops between two byte offsets of pit_stops.csv.
+
+    Parameters
+    ----------
+    filepath : path to pit_stops.csv
+    start, end : byte range of whole lines (see bulk_load.line_ranges)
+    year_of : dict raceId -> year
+    constructor_of : dict (raceId, driverId) -> constructorId
+    max_milliseconds : pit stops longer than this are skipped (default: none)
+
+    Returns
+    -------
+    dict : breakdown name (see BREAKDOWNS) -> dict key -> PitStopStats, where
+        the key is a raceId, a year, a constructorId, or None for 'global'
+
+    """
+    header, _ = read_header(filepath)
+    race_index = header.index('raceId')
+    driver_index = header.index('driverId')
+    duration_index = header.index('milliseconds')
+
+    with open(filepath, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8')
+
+    partial = {name: dict() for name in BREAKDOWNS}
+    for line in csv.reader(io.StringIO(text, newline='')):
+        duration = int(line[duration_index])
+        if max_milliseconds is not None and duration > max_milliseconds:
+            continue
+        race_id = int(line[race_index])
+        keys = {
+            'global': None,
+            'race': race_id,
+            'season': year_of.get(race_id),
+            'constructor': constructor_of.get((race_id, int(line[driver_index]))),
+        }
+        for name, key in keys.items():
+            stats = partial[name].get(key)
+            if stats is None:
+                stats = partial[name][key] = PitStopStats()
+            stats.add(duration)
+    return partial
+
+
+def _set_lookups(year_of, constructor_of):
+    global LOOKUPS
+    LOOKUPS = (year_of, constructor_of)
+
+
+def _collect_chunk(filepath, start, end, max_milliseconds):
+    year_of, constructor_of = LOOKUPS
+    return collect_range(filepath, start, end, year_of, constructor_of,
+                         max_milliseconds)
+
+
+def merge_partials(partials):
+    """
+    Merges the results of collect_range on several chunks.
+
+    """
+    merged = {name: dict() for name in BREAKDOWNS}
+    for partial in partials:
+        for name, groups in partial.items():
+            for key, stats in groups.items():
+                if key in merged[name]:
+                    merged[name][key].merge(stats)
+                else:
+                    merged[name][key] = stats
+    return merged
+
+
+def stream_pit_stop_stats(max_milliseconds=None, workers=None,
+                          chunk_size=CHUNK_SIZE):
+    """
+    Computes the statistics of the pit stop durations in one pass over
+    pit_stops.csv: globally, per race, per season and per constructor.
+
+    The file is split into line-aligned chunks of about chunk_size bytes that
+    are summarized by separate processes (in this process if there is only one
+    chunk). The season and constructor lookups are sent once to each process.
+    Memory grows with the number of races and constructors, not with the
+    number of pit stops.
+
+    Parameters
+    ----------
+    max_milliseconds : pit stops longer than this are skipped (default: none)
+    workers : number of processes (default: number of CPUs)
+    chunk_size : approximate size in bytes of the chunk read by one process
+
+    Returns
+    -------
+    dict : breakdown name -> dict key -> PitStopStats (see collect_range)
+
+    """
+    filepath = store.path('pit_stops')
+    results = store.columns('results')
+    year_of = lookup(store.columns('races'), 'raceId', 'year')
+    constructor_of = dict(zip(zip(results['raceId'], results['driverId']),
+                              results['constructorId']))
+
+    ranges = line_ranges(filepath, chunk_size)
+    if len(ranges) <= 1:
+        partials = [collect_range(filepath, start, end, year_of, constructor_of,
+                                  max_milliseconds)
+                    for start, end in ranges]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_set_lookups,
+                                 initargs=(year_of, constructor_of)) as executor:
+            futures = [executor.submit(_collect_chunk, filepath, start, end,
+                                       max_milliseconds)
+                       for start, end in ranges]
+            partials = [future.result() for future in futures]
+    return merge_partials(partials)
+
+
+def pit_stop_stats(max_milliseconds=None):
+    """
+    Returns the pit stop statistics (see stream_pit_stop_stats), computed once
+    per threshold and kept until the tables they come from change.
+
+    """
+    return store.derived(f'pit_stop_stats.{max_milliseconds}',
+                         lambda: stream_pit_stop_stats(max_milliseconds),
+                         ('pit_stops', 'races', 'results'))
@@ -0,0 +1,202 @@
+"""
+Profiling of the questions with cProfile, and command line to trace or
+profile a question (the stages are recorded by src.tracing).
+
+Usage, from the project root:
+    python -m src.analysis.profiling ranking --chrome -o ranking.trace.json
+
+Any question can also be profiled with cProfile (`profile_question`), which
+writes a .pstats file and a collapsed-stack file for flame graph tools:
+    python -m src.analysis.profiling ranking 2021 --vanilla --cprofile --top 15
+
+"""
+import argparse
+import cProfile
+import inspect
+import io
+import os
+import pstats
+import time
+
+from src.tracing import tracing
+
+
+# Folder of the cProfile files written by default.
+PROFILE_DIR = os.path.join('.', 'profiles')
+
+
+def _frame(func):
+    filename, line, name = func
+    if filename == '~':
+        return name.replace(';', ',')
+    return f"{name} ({os.path.basename(filename)}:{line})".replace(';', ',')
+
+
+def collapsed_stacks(stats, min_microseconds=1, max_depth=128):
+    """
+    Folds the call graph of a profile into collapsed stacks, the input of the
+    flame graph tools (flamegraph.pl, inferno, speedscope).
+
+    cProfile only records who called whom, not whole stacks: the time of a
+    function is split between its callers in proportion to the time each
+    caller spent in it. Recursive calls end the stack.
+
+    Parameters
+    ----------
+    stats : pstats.Stats
+    min_microseconds : stacks shorter than this are dropped
+    max_depth : deepest stack kept
+
+    Returns
+    -------
+    list[str] : 'frame;frame;...;frame microseconds' lines, from the root
+
+    """
+    entries = stats.stats
+    callees = dict()
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, (_, _, own, cumulative) in callers.items():
+            callees.setdefault(caller, []).append((func, own, cumulative))
+
+    folded = dict()
+
+    def walk(func, stack, own, cumulative):
+        stack = stack + (func,)
+        if own * 1e6 >= min_microseconds:
+            key = ';'.join(_frame(frame) for frame in stack)
+            folded[key] = folded.get(key, 0) + own
+        total = entries[func][3]
+        if total <= 0 or len(stack) >= max_depth:
+            return
+        share = cumulative / total
+        for callee, callee_own, callee_cumulative in callees.get(func, ()):
+            if callee in stack or callee_cumulative * share * 1e6 < min_microseconds:
+                continue
+            walk(callee, stack, callee_own * share, callee_cumulative * share)
+
+    for func, (_, _, own, cumulative, callers) in entries.items():
+        # the call stopping the profiler is not part of the profiled code
+        if not callers and '_lsprof.Profiler' not in func[2]:
+            walk(func, (), own, cumulative)
+    return [f"{key} {round(seconds * 1e6)}" for key, seconds in folded.items()
+            if round(seconds * 1e6) > 0]
+
+
+def profile_call(func, args=(), top=20, sort='cumulative', output=None):
+    """
+    Runs a function once under cProfile.
+
+    Parameters
+    ----------
+    func : function to run
+    args : its arguments
+    top : number of functions listed in the report
+    sort : pstats order of the report ('cumulative', 'tottime', ...)
+    output : path prefix of the files to write: `output`.pstats (for pstats,
+        snakeviz, ...) and `output`.collapsed (for the flame graph tools);
+        nothing is written if None
+
+    Returns
+    -------
+    dict : 'result' of the call, 'stats' (pstats.Stats), 'report' (the top
+        functions, as text) and the 'files' written
+
+    """
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func, *args)
+
+    stats = pstats.Stats(profiler)
+    files = []
+    if output is not None:
+        directory = os.path.dirname(output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        stats.dump_stats(f"{output}.pstats")
+        with open(f"{output}.collapsed", 'w', encoding='utf-8') as f:
+            f.write("\n".join(collapsed_stacks(stats)) + "\n")
+        files = [f"{output}.pstats", f"{output}.collapsed"]
+
+    stream = io.StringIO()
+    stats.stream = stream
+    stats.strip_dirs().sort_stats(sort).print_stats(top)
+    return {'result': result, 'stats': stats, 'report': stream.getvalue().strip(),
+            'files': files}
+
+
+def profile_question(func, args=(), top=20, output=None, cold=False):
+    """
+    Profiles a question with cProfile (see profile_call), without the cache of
+    the answers and with its derived values (indexes, aggregate tables, ...)
+    computed again.
+
+    Parameters
+    ----------
+    cold : if True, the tables are read again from the CSV files too
+    output : path prefix of the files, or True to write them in PROFILE_DIR,
+        named after the question and the time
+
+    """
+    from src.parsers.data_store import store
+
+    uncached = inspect.unwrap(func)
+    if output is True:
+        output = os.path.join(PROFILE_DIR, f"{uncached.__name__}-"
+                                           f"{time.strftime('%Y%m%d-%H%M%S')}")
+    if cold:
+        store.invalidate()
+    else:
+        store.clear_derived()
+    return profile_call(uncached, args, top, output=output)
+
+
+def main(argv=None):
+    from src.analysis.questions import default_arguments, parse_arguments, question
+
+    parser = argparse.ArgumentParser(
+        description="Traces or profiles a question (see src/analysis/questions.py)"
+    )
+    parser.add_argument('question', help="key of the question")
+    parser.add_argument('arguments', nargs='*',
+                        help="arguments of the question (default: the defaults of "
+                             "the registry)")
+    parser.add_argument('--vanilla', action='store_true',
+                        help="run the vanilla version instead of the pandas one")
+    parser.add_argument('--cprofile', action='store_true',
+                        help="profile with cProfile instead of tracing the stages")
+    parser.add_argument('--top', type=int, default=20,
+                        help="number of functions listed with --cprofile")
+    parser.add_argument('-o', '--output',
+                        help="file to write the trace to, or with --cprofile path "
+                             "prefix of the .pstats and .collapsed files (default: "
+                             f"in {PROFILE_DIR})")
+    parser.add_argument('--chrome', action='store_true',
+                        help="write a Chrome trace-event file instead of JSON")
+    args = parser.parse_args(argv)
+
+    entry = question(args.question)
+    func = entry['vanilla'] if args.vanilla else entry['pandas']
+    if func is None:
+        parser.error(f"{entry['key']} has no vanilla version")
+    arguments = (parse_arguments(entry, args.arguments) if args.arguments
+                 else default_arguments(entry))
+
+    if args.cprofile:
+        report = profile_question(func, arguments, args.top, args.output or True)
+        print(report['report'])
+        for path in report['files']:
+            print(f"Written: {path}")
+        return
+
+    with tracing() as trace:
+        func(*arguments)
+
+    if args.output:
+        if args.chrome:
+            trace.write_chrome(args.output)
+        else:
+            trace.write_json(args.output)
+    print(trace.format())
+
+
+if __name__ == '__main__':
+    main()
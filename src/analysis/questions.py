@@ -0,0 +1,144 @@
+from src.analysis.homemade.mandatory1 import at_least_n_races_nopd
+from src.analysis.homemade.mandatory2 import ranking_nopd
+from src.analysis.homemade.q1 import driver_mean_grid_nopd
+from src.analysis.homemade.q2 import get_driver_with_most_dnfs_nopd
+from src.analysis.pandas.mandatory1 import at_least_n_races
+from src.analysis.pandas.mandatory2 import ranking
+from src.analysis.pandas.q1 import driver_mean_grid
+from src.analysis.pandas.q2 import get_driver_with_most_dnfs
+from src.analysis.pandas.q3 import most_dangerous_circuit
+from src.analysis.pandas.q4 import constructor_winner
+from src.analysis.pandas.q5_graph import most_constructor_championships_won
+from src.analysis.pandas.q6_graph import nationalities
+from src.analysis.pandas.q7 import most_technical_issues_constructors
+from src.analysis.pandas.q8 import average_pit_stop_time
+
+
+# Registry of the questions answered by the project, shared by the GUI and the
+# benchmarks. Each question has:
+#   - 'key' : short name used on the command line
+#   - 'title' : the question
+#   - 'pandas' : the pandas implementation
+#   - 'vanilla' : the implementation without pandas, or None
+#   - 'params' : parameters, as dicts with a label, a default value and a type
+#   - 'graph' : True if the question draws a graph instead of returning text
+QUESTIONS = [
+    {'key': 'wins',
+     'title': "Which drivers have won 30 or more races in their careers?",
+     'pandas': at_least_n_races, 'vanilla': at_least_n_races_nopd,
+     'params': [{"label": "Minimum wins:", "default": 30, "type": int}],
+     'graph': False},
+
+    {'key': 'ranking',
+     'title': "What was the final drivers ranking for the 2023 season?",
+     'pandas': ranking, 'vanilla': ranking_nopd,
+     'params': [{"label": "Year:", "default": 2023, "type": int}],
+     'graph': False},
+
+    {'key': 'mean_grid',
+     'title': "What is Lewis Hamilton's average starting position?",
+     'pandas': driver_mean_grid, 'vanilla': driver_mean_grid_nopd,
+     'params': [{"label": "First name:", "default": "Lewis", "type": str},
+                {"label": "Last name:", "default": "Hamilton", "type": str}],
+     'graph': False},
+
+    {'key': 'dnfs',
+     'title': "Which drivers have recorded the most DNFs in their careers?",
+     'pandas': get_driver_with_most_dnfs, 'vanilla': get_driver_with_most_dnfs_nopd,
+     'params': [],
+     'graph': False},
+
+    {'key': 'dangerous_circuit',
+     'title': "Which circuit has been the most dangerous historically?",
+     'pandas': most_dangerous_circuit, 'vanilla': None,
+     'params': [{"label": "Country:", "default": "", "type": str},
+                {"label": "From year:", "default": None, "type": int},
+                {"label": "To year:", "default": None, "type": int}],
+     'graph': False},
+
+    {'key': 'constructor_winner',
+     'title': "Which constructor won the Constructors’ Championship in 2023?",
+     'pandas': constructor_winner, 'vanilla': None,
+     'params': [{"label": "Year:", "default": 2023, "type": int}],
+     'graph': False},
+
+    {'key': 'championships',
+     'title': "Which constructors have won the most Constructors’ Championships?",
+     'pandas': most_constructor_championships_won, 'vanilla': None,
+     'params': [],
+     'graph': True},
+
+    {'key': 'nationalities',
+     'title': "Which nationality has the highest number of F1 drivers?",
+     'pandas': nationalities, 'vanilla': None,
+     'params': [],
+     'graph': True},
+
+    {'key': 'technical_issues',
+     'title': "Which constructors have encountered the most technical failures?",
+     'pandas': most_technical_issues_constructors, 'vanilla': None,
+     'params': [{"label": "Top:", "default": 5, "type": int}],
+     'graph': False},
+
+    {'key': 'pit_stops',
+     'title': "What is the average pit stop time across races?",
+     'pandas': average_pit_stop_time, 'vanilla': None,
+     'params': [{"label": "Outliers:", "default": "False", "type": bool},
+                {"label": "Sup:", "default": 60, "type": int},
+                {"label": "Method (sup/mad):", "default": "sup", "type": str},
+                {"label": "MAD threshold:", "default": 3.5, "type": float}],
+     'graph': False},
+]
+
+
+def question(key):
+    """
+    Returns the question of the registry with this key.
+
+    Raises
+    ------
+    KeyError : if there is no such question
+
+    """
+    for entry in QUESTIONS:
+        if entry['key'] == key:
+            return entry
+    raise KeyError(f"Unknown question: {key}")
+
+
+def parse_arguments(entry, values):
+    """
+    Converts arguments given as text (in the GUI, on the command line) to the
+    types of the parameters of a question. Empty values take the default of
+    their parameter (see default_arguments).
+
+    """
+    if len(values) != len(entry['params']):
+        raise ValueError(f"{entry['key']} expects {len(entry['params'])} "
+                         f"arguments, got {len(values)}")
+    arguments = []
+    for param, value, default in zip(entry['params'], values,
+                                     default_arguments(entry)):
+        value = value.strip()
+        if value == "":
+            value = default
+        elif param['type'] is bool:
+            value = value.lower() == 'true'
+        else:
+            value = param['type'](value)
+        arguments.append(value)
+    return arguments
+
+
+def default_arguments(entry):
+    """
+    Returns the default arguments of a question, converted to their types.
+
+    """
+    arguments = []
+    for param in entry['params']:
+        value = param['default']
+        if param['type'] is bool and isinstance(value, str):
+            value = value.lower() == 'true'
+        arguments.append(value)
+    return arguments
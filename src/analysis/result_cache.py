@@ -0,0 +1,201 @@
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+from collections import OrderedDict
+
+from src.parsers.data_store import store
+
+
+CACHE_DIR = os.path.join('.', '.cache', 'results')
+
+# Root of the package, whose source code is part of the keys (see code_version)
+SOURCE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ResultCache:
+    """
+    Cache of the answers to the questions, with an in-memory LRU tier and an
+    optional on-disk tier that survives restarts.
+
+    The disk tier is bounded too: it keeps at most disk_maxsize files and
+    removes the least recently used ones (by modification time, refreshed on
+    every disk hit), so that the entries of CSV files that changed, which are
+    never read again, are the first to go.
+
+    Keys are built by the `cached` decorator from the function, the version of
+    the code, its normalized arguments and the signatures of the CSV files it
+    reads, so an entry is never served once the code or one of these files
+    has changed.
+
+    """
+
+    def __init__(self, maxsize=256, disk_dir=None, disk_maxsize=1024):
+        self.maxsize = maxsize
+        self.disk_dir = disk_dir
+        self.disk_maxsize = disk_maxsize
+        self._entries = OrderedDict()
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0}
+
+    def enable_disk(self, disk_dir=CACHE_DIR):
+        """
+        Also keeps the entries in disk_dir (None disables the disk tier).
+
+        """
+        self.disk_dir = disk_dir
+
+    def _disk_path(self, key):
+        digest = hashlib.sha256(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.disk_dir, f"{digest}.pkl")
+
+    def get(self, key):
+        """
+        Returns (True, value) if key is cached, (False, None) otherwise.
+
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return True, self._entries[key]
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            try:
+                with open(path, 'rb') as f:
+                    stored_key, value = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                pass
+            else:
+                if stored_key == key:
+                    self._touch(path)
+                    self.stats['disk_hits'] += 1
+                    self._remember(key, value)
+                    return True, value
+        self.stats['misses'] += 1
+        return False, None
+
+    def put(self, key, value):
+        self._remember(key, value)
+        if self.disk_dir is not None:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            path = self._disk_path(key)
+            with open(f"{path}.tmp", 'wb') as f:
+                pickle.dump((key, value), f)
+            os.replace(f"{path}.tmp", path)
+            self._evict_disk()
+
+    @staticmethod
+    def _touch(path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _evict_disk(self):
+        files = []
+        for entry in os.scandir(self.disk_dir):
+            if entry.name.endswith('.pkl'):
+                try:
+                    files.append((entry.stat().st_mtime_ns, entry.path))
+                except OSError:
+                    pass
+        if len(files) <= self.disk_maxsize:
+            return
+        files.sort()
+        for _, path in files[:len(files) - self.disk_maxsize]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _remember(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self, disk=False):
+        """
+        Forgets every entry (and the files of the disk tier if disk is True)
+        and resets the counters.
+
+        """
+        self._entries.clear()
+        self.stats = dict.fromkeys(self.stats, 0)
+        if disk and self.disk_dir is not None and os.path.isdir(self.disk_dir):
+            for filename in os.listdir(self.disk_dir):
+                if filename.endswith('.pkl'):
+                    os.remove(os.path.join(self.disk_dir, filename))
+
+    def info(self):
+        """
+        Returns the counters and the number of entries in memory.
+
+        """
+        return {**self.stats, 'size': len(self._entries), 'maxsize': self.maxsize,
+                'disk': self.disk_dir is not None}
+
+
+cache = ResultCache()
+
+
+@functools.lru_cache(maxsize=None)
+def code_version(source_dir=SOURCE_DIR):
+    """
+    Returns a fingerprint of the Python source files of the package, computed
+    once per process, so that the answers stored on disk by another version of
+    the questions or of the code they call are never served.
+
+    """
+    digest = hashlib.sha256()
+    for folder, subfolders, filenames in os.walk(source_dir):
+        subfolders.sort()
+        for filename in sorted(filenames):
+            if filename.endswith('.py'):
+                path = os.path.join(folder, filename)
+                digest.update(os.path.relpath(path, source_dir).encode('utf-8'))
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+    return digest.hexdigest()
+
+
+def cached(tables, result_cache=None):
+    """
+    Decorator caching the answers of a question.
+
+    Parameters
+    ----------
+    tables : names of the tables read by the question, directly or through
+        derived values; their CSV signatures are part of the key, with the
+        version of the code (see code_version)
+    result_cache : ResultCache to use (default: the shared `cache`)
+
+    The decorated function keeps the original one as __wrapped__ (to time or
+    read it) and the tables it depends on as `tables`. Exceptions are not
+    cached, and calls with unhashable arguments are not cached either.
+
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            target = result_cache or cache
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (name, code_version(), tuple(bound.arguments.items()),
+                   tuple(store.signature(table) for table in tables))
+            try:
+                hash(key)
+            except TypeError:
+                return func(*args, **kwargs)
+            found, value = target.get(key)
+            if not found:
+                value = func(*args, **kwargs)
+                target.put(key, value)
+            return value
+
+        wrapper.tables = tuple(tables)
+        return wrapper
+    return decorator
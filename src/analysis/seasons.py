@@ -0,0 +1,53 @@
+from src.parsers.data_store import store
+
+
+# Index of the races of each season, shared by the vanilla and pandas questions
+# so that per-season queries never scan races.csv. It only uses the columns form
+# of the DataStore and can be imported without pandas.
+
+
+def build_season_index():
+    """
+    Groups the races by season in a single pass over races.csv.
+
+    Returns
+    -------
+    dict : year -> dict with, for this season:
+        - 'final_race_id' : raceId of the last round
+
+    """
+    races = store.columns('races')
+
+    rounds_by_year = dict()
+    for race_id, year, round_number in zip(races['raceId'], races['year'],
+                                           races['round']):
+        rounds_by_year.setdefault(year, []).append((round_number, race_id))
+
+    index = dict()
+    for year, rounds in rounds_by_year.items():
+        index[year] = {'final_race_id': max(rounds)[1]}
+    return index
+
+
+def season_index():
+    """
+    Returns the season index (see build_season_index), built once and kept
+    until races.csv changes.
+
+    """
+    return store.derived('seasons', build_season_index, ('races',))
+
+
+def season(yy):
+    """
+    Returns the entry of the season index for one year.
+
+    Raises
+    ------
+    ValueError : if no race took place that year
+
+    """
+    entry = season_index().get(yy)
+    if entry is None:
+        raise ValueError(f"No race in {yy}")
+    return entry
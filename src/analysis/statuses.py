@@ -0,0 +1,119 @@
+import re
+from array import array
+
+from src.parsers.data_store import store
+
+
+# Classes of the statuses of results.csv, as bits of a mask, so that a status
+# can belong to several classes (an accident is also a DNF). Every statusId is
+# classified once; questions then test bits instead of matching status names.
+FINISHED = 1
+LAPPED = 2
+NON_START = 4
+DNF = 8
+ACCIDENT = 16
+TECHNICAL = 32
+
+# Finished, possibly with laps down: the driver was classified at the end.
+CLASSIFIED = FINISHED | LAPPED
+
+CLASS_NAMES = {
+    FINISHED: 'finished',
+    LAPPED: 'lapped',
+    NON_START: 'non_start',
+    DNF: 'dnf',
+    ACCIDENT: 'accident',
+    TECHNICAL: 'technical',
+}
+
+LAPPED_PATTERN = re.compile(r'^\+\d+ Laps?$')
+
+NON_START_STATUSES = ['Withdrew', 'Did not start', 'Did not qualify',
+                      'Did not prequalify', '107% Rule']
+
+ACCIDENT_STATUSES = ['Accident', 'Collision', 'Spun off', 'Damage', 'Debris']
+
+TECHNICAL_STATUSES = [
+    'Engine', 'Transmission', 'Clutch', 'Hydraulics', 'Electrical',
+    'Suspension', 'Overheating', 'Fuel pressure', 'Fuel system',
+    'Oil leak', 'Water leak', 'Driveshaft', 'Exhaust',
+    'Power loss', 'Wheel', 'Brake failure', 'Chassis', 'Turbo'
+]
+
+
+def classify(status):
+    """
+    Returns the classes of a status as a bitmask.
+
+    Any status that is neither a finish (possibly lapped) nor a non-start is a
+    DNF; accidents and technical failures are DNFs too.
+
+    Parameters
+    ----------
+    status : str, e.g. 'Finished', '+2 Laps', 'Engine'
+
+    Returns
+    -------
+    int
+
+    """
+    if status == 'Finished':
+        return FINISHED
+    if LAPPED_PATTERN.match(status):
+        return LAPPED
+    if status in NON_START_STATUSES:
+        return NON_START
+    mask = DNF
+    if status in ACCIDENT_STATUSES:
+        mask |= ACCIDENT
+    if status in TECHNICAL_STATUSES:
+        mask |= TECHNICAL
+    return mask
+
+
+def build_status_classes():
+    """
+    Classifies every status of status.csv.
+
+    Returns
+    -------
+    dict : statusId -> bitmask
+
+    """
+    status = store.columns('status')
+    return {status_id: classify(name)
+            for status_id, name in zip(status['statusId'], status['status'])}
+
+
+def status_classes():
+    """
+    Returns the classes of every statusId (see build_status_classes), computed
+    once and kept until status.csv changes.
+
+    """
+    return store.derived('status_classes', build_status_classes, ('status',))
+
+
+def build_result_classes():
+    """
+    Looks up the status class of every row of results.csv.
+
+    Returns
+    -------
+    array : bitmask of each result, in the order of results.csv (0 for an
+        unknown statusId)
+
+    """
+    classes = status_classes()
+    return array('B', [classes.get(status_id, 0)
+                       for status_id in store.columns('results')['statusId']])
+
+
+def result_classes():
+    """
+    Returns the status class of every result (see build_result_classes),
+    computed once and kept until the results or statuses change.
+
+    """
+    return store.derived('result_classes', build_result_classes,
+                         ('results', 'status'))
@@ -2,26 +2,14 @@
 
 import pandas as pd
 
-# Vanilla
-from src.analysis.homemade.mandatory1 import at_least_n_races_nopd
-from src.analysis.homemade.mandatory2 import ranking_nopd
-from src.analysis.homemade.q1 import driver_mean_grid_nopd
-from src.analysis.homemade.q2 import get_driver_with_most_dnfs_nopd
-
-# Pandas
-from src.analysis.pandas.mandatory1 import at_least_n_races
-from src.analysis.pandas.mandatory2 import ranking
-from src.analysis.pandas.q1 import driver_mean_grid
-from src.analysis.pandas.q2 import get_driver_with_most_dnfs
-from src.analysis.pandas.q3 import most_dangerous_circuit
-from src.analysis.pandas.q4 import constructor_winner
-from src.analysis.pandas.q5_graph import most_constructor_championships_won
-from src.analysis.pandas.q6_graph import nationalities
-from src.analysis.pandas.q7 import most_technical_issues_constructors
-from src.analysis.pandas.q8 import average_pit_stop_time
-from src.analysis.compare import compare_execution_time
+# Questions (vanilla and pandas versions)
+from src.analysis.questions import QUESTIONS, default_arguments, parse_arguments
+from src.analysis.compare import compare_implementations, format_report
+from src.analysis.profiling import profile_question
+from src.analysis.result_cache import cache as result_cache
 
 # Clustering function
+from src.learning import feature_store
 from src.learning.clustering import cluster_driving_styles
 
 # Interface
@@ -156,6 +144,40 @@ def open_about_f1():
         tk.messagebox.showerror("Error", f"Cannot open about_f1.md : {str(e)}")
 
 
+def show_cache_statistics():
+    """
+    Shows the hit and miss counters of the cache of the answers.
+
+    """
+    info = result_cache.info()
+    calls = info['hits'] + info['disk_hits'] + info['misses']
+    hit_rate = (info['hits'] + info['disk_hits']) / calls if calls else 0
+    tk.messagebox.showinfo("Result cache",
+                           f"Hits (memory): {info['hits']}\n"
+                           f"Hits (disk): {info['disk_hits']}\n"
+                           f"Misses: {info['misses']}\n"
+                           f"Hit rate: {hit_rate:.0%}\n"
+                           f"Entries in memory: {info['size']}/{info['maxsize']}")
+
+
+def clear_cache():
+    """
+    Empties the cache of the answers, in memory and on disk, and the store of
+    the clustering features.
+
+    """
+    result_cache.clear(disk=True)
+    feature_store.clear()
+    tk.messagebox.showinfo("Result cache", "The cache has been cleared")
+
+
+result_cache.enable_disk()
+
+cache_menu = tk.Menu(menu, tearoff=0)
+cache_menu.add_command(label="Statistics", command=show_cache_statistics)
+cache_menu.add_command(label="Clear", command=clear_cache)
+menu.add_cascade(label="Cache", menu=cache_menu)
+
 menu.add_command(label="About F1", command=open_about_f1)
 interface.config(menu=menu)
 
@@ -248,10 +270,10 @@ def open_dual_code_window(title, func_pd, func_np):
     window.wait_window()
 
 
-def show_comparison_result(func_vanilla, func_pandas):
+def show_comparison_result(func_vanilla, func_pandas, args):
     """
-    Executes both a Vanilla Python and a Pandas function and compares their
-    execution time
+    Benchmarks both a Vanilla Python and a Pandas function and compares their
+    execution time and memory
 
     Parameters
     ----------
@@ -259,23 +281,87 @@ def show_comparison_result(func_vanilla, func_pandas):
         The base Python implementation
     func_pandas : function
         The Pandas implementation
+    args : list
+        Arguments given to both functions
 
     Displays
     --------
-    A message box with the execution time of each version and the time difference
+    A window with the load and compute times of each version (min, median, p95,
+    standard deviation), a confidence interval on the difference, and the
+    memory used by the load, transform and format stages of each version
 
     """
     try:
-        result = compare_execution_time(func_vanilla, func_pandas)
-        tk.messagebox.showinfo("Execution Time Comparison",
-                               f"Vanilla Python: {result['vanilla']:.6f} s\n"
-                               f"Pandas: {result['modules']:.6f} s\n"
-                               f"Difference: {result['difference']:.6f} s")
+        report = compare_implementations(func_vanilla, func_pandas, args)
     except Exception as e:
         tk.messagebox.showerror("Error", str(e))
+        return
+
+    window = ctk.CTkToplevel(interface)
+    window.title("Execution Time and Memory Comparison")
+    window.geometry("620x600")
+    window.configure(fg_color=BG_SUB)
+
+    ctk.CTkLabel(window, text="Execution times (ms) and memory (MiB)",
+                 font=("Verdana", 15, "bold")).pack(pady=10)
+    text_widget = tk.Text(window, wrap="none", font=("Courier", 11),
+                          bg="black", fg="white", height=24)
+    text_widget.insert("1.0", format_report(report))
+    text_widget.configure(state="disabled")
+    text_widget.pack(expand=True, fill="both", padx=20, pady=(0, 10))
+
+    def profile_both():
+        try:
+            reports = {
+                "Vanilla": profile_question(func_vanilla, args, output=True),
+                "Pandas": profile_question(func_pandas, args, output=True),
+            }
+        except Exception as e:
+            tk.messagebox.showerror("Error", str(e))
+            return
+        show_profile_result("Profiles (cProfile)", reports)
 
+    ctk.CTkButton(window, text="Profile both", command=profile_both).pack(pady=(0, 15))
 
-def open_question_window_with_input(title, func_pandas, func_nopd, param_info,
+    window.grab_set()
+    window.focus_set()
+    window.wait_window()
+
+
+def show_profile_result(title, reports):
+    """
+    Shows the hottest functions of cProfile runs (see profiling.profile_question)
+    and where their .pstats and collapsed-stack files were written
+
+    Parameters
+    ----------
+    title : str
+        The title of the window
+    reports : dict
+        Name of each run (e.g. "Vanilla", "Pandas") -> its profile report
+
+    """
+    window = ctk.CTkToplevel(interface)
+    window.title(title)
+    window.geometry("900x650")
+    window.configure(fg_color=BG_SUB)
+
+    ctk.CTkLabel(window, text=title, font=("Verdana", 15, "bold")).pack(pady=10)
+    text_widget = tk.Text(window, wrap="none", font=("Courier", 10),
+                          bg="black", fg="white")
+    for name, report in reports.items():
+        text_widget.insert("end", f"=== {name} ===\n{report['report']}\n\n")
+        for path in report['files']:
+            text_widget.insert("end", f"Written: {path}\n")
+        text_widget.insert("end", "\n")
+    text_widget.configure(state="disabled")
+    text_widget.pack(expand=True, fill="both", padx=20, pady=(0, 20))
+
+    window.grab_set()
+    window.focus_set()
+
+
+def open_question_window_with_input(title, func_pandas, func_nopd, entry,
                                     allow_toggle):
     """
     Opens a dynamic input window for a question, allowing the user to provide
@@ -289,11 +375,15 @@ def open_question_window_with_input(title, func_pandas, func_nopd, param_info,
         The Pandas version of the function to execute
     func_nopd : function
         The Vanilla Python version
-    param_info : list
-        List of dictionaries describing expected parameters (label, default value, type)
+    entry : dict
+        Entry of the question in the QUESTIONS registry, whose parameters (label,
+        default value, type) are asked for
     allow_toggle : bool
         If True, allows the user to select which implementation to run
 
+    The chosen implementation can be run under cProfile: its hottest functions
+    are then shown and its profile saved (see show_profile_result).
+
     """
     if title in [
         "Which constructors have won the most Constructors’ Championships?",
@@ -328,15 +418,19 @@ def open_question_window_with_input(title, func_pandas, func_nopd, param_info,
                            value=False).pack(side="left", padx=5)
         toggle.pack(pady=10)
 
-    entries = []
-    for info in param_info:
+    profile = tk.BooleanVar(value=False)
+    ctk.CTkCheckBox(window, text="Profile with cProfile (files written in ./profiles)",
+                    variable=profile).pack(pady=5)
+
+    fields = []
+    for info in entry['params']:
         frame = ctk.CTkFrame(window, fg_color="transparent")
         frame.pack(pady=5, padx=20, anchor="w")
         ctk.CTkLabel(frame, text=info["label"], font=("Verdana", 11)).pack(side='left')
-        entry = ctk.CTkEntry(frame, width=180)
-        entry.insert(0, str(info["default"]) if info["default"] is not None else "")
-        entry.pack(side='left', padx=8)
-        entries.append((entry, info["type"]))
+        field = ctk.CTkEntry(frame, width=180)
+        field.insert(0, str(info["default"]) if info["default"] is not None else "")
+        field.pack(side='left', padx=8)
+        fields.append(field)
 
     result_frame = ctk.CTkFrame(window, fg_color=BG_MAIN)
     result_frame.pack(pady=20, fill='x', padx=30)
@@ -345,22 +439,20 @@ def open_question_window_with_input(title, func_pandas, func_nopd, param_info,
 
     def run():
         try:
-            values = []
-            for entry, typ in entries:
-                val = entry.get().strip()
-                if val == "" and typ != str:
-                    val = None
-                elif typ == int:
-                    val = int(val)
-                elif typ == bool:
-                    val = val.lower() == "true"
-                values.append(val)
+            values = parse_arguments(entry, [field.get() for field in fields])
             if allow_toggle and use_pandas.get():
                 chosen_func = func_pandas
             else:
                 chosen_func = func_nopd
-            result = chosen_func(*values)
+            if profile.get():
+                report = profile_question(chosen_func, values, output=True)
+                result = report['result']
+            else:
+                result = chosen_func(*values)
             result_label.configure(text=f"{result}")
+            if profile.get():
+                show_profile_result(f"Profile (cProfile) - {title}",
+                                    {chosen_func.__name__: report})
         except Exception as e:
             tk.messagebox.showerror("Error", str(e))
 
@@ -373,65 +465,26 @@ def open_question_window_with_input(title, func_pandas, func_nopd, param_info,
 
 # Questions
 question_data = [
-    ("Which drivers have won 30 or more races in their careers?",
-     at_least_n_races, at_least_n_races_nopd,
-     [{"label": "Minimum wins:", "default": 30, "type": int}], True),
-
-    ("What was the final drivers ranking for the 2023 season?",
-     ranking, ranking_nopd,
-     [{"label": "Year:", "default": 2023, "type": int}], True),
-
-    ("What is Lewis Hamilton's average starting position?",
-     driver_mean_grid, driver_mean_grid_nopd,
-     [{"label": "First name:", "default": "Lewis", "type": str},
-      {"label": "Last name:", "default": "Hamilton", "type": str}], True),
-
-    ("Which drivers have recorded the most DNFs in their careers?",
-     get_driver_with_most_dnfs, get_driver_with_most_dnfs_nopd,
-     [], True),
-
-    ("Which circuit has been the most dangerous historically?",
-     most_dangerous_circuit, most_dangerous_circuit,
-     [{"label": "Country:", "default": "", "type": str}], False),
-
-    ("Which constructor won the Constructors’ Championship in 2023?",
-     constructor_winner, constructor_winner,
-     [{"label": "Year:", "default": 2023, "type": int}], False),
-
-    ("Which constructors have won the most Constructors’ Championships?",
-     most_constructor_championships_won, most_constructor_championships_won,
-     [], False),
-
-    ("Which nationality has the highest number of F1 drivers?",
-     nationalities, nationalities,
-     [], False),
-
-    ("Which constructors have encountered the most technical failures?",
-     most_technical_issues_constructors, most_technical_issues_constructors,
-     [{"label": "Top:", "default": 5, "type": int}], False),
-
-    ("What is the average pit stop time across races?",
-     average_pit_stop_time, average_pit_stop_time,
-     [{"label": "Outliers:", "default": "False", "type": bool},
-      {"label": "Sup:", "default": 60, "type": int}], False)
+    (entry['title'], entry['pandas'], entry['vanilla'] or entry['pandas'],
+     entry, entry['vanilla'] is not None)
+    for entry in QUESTIONS
 ]
 
 # Display
 questions = ctk.CTkFrame(interface, corner_radius=15, fg_color=BG_MAIN)
 questions.pack(padx=30, pady=20, fill='x', expand=True)
 
-for i, (title, func_pd, func_np, params, toggle) in enumerate(question_data):
+for title, func_pd, func_np, entry, toggle in question_data:
     frame = ctk.CTkFrame(questions, corner_radius=10, fg_color=BG_SUB)
     frame.columnconfigure(0, weight=1)
 
     ctk.CTkLabel(frame, text=title, font=("Verdana", 14), anchor="w").grid(
         row=0, column=0, sticky="w", padx=10, pady=5)
 
-    if i < 4:
-        def make_compare_callback(f_np=func_np, f_pd=func_pd, p=params):
+    if toggle:
+        def make_compare_callback(f_np=func_np, f_pd=func_pd, e=entry):
             def callback():
-                args = [arg["default"] for arg in p]
-                show_comparison_result(lambda: f_np(*args), lambda: f_pd(*args))
+                show_comparison_result(f_np, f_pd, default_arguments(e))
             return callback
 
         ctk.CTkButton(
@@ -457,8 +510,8 @@ for i, (title, func_pd, func_np, params, toggle) in enumerate(question_data):
     ctk.CTkButton(
         frame, text="Answer", corner_radius=8, width=100, height=30,
         fg_color=BTN_COLOR, hover_color=BTN_HOVER,
-        command=lambda t=title, fpd=func_pd, fnp=func_np, p=params, tog=toggle:
-            open_question_window_with_input(t, fpd, fnp, p, tog)
+        command=lambda t=title, fpd=func_pd, fnp=func_np, e=entry, tog=toggle:
+            open_question_window_with_input(t, fpd, fnp, e, tog)
     ).grid(row=0, column=3, padx=(5, 10), pady=5, sticky="e")
 
     frame.pack(pady=8, padx=10, fill='x', expand=True)
@@ -503,7 +556,7 @@ def open_export_window():
 
     export_data = []
 
-    def make_selector(title, func_pd, func_np, param_info, allow_toggle):
+    def make_selector(title, func_pd, func_np, entry, allow_toggle):
         frame = ctk.CTkFrame(scrollable_frame, fg_color=BG_SUB, corner_radius=10)
         frame.pack(pady=10, padx=20, fill="x")
 
@@ -525,22 +578,23 @@ def open_export_window():
                                variable=use_pd,
                                value=False).pack(side="left", padx=5)
 
-        param_entries = []
-        for param in param_info:
+        fields = []
+        for param in entry['params']:
             entry_frame = ctk.CTkFrame(frame, fg_color="transparent")
             entry_frame.pack(anchor="w", pady=4, padx=10)
             ctk.CTkLabel(entry_frame, text=param["label"], font=("Verdana", 11),
                          text_color="white").pack(side="left")
-            entry = ctk.CTkEntry(entry_frame, width=140)
-            entry.insert(0, str(param["default"]))
-            entry.pack(side="left", padx=10)
-            param_entries.append((entry, param["type"]))
+            field = ctk.CTkEntry(entry_frame, width=140)
+            field.insert(0, str(param["default"]) if param["default"] is not None
+                         else "")
+            field.pack(side="left", padx=10)
+            fields.append(field)
 
-        export_data.append((title, func_pd, func_np, use_pd,
-                            param_entries, allow_toggle))
+        export_data.append((title, func_pd, func_np, use_pd, entry, fields,
+                            allow_toggle))
 
-    for title, fpd, fnp, params, toggle in question_data:
-        make_selector(title, fpd, fnp, params, toggle)
+    for title, fpd, fnp, entry, toggle in question_data:
+        make_selector(title, fpd, fnp, entry, toggle)
 
     def export():
         import os
@@ -550,16 +604,9 @@ def open_export_window():
         if not dir_path:
             return
 
-        for title, fpd, fnp, use_pd, entries, allow_toggle in export_data:
+        for title, fpd, fnp, use_pd, entry, fields, allow_toggle in export_data:
             try:
-                args = []
-                for entry, typ in entries:
-                    val = entry.get().strip()
-                    if typ == int:
-                        val = int(val)
-                    elif typ == bool:
-                        val = val.lower() == "true"
-                    args.append(val)
+                args = parse_arguments(entry, [field.get() for field in fields])
                 func = fpd if allow_toggle and use_pd.get() else fnp
 
                 if func.__name__ in ["most_constructor_championships_won",
@@ -638,6 +685,7 @@ def open_kmeans_window():
     - The elbow method graph
     - The PCA projection of clusters
     - The contributions of features to the principal components
+    - The scores of every number of clusters
     - A preview of the clusters
 
     Exports results to a folder chosen by the user.
@@ -671,9 +719,11 @@ def open_kmeans_window():
         shutil.move("pca_visualization.png", f"{folder}/pca_visualization.png")
         shutil.move("pca_contributions.csv", f"{folder}/pca_contributions.csv")
         shutil.move("clusters.csv", f"{folder}/clusters.csv")
+        shutil.move("model_selection.csv", f"{folder}/model_selection.csv")
 
         pca_contrib = pd.read_csv(f"{folder}/pca_contributions.csv", index_col=0)
         cluster_sample = pd.read_csv(f"{folder}/clusters.csv")
+        model_scores = pd.read_csv(f"{folder}/model_selection.csv")
 
         # Elbow method graph
         frame1 = ctk.CTkFrame(scrollable_frame)
@@ -705,6 +755,18 @@ def open_kmeans_window():
         contrib_text.config(state="disabled")
         contrib_text.pack(padx=20, pady=20, fill="x")
 
+        # Scores of the number of clusters
+        scores_text = tk.Text(scrollable_frame, height=2 + len(model_scores),
+                              font=("Courier", 10), bg="black", fg="white")
+        scores_text.insert("1.0", "Model selection (k / inertia / silhouette / "
+                                  "Davies-Bouldin):\n")
+        for row in model_scores.itertuples(index=False):
+            line = (f"{row.k:<4} : {row.inertia:>10.1f} / {row.silhouette:.4f} / "
+                    f"{row.davies_bouldin:.4f}\n")
+            scores_text.insert("end", line)
+        scores_text.config(state="disabled")
+        scores_text.pack(padx=20, pady=20, fill="x")
+
         # Preview of clusters
         cluster_sample = cluster_sample.head(10)
         preview_text = tk.Text(scrollable_frame,
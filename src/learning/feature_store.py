@@ -0,0 +1,286 @@
+"""
+Persisted store of the per-driver features used by the clustering.
+
+The features are computed in groups, one per source table, and each group
+is saved as .npy files with the fingerprints of its tables and its version.
+A group is computed again only when one of its tables changed or its
+definition did (bump its version, or FEATURE_VERSION for all of them);
+otherwise it is read back without loading its tables.
+
+"""
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.pandas.statuses import results_with_status
+from src.analysis.statuses import CLASSIFIED
+from src.parsers.data_store import store
+from src.parsers.snapshot import file_hash, file_signature, is_valid
+from src.tracing import stage
+
+
+CACHE_DIR = os.path.join('.', '.cache', 'features')
+
+# Version of the feature definitions shared by every group.
+FEATURE_VERSION = 1
+
+
+def _results_features():
+    results = results_with_status()
+
+    position = pd.to_numeric(results['positionOrder'], errors='coerce')
+    finished = (results['status_class'] & CLASSIFIED) != 0
+    columns = pd.DataFrame({
+        'driverId': results['driverId'],
+        'position': position,
+        'position_gain': pd.to_numeric(results['grid'], errors='coerce') - position,
+        'win': position == 1,
+        'podium': position <= 3,
+        'finished': finished,
+        'finished_podium': finished & (position <= 3),
+    })
+
+    features = columns.groupby('driverId').agg(
+        avg_position_gain=('position_gain', 'mean'),
+        win_rate=('win', 'mean'),
+        podium_rate=('podium', 'mean'),
+        finish_rate=('finished', 'mean'),
+        mean_race_position=('position', 'mean'),
+        position_std=('position', 'std'),
+        finished_podiums=('finished_podium', 'sum'),
+        finishes=('finished', 'sum'),
+    )
+    # NaN for the drivers who never finished, as the mean over no race
+    features['podium_when_finished_rate'] = (features.pop('finished_podiums') /
+                                             features.pop('finishes'))
+    return features
+
+
+def _lap_times_features():
+    lap_times = store.table('lap_times')
+    return lap_times.groupby('driverId')['milliseconds'].agg(avg_lap_time='mean',
+                                                             std_lap_time='std')
+
+
+def _qualifying_features():
+    qualifying = store.table('qualifying')
+    for q in ['q1', 'q2', 'q3']:
+        qualifying[q] = pd.to_numeric(qualifying[q], errors='coerce')
+    qualifying['mean_qualifying_position'] = qualifying[['q1', 'q2', 'q3']].mean(axis=1)
+    return qualifying.groupby('driverId')[['mean_qualifying_position']].mean()
+
+
+def _pit_stops_features():
+    pit_stops = store.table('pit_stops')
+    return pit_stops.groupby('driverId')['milliseconds'].agg(
+        avg_pit_stop_time='mean', avg_pit_stop_count='count'
+    )
+
+
+def _names():
+    drivers = store.table('drivers')
+    return (drivers[['driverId', 'forename', 'surname']]
+            .astype({'forename': object, 'surname': object})
+            .set_index('driverId'))
+
+
+# Groups of features: name -> tables they are computed from, version of their
+# definition, and function computing them as a frame indexed by driverId.
+FEATURE_GROUPS = {
+    'results': {'tables': ('results', 'status'), 'version': 1,
+                'build': _results_features},
+    'lap_times': {'tables': ('lap_times',), 'version': 1,
+                  'build': _lap_times_features},
+    'qualifying': {'tables': ('qualifying',), 'version': 1,
+                   'build': _qualifying_features},
+    'pit_stops': {'tables': ('pit_stops',), 'version': 1,
+                  'build': _pit_stops_features},
+    'names': {'tables': ('drivers',), 'version': 1, 'build': _names},
+}
+
+# Columns of the feature matrix, in order, and the groups they come from.
+FEATURE_COLUMNS = [
+    ('results', ['avg_position_gain', 'win_rate', 'podium_rate', 'finish_rate']),
+    ('lap_times', ['avg_lap_time', 'std_lap_time']),
+    ('qualifying', ['mean_qualifying_position']),
+    ('pit_stops', ['avg_pit_stop_time', 'avg_pit_stop_count']),
+]
+
+
+def group_dir(name, cache_dir=CACHE_DIR):
+    """
+    Returns the folder of a group of features computed from the data folder
+    of the store.
+
+    """
+    suffix = hashlib.sha1(os.path.abspath(store.data_dir).encode('utf-8'))
+    return os.path.join(cache_dir, f"{name}-{suffix.hexdigest()[:12]}")
+
+
+def _read_meta(folder):
+    try:
+        with open(os.path.join(folder, 'meta.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(folder, meta):
+    with open(os.path.join(folder, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=1)
+
+
+def is_fresh(name, meta):
+    """
+    Checks whether a saved group still matches its definition and its tables
+    (see snapshot.is_valid for the comparison of the files).
+
+    """
+    group = FEATURE_GROUPS[name]
+    if meta is None or meta['version'] != [FEATURE_VERSION, group['version']]:
+        return False
+    return all(is_valid(store.path(table), {'source': meta['sources'][table]})
+               for table in group['tables'])
+
+
+def save_group(name, frame, folder):
+    """
+    Writes a group of features: its index and each of its columns as .npy
+    files, and its version and the fingerprints of its tables in meta.json.
+
+    """
+    group = FEATURE_GROUPS[name]
+    sources = dict()
+    for table in group['tables']:
+        sources[table] = file_signature(store.path(table))
+        sources[table]['sha256'] = file_hash(store.path(table))
+
+    tmp = folder + '.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    np.save(os.path.join(tmp, 'index.npy'), frame.index.to_numpy())
+    columns = []
+    for i, column in enumerate(frame.columns):
+        values = frame[column].to_numpy()
+        if values.dtype == object:
+            values = values.astype(str)
+        np.save(os.path.join(tmp, f"{i}.npy"), values)
+        columns.append({'name': column, 'file': f"{i}.npy",
+                        'text': frame[column].dtype == object})
+    _write_meta(tmp, {'version': [FEATURE_VERSION, group['version']],
+                      'sources': sources, 'index': frame.index.name,
+                      'columns': columns})
+
+    shutil.rmtree(folder, ignore_errors=True)
+    os.replace(tmp, folder)
+
+
+def load_group(folder, meta):
+    """
+    Reads a group of features written by save_group.
+
+    """
+    index = pd.Index(np.load(os.path.join(folder, 'index.npy')), name=meta['index'])
+    data = dict()
+    for column in meta['columns']:
+        values = np.load(os.path.join(folder, column['file']))
+        data[column['name']] = values.astype(object) if column['text'] else values
+    return pd.DataFrame(data, index=index)
+
+
+def feature_group(name, cache_dir=CACHE_DIR):
+    """
+    Returns a group of features, read from the store of features if it is
+    fresh, computed (and saved) otherwise.
+
+    """
+    folder = group_dir(name, cache_dir)
+    meta = _read_meta(folder)
+    if is_fresh(name, meta):
+        # tables touched without changing: keep their new signature so that
+        # they are not hashed again
+        touched = False
+        for table in FEATURE_GROUPS[name]['tables']:
+            signature = file_signature(store.path(table))
+            if signature['mtime_ns'] != meta['sources'][table]['mtime_ns']:
+                meta['sources'][table].update(signature)
+                touched = True
+        if touched:
+            _write_meta(folder, meta)
+        with stage('load', features=name):
+            return load_group(folder, meta)
+    with stage('aggregate', features=name):
+        frame = FEATURE_GROUPS[name]['build']()
+    os.makedirs(cache_dir, exist_ok=True)
+    save_group(name, frame, folder)
+    return frame
+
+
+def assemble(groups):
+    """
+    Assembles the feature matrix of the drivers from the groups of features,
+    aligned on their index.
+
+    Parameters
+    ----------
+    groups : dict
+        Group name -> frame of features indexed by driverId (see
+        FEATURE_GROUPS)
+
+    Returns
+    -------
+    DataFrame : one row per driver found in the results, lap times,
+        qualifying sessions or pit stops (by driverId), with its driverId,
+        features, forename, surname and name; missing values are 0
+
+    """
+    index = groups['results'].index
+    for name, _ in FEATURE_COLUMNS[1:]:
+        index = index.union(groups[name].index)
+    df_pilotes = pd.concat([groups[name][columns].reindex(index)
+                            for name, columns in FEATURE_COLUMNS], axis=1)
+
+    names = groups['names'].reindex(index)
+    df_pilotes['forename'] = names['forename']
+    df_pilotes['surname'] = names['surname']
+    df_pilotes['name'] = names['forename'] + ' ' + names['surname']
+
+    results = groups['results'].reindex(index)
+    df_pilotes['qualif_vs_race_delta'] = (df_pilotes['mean_qualifying_position'] -
+                                          results['mean_race_position'])
+    df_pilotes['position_std'] = results['position_std']
+    df_pilotes['podium_when_finished_rate'] = results['podium_when_finished_rate']
+
+    return df_pilotes.rename_axis('driverId').reset_index().fillna(0)
+
+
+def build_driver_features(cache_dir=CACHE_DIR):
+    """
+    Returns the feature matrix of the drivers (see assemble), from the groups
+    of features of the store.
+
+    """
+    return assemble({name: feature_group(name, cache_dir) for name in FEATURE_GROUPS})
+
+
+def driver_features():
+    """
+    Returns the feature matrix of the drivers (see build_driver_features),
+    kept in the data store until one of its tables changes.
+
+    """
+    tables = [table for group in FEATURE_GROUPS.values() for table in group['tables']]
+    return store.derived('learning.driver_features', build_driver_features,
+                         tables).copy()
+
+
+def clear(cache_dir=CACHE_DIR):
+    """
+    Deletes the saved features, so that they are computed again.
+
+    """
+    shutil.rmtree(cache_dir, ignore_errors=True)
@@ -0,0 +1,105 @@
+"""
+Selection of the number of clusters: fits one model per candidate k, in
+parallel processes, and scores each of them in the same pass.
+
+"""
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import davies_bouldin_score, silhouette_score
+from threadpoolctl import threadpool_limits
+
+
+# Above this many rows, the silhouette (which compares every pair of rows) is
+# computed on a random sample of them.
+SILHOUETTE_SAMPLE = 10000
+
+
+def fit_candidate(X, k, mini_batch=False, random_state=42, n_init=10,
+                  blas_threads=None):
+    """
+    Fits a model with k clusters and scores it.
+
+    Parameters
+    ----------
+    X : array of shape (rows, features)
+    k : number of clusters
+    mini_batch : bool
+        If True, fits a MiniBatchKMeans, faster on large matrices, instead of
+        a KMeans
+    random_state, n_init : passed to the model
+    blas_threads : maximum number of BLAS and OpenMP threads (default: no
+        limit)
+
+    Returns
+    -------
+    dict : k, fitted model, its labels, inertia, silhouette and Davies-Bouldin
+        scores (NaN when they are not defined, with a single cluster)
+
+    """
+    model_class = MiniBatchKMeans if mini_batch else KMeans
+    with threadpool_limits(limits=blas_threads):
+        model = model_class(n_clusters=k, random_state=random_state, n_init=n_init)
+        labels = model.fit_predict(X)
+
+        silhouette = davies_bouldin = math.nan
+        if 1 < len(set(labels)) < len(X):
+            sample_size = SILHOUETTE_SAMPLE if len(X) > SILHOUETTE_SAMPLE else None
+            silhouette = silhouette_score(X, labels, sample_size=sample_size,
+                                          random_state=random_state)
+            davies_bouldin = davies_bouldin_score(X, labels)
+
+    return {'k': k, 'model': model, 'labels': labels, 'inertia': model.inertia_,
+            'silhouette': float(silhouette), 'davies_bouldin': float(davies_bouldin)}
+
+
+def select_models(X, ks=range(1, 11), mini_batch=False, workers=None,
+                  blas_threads=None, random_state=42, n_init=10):
+    """
+    Fits and scores a model for every candidate number of clusters (see
+    fit_candidate), several at once in separate processes.
+
+    Parameters
+    ----------
+    X : array of shape (rows, features)
+    ks : candidate numbers of clusters
+    mini_batch : bool
+        If True, fits MiniBatchKMeans models instead of KMeans
+    workers : number of processes (default: number of CPUs, at most one per
+        candidate); with 1, the models are fitted in this process
+    blas_threads : threads of each process (default: the CPUs shared between
+        the processes, so that they do not compete for them)
+    random_state, n_init : passed to the models
+
+    Returns
+    -------
+    list : the fitted candidates, by increasing k
+
+    """
+    ks = list(ks)
+    if workers is None:
+        workers = min(len(ks), os.cpu_count() or 1)
+    if workers <= 1:
+        return [fit_candidate(X, k, mini_batch, random_state, n_init, blas_threads)
+                for k in ks]
+
+    if blas_threads is None:
+        blas_threads = max(1, (os.cpu_count() or 1) // workers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(fit_candidate, X, k, mini_batch, random_state,
+                                   n_init, blas_threads)
+                   for k in ks]
+        return [future.result() for future in futures]
+
+
+def scores_table(candidates):
+    """
+    Returns the scores of the candidates, one row per k.
+
+    """
+    return pd.DataFrame([{key: candidate[key]
+                          for key in ['k', 'inertia', 'silhouette', 'davies_bouldin']}
+                         for candidate in candidates])
@@ -0,0 +1,179 @@
+import csv
+import io
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from src.parsers.parse_columns import (SCHEMAS, DictColumn, _convert, _infer_type,
+                                       string_table, table_name)
+
+
+CHUNK_SIZE = 8 << 20
+
+
+def read_header(filepath, delimiter=','):
+    """
+    Returns the column names of a CSV file and the offset of its first data line.
+
+    """
+    with open(filepath, 'rb') as f:
+        line = f.readline()
+        return next(csv.reader([line.decode('utf-8')], delimiter=delimiter)), f.tell()
+
+
+def line_ranges(filepath, chunk_size=CHUNK_SIZE):
+    """
+    Splits the data lines of a CSV file into byte ranges of about chunk_size bytes.
+
+    Each range starts at the beginning of a line and ends at the beginning of
+    another one (or at the end of the file). Fields containing line breaks are
+    not supported: the Ergast files have none.
+
+    Returns
+    -------
+    list[tuple] : (start, end) offsets
+
+    """
+    _, start = read_header(filepath)
+    size = os.path.getsize(filepath)
+    ranges = []
+    with open(filepath, 'rb') as f:
+        while start < size:
+            f.seek(min(start + chunk_size, size))
+            f.readline()
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def parse_range(filepath, start, end, columns, schema, delimiter=','):
+    """
+    Parses the lines between two byte offsets of a CSV file into typed columns.
+
+    Returns
+    -------
+    dict : column name -> (type, typed column)
+
+    """
+    header, _ = read_header(filepath, delimiter)
+    indices = [header.index(column) for column in columns]
+    with open(filepath, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8')
+
+    raw = [[] for _ in columns]
+    for line in csv.reader(io.StringIO(text, newline=''), delimiter=delimiter):
+        for values, index in zip(raw, indices):
+            values.append(line[index])
+
+    parsed = dict()
+    for column, values in zip(columns, raw):
+        kind = schema.get(column) or _infer_type(values)
+        parsed[column] = (kind, _convert(values, kind))
+    return parsed
+
+
+def _concatenate(filepath, column, parts):
+    """
+    Assembles the typed chunks of a column.
+
+    Integer and float chunks of an inferred column are widened to floats, chunks
+    containing only nulls take the type of the others and dictionary-encoded
+    chunks are re-encoded with the string table of this process.
+
+    """
+    kinds = {kind for kind, values in parts
+             if not (isinstance(values, list) and values.count(None) == len(values))}
+    if len(kinds) == 1:
+        kind = kinds.pop()
+        parts = [(kind, values) if kind != 'd' or isinstance(values, array)
+                 else (kind, array('d', [float('nan')] * len(values)))
+                 for _, values in parts]
+    elif len(kinds) > 1:
+        if kinds != {'i', 'd'}:
+            raise ValueError(f"Column {column} of {filepath} mixes text and numbers: "
+                             "declare its type in SCHEMAS")
+        parts = [('d', array('d', [float('nan') if value is None else value
+                                   for value in values]))
+                 for _, values in parts]
+
+    kind = parts[0][0]
+    values = [values for _, values in parts]
+    if kind == 'c':
+        # codes of a worker process refer to its own copy of the string table
+        codes = array('i')
+        strings = string_table()
+        for chunk in values:
+            if chunk.table is strings:
+                codes.extend(chunk.codes)
+                continue
+            mapping = {-1: -1}
+            for code in chunk.codes:
+                if code not in mapping:
+                    mapping[code] = strings.encode(chunk.table.strings[code])
+                codes.append(mapping[code])
+        return DictColumn(codes, strings)
+    if kind == 's' or any(isinstance(chunk, list) for chunk in values):
+        merged = []
+        for chunk in values:
+            merged.extend(chunk)
+        return merged
+    merged = array(values[0].typecode)
+    for chunk in values:
+        merged.extend(chunk)
+    return merged
+
+
+def load_tables(names, data_dir=os.path.join('.', 'data'), usecols=None,
+                workers=None, chunk_size=CHUNK_SIZE):
+    """
+    Parses several CSV files concurrently into typed columns.
+
+    Every file is split into line-aligned byte ranges of about chunk_size bytes,
+    so that the large tables (results, driver_standings, lap_times, ...) are
+    parsed by several processes at once and the small ones do not wait for them.
+    The result is the same as calling parse_columns on each file.
+
+    Parameters
+    ----------
+    names : list of table names (e.g. 'results' for results.csv)
+    data_dir : folder containing the CSV files
+    usecols : dict mapping a table name to the list of its columns to keep
+        (default: all of them)
+    workers : number of processes (default: number of CPUs)
+    chunk_size : approximate size in bytes of the part of a file parsed by
+        one process
+
+    Returns
+    -------
+    dict : table name -> dict of typed columns
+
+    """
+    usecols = usecols or dict()
+    tasks = []
+    for name in names:
+        filepath = os.path.join(data_dir, f"{name}.csv")
+        header, _ = read_header(filepath)
+        columns = usecols.get(name) or header
+        unknown = [column for column in columns if column not in header]
+        if unknown:
+            raise ValueError(f"Unknown columns in {filepath}: {', '.join(unknown)}")
+        schema = SCHEMAS.get(table_name(filepath), {})
+        for start, end in line_ranges(filepath, chunk_size) or [(0, 0)]:
+            tasks.append((name, filepath, start, end, columns, schema))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(parse_range, filepath, start, end, columns, schema)
+                   for _, filepath, start, end, columns, schema in tasks]
+        chunks = dict()
+        for (name, filepath, *_), future in zip(tasks, futures):
+            chunks.setdefault(name, (filepath, []))[1].append(future.result())
+
+    tables = dict()
+    for name, (filepath, parts) in chunks.items():
+        tables[name] = {
+            column: _concatenate(filepath, column, [part[column] for part in parts])
+            for column in parts[0]
+        }
+    return tables
@@ -0,0 +1,373 @@
+import os
+import sys
+import time
+from array import array
+from types import MappingProxyType
+
+from src.parsers.parse_columns import (DictColumn, parse_columns, reset_strings,
+                                       table_name)
+from src.tracing import stage
+
+
+DATA_DIR = os.path.join('.', 'data')
+
+NA_VALUES = ['\\N']
+
+# Columns read from each table and their pandas types. Columns holding the
+# Ergast null marker are typed float64 so that it can be stored as NaN, and
+# names repeated on many lines are categories. usecols=None keeps every column.
+# The columns form follows the types of parse_columns.SCHEMAS.
+TABLES = {
+    'circuits': {
+        'usecols': ['circuitId', 'circuitRef', 'name', 'location', 'country'],
+        'dtype': {'circuitId': 'int32', 'name': 'category', 'location': 'category',
+                  'country': 'category'}
+    },
+    'constructor_results': {
+        'usecols': None,
+        'dtype': {'constructorResultsId': 'int32', 'raceId': 'int32',
+                  'constructorId': 'int32', 'points': 'float64',
+                  'status': 'category'}
+    },
+    'constructor_standings': {
+        'usecols': ['raceId', 'constructorId', 'points', 'position', 'wins'],
+        'dtype': {'raceId': 'int32', 'constructorId': 'int32', 'points': 'float64',
+                  'position': 'int32', 'wins': 'int32'}
+    },
+    'constructors': {
+        'usecols': ['constructorId', 'constructorRef', 'name', 'nationality'],
+        'dtype': {'constructorId': 'int32', 'name': 'category',
+                  'nationality': 'category'}
+    },
+    'driver_standings': {
+        'usecols': ['raceId', 'driverId', 'points', 'position', 'wins'],
+        'dtype': {'raceId': 'int32', 'driverId': 'int32', 'points': 'float64',
+                  'position': 'int32', 'wins': 'int32'}
+    },
+    'drivers': {
+        'usecols': ['driverId', 'driverRef', 'forename', 'surname', 'nationality'],
+        'dtype': {'driverId': 'int32', 'forename': 'category', 'surname': 'category',
+                  'nationality': 'category'}
+    },
+    'lap_times': {
+        'usecols': ['raceId', 'driverId', 'lap', 'position', 'milliseconds'],
+        'dtype': {'raceId': 'int32', 'driverId': 'int32', 'lap': 'int32',
+                  'position': 'int32', 'milliseconds': 'int64'}
+    },
+    'pit_stops': {
+        'usecols': ['raceId', 'driverId', 'stop', 'lap', 'milliseconds'],
+        'dtype': {'raceId': 'int32', 'driverId': 'int32', 'stop': 'int32',
+                  'lap': 'int32', 'milliseconds': 'int64'}
+    },
+    'qualifying': {
+        'usecols': ['raceId', 'driverId', 'constructorId', 'position',
+                    'q1', 'q2', 'q3'],
+        'dtype': {'raceId': 'int32', 'driverId': 'int32', 'constructorId': 'int32',
+                  'position': 'int32'}
+    },
+    'races': {
+        'usecols': ['raceId', 'year', 'round', 'circuitId', 'name', 'date'],
+        'dtype': {'raceId': 'int32', 'year': 'int32', 'round': 'int32',
+                  'circuitId': 'int32', 'name': 'category'}
+    },
+    'results': {
+        'usecols': ['resultId', 'raceId', 'driverId', 'constructorId', 'grid',
+                    'position', 'positionOrder', 'points', 'laps', 'statusId'],
+        'dtype': {'resultId': 'int32', 'raceId': 'int32', 'driverId': 'int32',
+                  'constructorId': 'int32', 'grid': 'int32', 'position': 'float64',
+                  'positionOrder': 'int32', 'points': 'float64', 'laps': 'int32',
+                  'statusId': 'int32'}
+    },
+    'seasons': {
+        'usecols': None,
+        'dtype': {'year': 'int32'}
+    },
+    'sprint_results': {
+        'usecols': None,
+        'dtype': {'resultId': 'int32', 'raceId': 'int32', 'driverId': 'int32',
+                  'constructorId': 'int32', 'positionOrder': 'int32',
+                  'points': 'float64', 'statusId': 'int32'}
+    },
+    'status': {
+        'usecols': ['statusId', 'status'],
+        'dtype': {'statusId': 'int32', 'status': 'category'}
+    },
+}
+
+
+def _read_only(column):
+    """
+    Returns a read-only view of a column built by parse_columns.
+
+    """
+    if isinstance(column, array):
+        return memoryview(column).toreadonly()
+    if isinstance(column, DictColumn):
+        return DictColumn(memoryview(column.codes).toreadonly(), column.table)
+    return tuple(column)
+
+
+def detached_copy(df, columns=()):
+    """
+    Returns a shallow copy of a DataFrame in which the string columns, and the
+    given columns, are copied, so that modifying them in place does not affect
+    df. The other columns are shared with df.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+    columns : names of other columns that can be modified in place
+
+    """
+    df = df.copy(deep=False)
+    for column in [*df.columns[df.dtypes == object], *columns]:
+        df[column] = df[column].to_numpy().copy()
+    return df
+
+
+def _strings_size(strings):
+    return sum(sys.getsizeof(value) for value in set(strings))
+
+
+def _columns_size(columns):
+    """
+    Approximates the memory used by a dictionary of columns, and the memory the
+    same columns would use without dictionary encoding.
+
+    Returns
+    -------
+    tuple : (bytes, plain bytes)
+
+    """
+    size = plain = 0
+    for column in columns.values():
+        if isinstance(column, memoryview):
+            size += column.nbytes
+            plain += column.nbytes
+        elif isinstance(column, DictColumn):
+            strings = _strings_size(column)
+            size += column.codes.nbytes + strings
+            plain += sys.getsizeof(tuple(column)) + strings
+        else:
+            size += sys.getsizeof(column) + _strings_size(column)
+            plain += sys.getsizeof(column) + _strings_size(column)
+    return size, plain
+
+
+def _table_size(df):
+    """
+    Returns the memory used by a DataFrame, and the memory it would use if its
+    categorical columns were plain object columns.
+
+    """
+    usage = df.memory_usage(deep=True, index=False)
+    plain = usage.copy()
+    for column in df.columns:
+        if df[column].dtype == 'category':
+            plain[column] = df[column].astype(object).memory_usage(deep=True,
+                                                                   index=False)
+    return int(usage.sum()), int(plain.sum())
+
+
+class DataStore:
+    """
+    Loads each table of the data folder at most once per process and shares it
+    between the questions.
+
+    Tables are loaded lazily, the first time a question asks for them, and kept
+    until `invalidate` is called or their CSV file changes on disk. Two forms
+    are kept independently:
+        - `table(name)` : a pandas DataFrame, read through the snapshot cache
+        - `columns(name)` : typed columns built with the standard library only,
+          for the vanilla questions
+
+    Parameters
+    ----------
+    data_dir : folder containing the CSV files
+
+    """
+
+    def __init__(self, data_dir=DATA_DIR):
+        self.data_dir = data_dir
+        self._tables = dict()
+        self._columns = dict()
+        self._derived = dict()
+
+    def path(self, name):
+        """
+        Returns the path to the CSV file of a table.
+
+        """
+        return os.path.join(self.data_dir, f"{name}.csv")
+
+    def signature(self, name):
+        """
+        Returns (size, modification time) of the CSV file of a table.
+
+        """
+        stat = os.stat(self.path(name))
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def _get(self, cache, name, load):
+        signature = self.signature(name)
+        entry = cache.get(name)
+        if entry is None or entry['signature'] != signature:
+            start = time.perf_counter()
+            with stage('load', table=name,
+                       form='pandas' if cache is self._tables else 'columns'):
+                value = load(name)
+            cache[name] = {'value': value, 'signature': signature,
+                           'load_time': time.perf_counter() - start}
+        return cache[name]['value']
+
+    def _load_table(self, name):
+        # imported here so that the vanilla questions never load pandas
+        from src.parsers.snapshot import read_snapshot
+
+        spec = TABLES.get(name, {})
+        options = {'na_values': NA_VALUES}
+        if spec.get('usecols') is not None:
+            options['usecols'] = spec['usecols']
+        if spec.get('dtype'):
+            options['dtype'] = spec['dtype']
+        return read_snapshot(self.path(name), **options)
+
+    def _load_columns(self, name):
+        spec = TABLES.get(name, {})
+        columns = parse_columns(self.path(name), columns=spec.get('usecols'))
+        return MappingProxyType({column: _read_only(values)
+                                 for column, values in columns.items()})
+
+    def table(self, name):
+        """
+        Returns a table as a pandas DataFrame.
+
+        The DataFrame is a shallow copy of the one kept in the store: columns
+        can be added or replaced without affecting the other questions, numeric
+        and categorical columns cannot be modified in place, and the string
+        columns are copied so that modifying them does not either.
+
+        """
+        return detached_copy(self._get(self._tables, name, self._load_table))
+
+    def columns(self, name):
+        """
+        Returns a table as a read-only mapping of typed columns: memoryviews for
+        numeric columns, tuples for the others.
+
+        """
+        return self._get(self._columns, name, self._load_columns)
+
+    def derived(self, key, build, tables):
+        """
+        Returns a value computed from some tables (an index, an aggregate table,
+        ...), building it on first use and again whenever one of the tables
+        changes on disk.
+
+        Parameters
+        ----------
+        key : name of the derived value, unique in the store
+        build : function without parameters computing the value
+        tables : names of the tables the value is computed from
+
+        """
+        signature = tuple(self.signature(name) for name in tables)
+        entry = self._derived.get(key)
+        if entry is None or entry['signature'] != signature:
+            start = time.perf_counter()
+            with stage('derive', key=key):
+                value = build()
+            self._derived[key] = {'value': value, 'signature': signature,
+                                  'tables': tuple(tables),
+                                  'load_time': time.perf_counter() - start}
+        return self._derived[key]['value']
+
+    def preload(self, names=None, workers=None):
+        """
+        Loads several tables in the columns form at once, parsing them in
+        parallel processes.
+
+        Parameters
+        ----------
+        names : list of table names (default: every CSV file of the data folder)
+        workers : number of processes (default: number of CPUs)
+
+        """
+        from src.parsers.bulk_load import load_tables
+
+        if names is None:
+            names = sorted(table_name(filename)
+                           for filename in os.listdir(self.data_dir)
+                           if filename.endswith('.csv'))
+        signatures = {name: self.signature(name) for name in names}
+        usecols = {name: TABLES[name]['usecols'] for name in names
+                   if TABLES.get(name, {}).get('usecols')}
+
+        start = time.perf_counter()
+        with stage('load', tables=names, form='columns'):
+            tables = load_tables(names, self.data_dir, usecols, workers)
+        load_time = time.perf_counter() - start
+        for name, columns in tables.items():
+            value = MappingProxyType({column: _read_only(values)
+                                      for column, values in columns.items()})
+            self._columns[name] = {'value': value, 'signature': signatures[name],
+                                   'load_time': load_time}
+
+    def invalidate(self, name=None):
+        """
+        Forgets one table, or all of them if name is None, so that they are read
+        again on their next use. Derived values computed from it are forgotten
+        too, and when all of them are, the shared string table of the
+        dictionary-encoded columns is started again (see StringTable).
+
+        """
+        if name is None:
+            self._tables.clear()
+            self._columns.clear()
+            self._derived.clear()
+            reset_strings()
+        else:
+            self._tables.pop(name, None)
+            self._columns.pop(name, None)
+            for key in [key for key, entry in self._derived.items()
+                        if name in entry['tables']]:
+                del self._derived[key]
+
+    def clear_derived(self):
+        """
+        Forgets the derived values but keeps the tables, so that the values are
+        computed again from the loaded tables on their next use.
+
+        """
+        self._derived.clear()
+
+    def resident(self):
+        """
+        Describes the tables currently loaded.
+
+        Returns
+        -------
+        list[dict] : one dictionary per loaded table and form, with its name,
+            its form ('pandas' or 'columns'), its number of rows, the memory it
+            uses in bytes, the memory it would use without dictionary encoding
+            ('plain_bytes') and the time it took to load in seconds
+
+        """
+        report = []
+        for name, entry in self._tables.items():
+            df = entry['value']
+            size, plain = _table_size(df)
+            report.append({'table': name, 'form': 'pandas', 'rows': len(df),
+                           'bytes': size, 'plain_bytes': plain,
+                           'load_time': entry['load_time']})
+        for name, entry in self._columns.items():
+            columns = entry['value']
+            rows = len(next(iter(columns.values()), ()))
+            size, plain = _columns_size(columns)
+            report.append({'table': name, 'form': 'columns', 'rows': rows,
+                           'bytes': size, 'plain_bytes': plain,
+                           'load_time': entry['load_time']})
+        return report
+
+
+store = DataStore()
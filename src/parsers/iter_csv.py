@@ -0,0 +1,99 @@
+import csv
+
+
+def compile_condition(condition):
+    """
+    Turns a filter condition into a test applied to a field.
+
+    A callable is used as is, a single value (string or number) must be equal to
+    the field and any other value is treated as a container the field must
+    belong to.
+
+    """
+    if callable(condition):
+        return condition
+    if isinstance(condition, (str, int, float)):
+        return lambda value: value == condition
+    return condition.__contains__
+
+
+def _number(field):
+    try:
+        return int(field)
+    except ValueError:
+        try:
+            return float(field)
+        except ValueError:
+            return None
+
+
+def _raw_condition(condition):
+    """
+    Adapts a filter condition to the raw (string) fields of a CSV file: a
+    number, alone or in a container, is compared with the number the field
+    holds rather than with its text.
+
+    """
+    if callable(condition) or isinstance(condition, str):
+        return condition
+    if isinstance(condition, (int, float)):
+        return lambda value: _number(value) == condition
+    numbers = {value for value in condition if not isinstance(value, str)}
+    if not numbers:
+        return condition
+    strings = {value for value in condition if isinstance(value, str)}
+    return lambda value: value in strings or _number(value) in numbers
+
+
+def iter_csv(filepath: str, columns=None, where=None, delimiter=None):
+    """
+    Reads a CSV file lazily, one line at a time.
+
+    Filters are applied to the raw fields as the lines are read, before any
+    dictionary is built, so that the lines that are filtered out cost almost
+    nothing and the file is never materialized in memory.
+
+    Parameters
+    ----------
+    filepath : path to the CSV file
+    columns : list of the columns to keep in each line (default: all of them)
+    where : dict mapping a column name to a condition on its raw (string) value:
+        - a string : the value must be equal to it
+        - a number : the value must be this number (1 matches "1" and "1.0")
+        - a container (set, list, ...) : the value must belong to it (numbers
+          in it are compared as above)
+        - a function : the value must satisfy it
+        A line is kept if all the conditions are met.
+    delimiter : character that separates fields in the CSV file
+
+    Yields
+    ------
+    dict : a line whose keys are the kept columns
+
+    """
+    with open(filepath, newline='', encoding='utf-8') as df:
+        sample = df.read(1024)
+        df.seek(0)
+
+        if delimiter is None:
+            sniffer = csv.Sniffer()
+            dialect = sniffer.sniff(sample)
+            delimiter = dialect.delimiter
+
+        reader = csv.reader(df, delimiter=delimiter)
+        header = next(reader)
+
+        if columns is None:
+            columns = header
+        where = where or dict()
+        unknown = [column for column in [*columns, *where] if column not in header]
+        if unknown:
+            raise ValueError(f"Unknown columns in {filepath}: {', '.join(unknown)}")
+
+        selected = [(column, header.index(column)) for column in columns]
+        tests = [(header.index(column), compile_condition(_raw_condition(condition)))
+                 for column, condition in where.items()]
+
+        for line in reader:
+            if all(test(line[index]) for index, test in tests):
+                yield {column: line[index] for column, index in selected}
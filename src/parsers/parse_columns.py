@@ -0,0 +1,277 @@
+import csv
+import os
+import sys
+from array import array
+from collections.abc import Sequence
+
+
+NULL = '\\N'
+
+# Column types of the Ergast tables: 'i' integer, 'd' float, 's' string and
+# 'c' dictionary-encoded string (for values repeated on many lines).
+# Columns missing from a schema have their type inferred from the data.
+SCHEMAS = {
+    'circuits': {
+        'circuitId': 'i', 'circuitRef': 's', 'name': 'c', 'location': 'c',
+        'country': 'c', 'lat': 'd', 'lng': 'd', 'alt': 'i', 'url': 's'
+    },
+    'constructor_results': {
+        'constructorResultsId': 'i', 'raceId': 'i', 'constructorId': 'i',
+        'points': 'd', 'status': 'c'
+    },
+    'constructor_standings': {
+        'constructorStandingsId': 'i', 'raceId': 'i', 'constructorId': 'i',
+        'points': 'd', 'position': 'i', 'positionText': 'c', 'wins': 'i'
+    },
+    'constructors': {
+        'constructorId': 'i', 'constructorRef': 's', 'name': 'c',
+        'nationality': 'c', 'url': 's'
+    },
+    'driver_standings': {
+        'driverStandingsId': 'i', 'raceId': 'i', 'driverId': 'i', 'points': 'd',
+        'position': 'i', 'positionText': 'c', 'wins': 'i'
+    },
+    'drivers': {
+        'driverId': 'i', 'driverRef': 's', 'number': 'i', 'code': 's',
+        'forename': 'c', 'surname': 'c', 'dob': 's', 'nationality': 'c', 'url': 's'
+    },
+    'lap_times': {
+        'raceId': 'i', 'driverId': 'i', 'lap': 'i', 'position': 'i', 'time': 's',
+        'milliseconds': 'i'
+    },
+    'pit_stops': {
+        'raceId': 'i', 'driverId': 'i', 'stop': 'i', 'lap': 'i', 'time': 's',
+        'duration': 's', 'milliseconds': 'i'
+    },
+    'qualifying': {
+        'qualifyId': 'i', 'raceId': 'i', 'driverId': 'i', 'constructorId': 'i',
+        'number': 'i', 'position': 'i', 'q1': 's', 'q2': 's', 'q3': 's'
+    },
+    'races': {
+        'raceId': 'i', 'year': 'i', 'round': 'i', 'circuitId': 'i', 'name': 'c',
+        'date': 's', 'time': 's', 'url': 's', 'fp1_date': 's', 'fp1_time': 's',
+        'fp2_date': 's', 'fp2_time': 's', 'fp3_date': 's', 'fp3_time': 's',
+        'quali_date': 's', 'quali_time': 's', 'sprint_date': 's', 'sprint_time': 's'
+    },
+    'results': {
+        'resultId': 'i', 'raceId': 'i', 'driverId': 'i', 'constructorId': 'i',
+        'number': 'i', 'grid': 'i', 'position': 'i', 'positionText': 'c',
+        'positionOrder': 'i', 'points': 'd', 'laps': 'i', 'time': 's',
+        'milliseconds': 'i', 'fastestLap': 'i', 'rank': 'i', 'fastestLapTime': 's',
+        'fastestLapSpeed': 'd', 'statusId': 'i'
+    },
+    'seasons': {'year': 'i', 'url': 's'},
+    'sprint_results': {
+        'resultId': 'i', 'raceId': 'i', 'driverId': 'i', 'constructorId': 'i',
+        'number': 'i', 'grid': 'i', 'position': 'i', 'positionText': 's',
+        'positionOrder': 'i', 'points': 'd', 'laps': 'i', 'time': 's',
+        'milliseconds': 'i', 'fastestLap': 'i', 'fastestLapTime': 's', 'statusId': 'i'
+    },
+    'status': {'statusId': 'i', 'status': 'c'},
+}
+
+
+class StringTable:
+    """
+    Dictionary shared by all the dictionary-encoded columns: each distinct string
+    gets one integer code, the same in every column and every table.
+
+    Codes are never released, but parsing the same files again reuses them: the
+    table only grows with the strings that are new, and holds at most every
+    distinct string read since it was started (see reset_strings).
+
+    """
+
+    def __init__(self):
+        self.strings = []
+        self.codes = dict()
+
+    def encode(self, value):
+        """
+        Returns the code of a string, adding it to the table if needed.
+
+        """
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.strings)
+            self.strings.append(sys.intern(value))
+        return code
+
+    def lookup(self, values):
+        """
+        Returns the set of the codes of the given strings, ignoring the strings
+        that are in no column.
+
+        """
+        return {self.codes[value] for value in values if value in self.codes}
+
+
+STRINGS = StringTable()
+
+
+def reset_strings():
+    """
+    Starts a new string table for the columns parsed from now on, so that the
+    strings of the files read before can be freed. Columns already parsed keep
+    the table of their codes.
+
+    """
+    global STRINGS
+    STRINGS = StringTable()
+
+
+def string_table():
+    """
+    Returns the string table of the columns parsed from now on.
+
+    """
+    return STRINGS
+
+
+class DictColumn(Sequence):
+    """
+    Dictionary-encoded string column: array('i') of codes in its string table (a
+    StringTable), -1 for nulls.
+
+    It behaves like a sequence of strings, but filters can work on the codes:
+        wanted = column.table.lookup(['Accident', 'Collision'])
+        [i for i, code in enumerate(column.codes) if code in wanted]
+
+    """
+
+    __slots__ = ('codes', 'table')
+
+    def __init__(self, codes, table=None):
+        self.codes = codes
+        self.table = STRINGS if table is None else table
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._decode(code) for code in self.codes[index]]
+        return self._decode(self.codes[index])
+
+    def __iter__(self):
+        strings = self.table.strings
+        for code in self.codes:
+            yield None if code < 0 else strings[code]
+
+    def __eq__(self, other):
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def _decode(self, code):
+        return None if code < 0 else self.table.strings[code]
+
+
+def table_name(filepath):
+    """
+    Returns the name of the table stored in a CSV file ('results' for
+    './data/results.csv').
+
+    """
+    return os.path.splitext(os.path.basename(filepath))[0]
+
+
+def _infer_type(values):
+    """
+    Finds the narrowest type ('i', 'd' or 's') able to hold every non-null value.
+
+    """
+    kind = 'i'
+    for value in values:
+        if value == NULL:
+            continue
+        if kind == 'i':
+            try:
+                int(value)
+                continue
+            except ValueError:
+                kind = 'd'
+        try:
+            float(value)
+        except ValueError:
+            return 's'
+    return kind
+
+
+def _convert(values, kind):
+    """
+    Converts a list of raw strings into a typed column.
+
+    """
+    if kind == 'i':
+        if NULL in values:
+            return [None if value == NULL else int(value) for value in values]
+        return array('i', [int(value) for value in values])
+    if kind == 'd':
+        return array('d', [float('nan') if value == NULL else float(value)
+                           for value in values])
+    if kind == 'c':
+        return DictColumn(array('i', [-1 if value == NULL else STRINGS.encode(value)
+                                      for value in values]))
+    return [None if value == NULL else sys.intern(value) for value in values]
+
+
+def parse_columns(filepath: str, schema=None, columns=None, delimiter=None):
+    """
+    Reads a CSV file into typed columns instead of one dictionary per line.
+
+    Integer columns are stored as array('i') and float columns as array('d'), so
+    that each value takes 4 or 8 bytes instead of a full Python string. String
+    values are interned: a name repeated on thousands of lines is stored once,
+    and columns of type 'c' only keep one 4-byte code per line (see DictColumn).
+    The Ergast null marker '\\N' becomes NaN in float columns and None in the
+    others (an integer column that contains nulls is returned as a list).
+
+    Parameters
+    ----------
+    filepath : path to the CSV file
+    schema : dict mapping column names to 'i', 'd', 's' or 'c'. Defaults to the
+        schema of the table in SCHEMAS; types of the columns that are not in the
+        schema are inferred.
+    columns : list of the columns to keep (default: all of them)
+    delimiter : character that separates fields in the CSV file
+
+    Returns
+    -------
+    dict : column name -> typed column, in the order of `columns`
+
+    """
+    if schema is None:
+        schema = SCHEMAS.get(table_name(filepath), {})
+
+    with open(filepath, newline='', encoding='utf-8') as df:
+        sample = df.read(1024)
+        df.seek(0)
+
+        if delimiter is None:
+            sniffer = csv.Sniffer()
+            dialect = sniffer.sniff(sample)
+            delimiter = dialect.delimiter
+
+        reader = csv.reader(df, delimiter=delimiter)
+        header = next(reader)
+
+        if columns is None:
+            columns = header
+        unknown = [column for column in columns if column not in header]
+        if unknown:
+            raise ValueError(f"Unknown columns in {filepath}: {', '.join(unknown)}")
+
+        indices = [header.index(column) for column in columns]
+        raw = [[] for _ in columns]
+        for line in reader:
+            for values, index in zip(raw, indices):
+                values.append(line[index])
+
+    typed = dict()
+    for column, values in zip(columns, raw):
+        kind = schema.get(column) or _infer_type(values)
+        typed[column] = _convert(values, kind)
+    return typed
@@ -0,0 +1,200 @@
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from src.parsers.parse_columns import table_name
+
+
+CACHE_DIR = os.path.join('.', '.cache', 'snapshots')
+
+
+def file_signature(filepath):
+    """
+    Returns the size and modification time of a file, used to detect changes
+    without reading it.
+
+    """
+    stat = os.stat(filepath)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def file_hash(filepath, block_size=1 << 20):
+    """
+    Returns the SHA-256 digest of a file's content.
+
+    """
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def snapshot_dir(filepath, cache_dir=CACHE_DIR, **read_options):
+    """
+    Returns the folder holding the snapshot of a CSV file read with read_options.
+
+    Two files with the same name in different folders, or the same file read with
+    other options, get different snapshots.
+
+    """
+    key = json.dumps([os.path.abspath(filepath), read_options],
+                     sort_keys=True, default=str)
+    suffix = hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(cache_dir, f"{table_name(filepath)}-{suffix}")
+
+
+def _read_meta(folder):
+    try:
+        with open(os.path.join(folder, 'meta.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(folder, meta):
+    with open(os.path.join(folder, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=1)
+
+
+def is_valid(filepath, meta):
+    """
+    Checks whether a snapshot still matches its source CSV file.
+
+    The size and modification time are compared first. If the modification time
+    changed but not the size, the content hash decides: a file that was only
+    touched keeps its snapshot.
+
+    """
+    if meta is None:
+        return False
+    source = meta['source']
+    signature = file_signature(filepath)
+    if signature['size'] != source['size']:
+        return False
+    if signature['mtime_ns'] == source['mtime_ns']:
+        return True
+    return file_hash(filepath) == source['sha256']
+
+
+def build_snapshot(filepath, folder, **read_options):
+    """
+    Parses a CSV file with pandas and writes each column to its own .npy file.
+
+    Numeric columns are saved as they are. Text columns are saved as fixed-width
+    unicode arrays, with a boolean mask of their missing values. Categorical
+    columns are saved as their integer codes and the array of their categories.
+
+    """
+    signature = file_signature(filepath)
+    df = pd.read_csv(filepath, **read_options)
+
+    tmp = folder + '.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    columns = []
+    for i, name in enumerate(df.columns):
+        series = df[name]
+        column = {'name': name, 'file': f"{i}.npy", 'mask': None,
+                  'categories': None}
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            column['categories'] = f"{i}.categories.npy"
+            categories = series.cat.categories.to_numpy(dtype=str)
+            np.save(os.path.join(tmp, column['categories']), categories)
+            values = series.cat.codes.to_numpy()
+        elif series.dtype == object:
+            missing = series.isna().to_numpy()
+            values = series.where(~missing, '').astype(str).to_numpy(dtype=str)
+            if missing.any():
+                column['mask'] = f"{i}.mask.npy"
+                np.save(os.path.join(tmp, column['mask']), missing)
+        else:
+            values = series.to_numpy()
+        np.save(os.path.join(tmp, column['file']), values)
+        columns.append(column)
+
+    signature['sha256'] = file_hash(filepath)
+    _write_meta(tmp, {'source': signature, 'rows': len(df), 'columns': columns})
+
+    shutil.rmtree(folder, ignore_errors=True)
+    os.replace(tmp, folder)
+
+
+def load_columns(filepath, cache_dir=CACHE_DIR, **read_options):
+    """
+    Returns the columns of a CSV file as memory-mapped NumPy arrays, building or
+    refreshing its snapshot first if needed.
+
+    Numeric arrays are read-only views on the files of the snapshot: nothing is
+    copied until the values are used.
+
+    Parameters
+    ----------
+    filepath : path to the CSV file
+    cache_dir : folder where the snapshots are stored
+    read_options : keyword arguments given to pd.read_csv
+
+    Returns
+    -------
+    dict : column name -> (values, missing values mask or None,
+        categories or None)
+
+    """
+    folder = snapshot_dir(filepath, cache_dir, **read_options)
+    meta = _read_meta(folder)
+
+    if not is_valid(filepath, meta):
+        build_snapshot(filepath, folder, **read_options)
+        meta = _read_meta(folder)
+    elif file_signature(filepath)['mtime_ns'] != meta['source']['mtime_ns']:
+        meta['source'].update(file_signature(filepath))
+        _write_meta(folder, meta)
+
+    columns = dict()
+    for column in meta['columns']:
+        values = np.load(os.path.join(folder, column['file']), mmap_mode='r')
+        mask = categories = None
+        if column['mask']:
+            mask = np.load(os.path.join(folder, column['mask']), mmap_mode='r')
+        if column.get('categories'):
+            categories = np.load(os.path.join(folder, column['categories']))
+        columns[column['name']] = (values, mask, categories)
+    return columns
+
+
+def read_snapshot(filepath, cache_dir=CACHE_DIR, **read_options):
+    """
+    Drop-in replacement for pd.read_csv backed by the snapshot of the file.
+
+    Numeric columns share the memory of the snapshot and are read-only: they can
+    be replaced (df['col'] = ...) but not modified in place.
+
+    Parameters
+    ----------
+    filepath : path to the CSV file
+    cache_dir : folder where the snapshots are stored
+    read_options : keyword arguments given to pd.read_csv
+
+    Returns
+    -------
+    pd.DataFrame
+
+    """
+    data = dict()
+    for name, (values, mask, categories) in load_columns(filepath, cache_dir,
+                                                         **read_options).items():
+        if categories is not None:
+            values = pd.Categorical.from_codes(values, categories.astype(object))
+        elif values.dtype.kind == 'U':
+            values = values.astype(object)
+            if mask is not None:
+                values[mask] = np.nan
+        else:
+            values = np.asarray(values)
+        data[name] = values
+    return pd.DataFrame(data, copy=False)
@@ -0,0 +1,386 @@
+"""
+Instrumentation of the stages of the questions: loading the tables,
+filtering, joining and aggregating them, and formatting the answer.
+
+The questions, the models and the data store mark their stages with `stage`
+(a context manager) or `traced` (a decorator). When nothing is recorded, both
+cost a test of two globals. Two recorders can be enabled:
+    - `tracing` collects the nested stages in a Trace, exported as JSON or as
+      a Chrome trace-event file (chrome://tracing, https://ui.perfetto.dev);
+    - `profile_memory` measures the time and memory of the load, transform
+      and format stages.
+
+Usage:
+    with tracing() as trace:
+        ranking(2023)
+    trace.write_chrome('ranking.trace.json')
+
+This module only uses the standard library and imports nothing from the
+project, so that every package can mark its stages. Questions are traced or
+profiled with cProfile from the command line by src.analysis.profiling.
+
+"""
+import datetime
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+
+# Stages separated by the memory profiles; the other stages are counted in
+# the one they are nested in.
+STAGES = ('load', 'transform', 'format')
+
+# Profile collecting the measurements, or None when memory is not profiled.
+_active = None
+
+# Trace collecting the stages, or None when nothing is traced.
+_trace = None
+
+_DISABLED = nullcontext()
+
+
+def rss():
+    """
+    Returns the resident set size of the process in bytes, or None where it
+    cannot be read (it is read from /proc, on Linux).
+
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class MemoryProfile:
+    """
+    Time and memory of the stages of a call.
+
+    Every stage is measured over the time spent in it, nested stages
+    excluded. For each one:
+        - 'time' : seconds spent in the stage
+        - 'peak' : highest traced memory above the memory in use when the
+          stage was entered, in bytes (tracemalloc)
+        - 'net' : memory still allocated at the end of the call by the stage,
+          in bytes (tracemalloc)
+        - 'rss' : change of the resident set size during the stage, in bytes,
+          or None where it cannot be read
+
+    Parameters
+    ----------
+    default : stage of the parts of the call that are not marked
+
+    """
+
+    def __init__(self, default='transform'):
+        self.stages = dict()
+        self.peak = 0
+        self._stage = default
+        self._started = False
+
+    def _entry(self, name):
+        return self.stages.setdefault(name, {'time': 0.0, 'peak': 0, 'net': 0,
+                                             'rss': None})
+
+    def _open(self):
+        self._start_time = time.perf_counter()
+        self._start_memory = tracemalloc.get_traced_memory()[0]
+        self._start_rss = rss()
+        tracemalloc.reset_peak()
+
+    def _close(self):
+        current, peak = tracemalloc.get_traced_memory()
+        now_rss = rss()
+        entry = self._entry(self._stage)
+        entry['time'] += time.perf_counter() - self._start_time
+        entry['net'] += current - self._start_memory
+        entry['peak'] = max(entry['peak'], peak - self._start_memory)
+        if now_rss is not None and self._start_rss is not None:
+            entry['rss'] = (entry['rss'] or 0) + now_rss - self._start_rss
+        self.peak = max(self.peak, peak - self._origin)
+
+    def start(self):
+        self._started = not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start()
+        self._origin = tracemalloc.get_traced_memory()[0]
+        self._open()
+
+    def switch(self, name):
+        """
+        Ends the measurement of the current stage and starts the one of `name`
+        (the current stage goes on if `name` is not one of STAGES).
+
+        Returns
+        -------
+        str : the name of the stage that was measured until now
+
+        """
+        if name not in STAGES or name == self._stage:
+            return self._stage
+        self._close()
+        previous, self._stage = self._stage, name
+        self._open()
+        return previous
+
+    def stop(self):
+        self._close()
+        if self._started:
+            tracemalloc.stop()
+
+    def summary(self):
+        """
+        Returns
+        -------
+        dict : measurements of every stage (see the class), plus 'total' for
+            the whole call, whose peak is above the memory in use at its start
+
+        """
+        stages = {name: dict(entry) for name, entry in self.stages.items()}
+        rss_deltas = [entry['rss'] for entry in stages.values()
+                      if entry['rss'] is not None]
+        stages['total'] = {
+            'time': sum(entry['time'] for entry in stages.values()),
+            'peak': self.peak,
+            'net': sum(entry['net'] for entry in stages.values()),
+            'rss': sum(rss_deltas) if rss_deltas else None,
+        }
+        return stages
+
+
+@contextmanager
+def profile_memory(default='transform'):
+    """
+    Measures the memory used by the stages of the code run in the block.
+
+    Profiles cannot be nested. Tracing slows the code down: time the
+    questions in other runs.
+
+    Yields
+    ------
+    MemoryProfile : measurements, complete once the block is left
+
+    """
+    global _active
+
+    if _active is not None:
+        raise RuntimeError("A memory profile is already running")
+    profile = MemoryProfile(default)
+    profile.start()
+    _active = profile
+    try:
+        yield profile
+    finally:
+        _active = None
+        profile.stop()
+
+
+class Trace:
+    """
+    Nested stages recorded while tracing.
+
+    Every span is a dict with the 'name' of the stage, its 'args' (details
+    given to `stage`), its 'start' (seconds since the trace started), its
+    'duration' in seconds and its 'children' spans. Stages run by other
+    threads than the one that started the trace are not recorded.
+
+    """
+
+    def __init__(self):
+        self.started = datetime.datetime.now().isoformat(timespec='seconds')
+        self.spans = []
+        self._origin = time.perf_counter()
+        self._stack = []
+        self._thread = threading.get_ident()
+
+    def begin(self, name, args):
+        if threading.get_ident() != self._thread:
+            return None
+        span = {'name': name, 'args': args,
+                'start': time.perf_counter() - self._origin, 'duration': None,
+                'children': []}
+        (self._stack[-1]['children'] if self._stack else self.spans).append(span)
+        self._stack.append(span)
+        return span
+
+    def end(self, span):
+        if span is None:
+            return
+        span['duration'] = time.perf_counter() - self._origin - span['start']
+        while self._stack and self._stack.pop() is not span:
+            pass
+
+    def totals(self):
+        """
+        Sums the durations of the stages by name.
+
+        Returns
+        -------
+        dict : name -> {'count', 'time' (inclusive), 'self' (nested stages
+            excluded)}, in seconds
+
+        """
+        totals = dict()
+
+        def add(spans):
+            for span in spans:
+                entry = totals.setdefault(span['name'], {'count': 0, 'time': 0.0,
+                                                         'self': 0.0})
+                entry['count'] += 1
+                entry['time'] += span['duration'] or 0.0
+                entry['self'] += ((span['duration'] or 0.0)
+                                  - sum(child['duration'] or 0.0
+                                        for child in span['children']))
+                add(span['children'])
+
+        add(self.spans)
+        return totals
+
+    def to_dict(self):
+        return {'started': self.started, 'spans': self.spans,
+                'totals': self.totals()}
+
+    def chrome_events(self):
+        """
+        Returns the spans as Chrome trace events ('X' complete events, in
+        microseconds).
+
+        """
+        events = []
+
+        def add(spans):
+            for span in spans:
+                events.append({'name': span['name'], 'cat': 'stage', 'ph': 'X',
+                               'ts': round(span['start'] * 1e6, 3),
+                               'dur': round((span['duration'] or 0.0) * 1e6, 3),
+                               'pid': os.getpid(), 'tid': self._thread,
+                               'args': span['args']})
+                add(span['children'])
+
+        add(self.spans)
+        return events
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+
+    def write_chrome(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.chrome_events(),
+                       'displayTimeUnit': 'ms'}, f, default=str)
+
+    def format(self):
+        """
+        Formats the spans as an indented tree, in milliseconds.
+
+        """
+        lines = []
+
+        def add(spans, depth):
+            for span in spans:
+                details = " ".join(f"{key}={value}"
+                                   for key, value in span['args'].items())
+                lines.append(f"{(span['duration'] or 0.0) * 1000:>10.2f} ms  "
+                             f"{'  ' * depth}{span['name']} {details}".rstrip())
+                add(span['children'], depth + 1)
+
+        add(self.spans, 0)
+        return "\n".join(lines)
+
+
+@contextmanager
+def tracing():
+    """
+    Records the stages run in the block.
+
+    Traces cannot be nested.
+
+    Yields
+    ------
+    Trace : the recorded stages, complete once the block is left
+
+    """
+    global _trace
+
+    if _trace is not None:
+        raise RuntimeError("A trace is already running")
+    _trace = Trace()
+    try:
+        yield _trace
+    finally:
+        while _trace._stack:
+            _trace.end(_trace._stack[-1])
+        _trace = None
+
+
+class _Stage:
+    """
+    Records a stage in the running trace and memory profile.
+
+    """
+    __slots__ = ('name', 'args', '_trace', '_profile', '_span', '_previous')
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self._trace, self._profile = _trace, _active
+        if self._trace is not None:
+            self._span = self._trace.begin(self.name, self.args)
+        if self._profile is not None:
+            self._previous = self._profile.switch(self.name)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._profile is not None:
+            self._profile.switch(self._previous)
+        if self._trace is not None:
+            self._trace.end(self._span)
+        return False
+
+
+def stage(name, **args):
+    """
+    Marks a stage of a question or a model ('load', 'filter', 'join',
+    'aggregate', 'format', ...), recorded while tracing or profiling memory.
+
+    Parameters
+    ----------
+    name : name of the stage
+    **args : details of the stage kept in the trace (a table name, a key, ...)
+
+    Returns
+    -------
+    context manager
+
+    """
+    if _trace is None and _active is None:
+        return _DISABLED
+    return _Stage(name, args)
+
+
+def traced(func=None, *, name=None):
+    """
+    Decorator recording every call of a function as a stage, named after the
+    function, or `name` with the name of the function in its details.
+
+    """
+    def decorate(func):
+        label = name or f"{func.__module__}.{func.__qualname__}"
+        details = {'function': func.__qualname__} if name else dict()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _trace is None and _active is None:
+                return func(*args, **kwargs)
+            with _Stage(label, dict(details)):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate if func is None else decorate(func)
@@ -0,0 +1,49 @@
+import csv
+
+from benchmarks.bench_questions import find_regressions
+from benchmarks.scaled_data import write_scaled_history
+
+
+def test_scaled_history_keeps_keys_unique(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "races.csv").write_text(
+        'raceId,year,round,name\n1,2000,1,"A, B"\n2,2001,1,"C"\n', encoding='utf-8')
+    (tmp_path / "src" / "results.csv").write_text(
+        'resultId,raceId,driverId,position\n1,1,7,1\n2,2,7,\\N\n', encoding='utf-8')
+    (tmp_path / "src" / "status.csv").write_text(
+        'statusId,status\n1,"Finished"\n', encoding='utf-8')
+
+    write_scaled_history(str(tmp_path / "src"), str(tmp_path / "dst"), 3)
+
+    with open(tmp_path / "dst" / "races.csv", newline='', encoding='utf-8') as f:
+        races = list(csv.DictReader(f))
+    assert [race['raceId'] for race in races] == ['1', '2', '3', '4', '5', '6']
+    assert [race['year'] for race in races][-1] == '2005'
+    assert races[2]['name'] == 'A, B'
+    assert (tmp_path / "dst" / "races.csv").read_text().count('"A, B"') == 3
+
+    with open(tmp_path / "dst" / "results.csv", newline='', encoding='utf-8') as f:
+        results = list(csv.DictReader(f))
+    assert len({result['resultId'] for result in results}) == 6
+    assert results[5]['position'] == '\\N' and results[5]['driverId'] == '7'
+    assert ((tmp_path / "dst" / "status.csv").read_text()
+            == (tmp_path / "src" / "status.csv").read_text())
+
+
+def test_find_regressions():
+    def run(median):
+        return {'results': {'1x': {'q': {'compute': {'median': median}},
+                                   'broken': {'error': 'ValueError'}}}}
+
+    assert find_regressions(run(0.110), run(0.100), max_regression=20) == []
+    regressions = find_regressions(run(0.150), run(0.100), max_regression=20)
+    assert [(r['scale'], r['name']) for r in regressions] == [('1x', 'q')]
+    assert find_regressions(run(0.0002), run(0.0001), max_regression=20) == []
+
+    # a target timed in the baseline that fails or disappears regresses
+    baseline = run(0.100)
+    baseline['results']['1x']['broken'] = {'compute': {'median': 0.100}}
+    baseline['results']['1x']['gone'] = {'compute': {'median': 0.100}}
+    regressions = find_regressions(run(0.100), baseline)
+    assert [(r['name'], r['error']) for r in regressions] == [
+        ('broken', 'ValueError'), ('gone', "missing from the run")]
@@ -0,0 +1,22 @@
+from src.parsers.bulk_load import line_ranges, load_tables
+from src.parsers.parse_columns import parse_columns
+
+
+def test_ranges_are_line_aligned(tmp_path):
+    path = tmp_path / "results.csv"
+    path.write_text('a,b\n' + ''.join(f'{i},{i * 2}\n' for i in range(100)),
+                    encoding='utf-8')
+    content = path.read_bytes()
+    ranges = line_ranges(str(path), chunk_size=50)
+    assert len(ranges) > 1
+    assert ranges[0][0] == len(b'a,b\n') and ranges[-1][1] == len(content)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start and content[end - 1:end] == b'\n'
+
+
+def test_same_columns_as_serial_parsing():
+    tables = load_tables(['status', 'races'], usecols={'races': ['raceId', 'year']},
+                         workers=2, chunk_size=4096)
+    assert tables['status'] == parse_columns('./data/status.csv')
+    assert tables['races'] == parse_columns('./data/races.csv',
+                                            columns=['raceId', 'year'])
@@ -0,0 +1,31 @@
+from src.analysis.homemade.career import CAREER_FIELDS, career_table
+from src.analysis.pandas.career import career_frame
+from src.parsers.data_store import DataStore
+
+
+def test_derived_values_are_rebuilt_after_invalidate(tmp_path):
+    (tmp_path / "status.csv").write_text('statusId,status\n1,"Finished"\n',
+                                         encoding='utf-8')
+    data_store = DataStore(str(tmp_path))
+    builds = []
+
+    def build():
+        builds.append(1)
+        return len(data_store.columns('status')['statusId'])
+
+    assert data_store.derived('count', build, ('status',)) == 1
+    assert data_store.derived('count', build, ('status',)) == 1
+    data_store.invalidate('status')
+    assert data_store.derived('count', build, ('status',)) == 1
+    assert len(builds) == 2
+
+
+def test_career_tables_agree():
+    career = career_table()
+    frame = career_frame()
+    assert career_table() is career
+    assert set(career) == set(frame.index)
+    for driver_id, stats in career.items():
+        assert stats == {field: int(frame.at[driver_id, field])
+                         for field in CAREER_FIELDS}
+    assert career[1]['starts'] >= career[1]['podiums'] >= career[1]['wins'] > 0
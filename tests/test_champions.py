@@ -0,0 +1,16 @@
+from src.analysis.pandas.champions import champions_by_season
+from src.analysis.pandas.q4 import constructor_winner
+
+
+def test_champions_by_season():
+    champions = champions_by_season()
+    assert champions.at[2023, 'driver'] == 'Max Verstappen'
+    assert champions.at[2023, 'constructor'] == 'Red Bull'
+    assert champions.at[1958, 'constructor'] == 'Vanwall'
+    assert champions.at[1950, 'driver'] == 'Nino Farina'
+
+
+def test_constructor_winner_without_championship():
+    assert constructor_winner(1950) is None
+    assert constructor_winner(1900) is None
+    assert constructor_winner(2023) == 'Red Bull'
@@ -0,0 +1,47 @@
+import gc
+
+from src.analysis.compare import (benchmark, compare_implementations,
+                                  difference_interval, format_report, summarize,
+                                  time_calls)
+from src.analysis.questions import (QUESTIONS, default_arguments, parse_arguments,
+                                    question)
+
+
+def test_time_calls_warmup_and_gc():
+    calls = []
+    times = time_calls(lambda: calls.append(gc.isenabled()), repeats=3, warmup=2)
+    assert len(times) == 3 and len(calls) == 5
+    assert not any(calls)
+    assert gc.isenabled()
+
+
+def test_statistics():
+    summary = summarize([3.0, 1.0, 2.0, 4.0])
+    assert summary['min'] == 1.0 and summary['median'] == 2.5
+    assert summary['p95'] == 4.0 and summary['repeats'] == 4
+
+    difference, low, high = difference_interval([2.0, 2.2, 1.8], [1.0, 1.1, 0.9])
+    assert low < difference < high
+    assert abs(difference - 1.0) < 1e-9 and low > 0
+
+
+def test_compare_question():
+    entry = question('wins')
+    report = compare_implementations(entry['vanilla'], entry['pandas'],
+                                     default_arguments(entry), repeats=2, warmup=0)
+    assert report['vanilla']['load']['repeats'] == 2
+    assert 'confidence interval' in format_report(report)
+    memory = report['pandas']['memory']
+    assert set(memory) == {'load', 'transform', 'format', 'total'}
+    assert memory['total']['peak'] >= memory['format']['peak']
+    assert 'pandas format' in format_report(report)
+
+    no_tables = benchmark(lambda: None, repeats=2, warmup=0, memory=False)
+    assert no_tables['load']['min'] == 0.0 and 'memory' not in no_tables
+
+
+def test_registry():
+    assert len({entry['key'] for entry in QUESTIONS}) == len(QUESTIONS)
+    assert default_arguments(question('pit_stops'))[0] is False
+    assert parse_arguments(question('pit_stops'), ["true", "", " mad", ""]) == [
+        True, 60, 'mad', 3.5]
@@ -0,0 +1,31 @@
+import pytest
+from src.analysis.homemade.countback import countback as countback_nopd
+from src.analysis.homemade.countback import final_standings as final_standings_nopd
+from src.analysis.pandas.countback import countback, final_standings
+
+
+@pytest.mark.parametrize("entity, key", [('driver', 'driverId'),
+                                         ('constructor', 'constructorId')])
+def test_both_engines_agree(entity, key):
+    table = countback(entity)
+    for year, rows in countback_nopd(entity).items():
+        season = table[table['year'] == year]
+        assert [row[key] for row in rows] == list(season[key])
+        assert [row['rank'] for row in rows] == list(season['rank'])
+
+
+def test_ties_broken_by_countback():
+    standings = final_standings_nopd(2023)
+    assert standings[0]['driverId'] == 830
+    for better, worse in zip(standings, standings[1:]):
+        assert ((better['points'], better['finishes'])
+                >= (worse['points'], worse['finishes']))
+    assert list(final_standings(2023)['driverId']) == [row['driverId']
+                                                       for row in standings]
+
+
+def test_unknown_season():
+    with pytest.raises(ValueError):
+        final_standings_nopd(1900)
+    with pytest.raises(ValueError):
+        final_standings(1900)
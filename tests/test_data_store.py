@@ -0,0 +1,90 @@
+import os
+
+import pytest
+from src.analysis.homemade.engine import where
+from src.parsers.data_store import DataStore
+from src.parsers.parse_columns import string_table
+
+
+@pytest.fixture
+def data_store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "status.csv").write_text(
+        'statusId,status\n1,"Finished"\n3,"Accident"\n', encoding='utf-8'
+    )
+    return DataStore(str(tmp_path))
+
+
+def test_tables_are_loaded_once(data_store):
+    first = data_store.columns('status')
+    assert data_store.columns('status') is first
+    assert tuple(first['statusId']) == (1, 3)
+    assert first['status'] == ('Finished', 'Accident')
+
+
+def test_views_are_read_only(data_store):
+    columns = data_store.columns('status')
+    with pytest.raises(TypeError):
+        columns['statusId'][0] = 2
+    with pytest.raises(TypeError):
+        columns['status'] = ()
+
+    df = data_store.table('status')
+    df['extra'] = 1
+    assert 'extra' not in data_store.table('status')
+    with pytest.raises(ValueError):
+        df.loc[0, 'status'] = 'Accident'
+    with pytest.raises(ValueError):
+        df.loc[0, 'statusId'] = 2
+
+    with open(data_store.path('seasons'), 'w', encoding='utf-8') as f:
+        f.write('year,url\n2009,"http://a"\n2010,"http://b"\n')
+    df = data_store.table('seasons')
+    assert df['url'].dtype == object
+    df.loc[0, 'url'] = 'http://x'
+    assert data_store.table('seasons')['url'].tolist() == ['http://a', 'http://b']
+
+
+def test_reloaded_after_invalidate_or_change(data_store):
+    first = data_store.columns('status')
+    data_store.invalidate('status')
+    assert data_store.columns('status') is not first
+
+    path = data_store.path('status')
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('4,"Collision"\n')
+    os.utime(path, ns=(1, 1))
+    assert len(data_store.columns('status')['statusId']) == 3
+
+
+def test_string_table_does_not_grow_on_reload(data_store):
+    data_store.invalidate()
+    first = data_store.columns('status')['status']
+    size = len(string_table().strings)
+    for _ in range(3):
+        data_store.invalidate('status')
+        data_store.columns('status')
+    assert len(string_table().strings) == size
+
+    data_store.invalidate()
+    assert string_table() is not first.table
+    assert list(first) == ['Finished', 'Accident']
+    assert where({'status': first}, status='Accident') == [1]
+    assert where(data_store.columns('status'), status={'Accident'}) == [1]
+
+
+def test_resident_report(data_store):
+    assert data_store.resident() == []
+    data_store.table('status')
+    data_store.columns('status')
+    report = {entry['form']: entry for entry in data_store.resident()}
+    assert set(report) == {'pandas', 'columns'}
+    assert all(entry['rows'] == 2 and entry['bytes'] > 0 for entry in report.values())
+
+
+def test_dictionary_encoding_saves_memory():
+    data_store = DataStore()
+    data_store.table('drivers')
+    data_store.columns('drivers')
+    for entry in data_store.resident():
+        assert entry['bytes'] < entry['plain_bytes']
@@ -0,0 +1,45 @@
+import pytest
+from src.analysis.homemade.engine import (group_by, hash_join, index, lookup, select,
+                                          top_k, unique_index, where)
+
+results = {
+    'raceId': [18, 18, 18, 19, 19],
+    'driverId': [1, 2, 3, 1, 2],
+    'positionOrder': [1, 2, 3, 2, 1],
+    'grid': [1, 4, 2, 3, 1],
+}
+drivers = {'driverId': [1, 2, 3], 'surname': ['Hamilton', 'Heidfeld', 'Rosberg']}
+
+
+def test_where_and_select():
+    assert where(results, positionOrder=1) == [0, 4]
+    assert where(results, raceId={19}, driverId=lambda d: d > 1) == [4]
+    assert select(results, ['driverId'], positionOrder=[1, 2]) == {
+        'driverId': [1, 2, 1, 2]
+    }
+
+
+def test_indexes():
+    assert unique_index(drivers, 'driverId') == {1: 0, 2: 1, 3: 2}
+    assert index(results, 'driverId')[1] == [0, 3]
+    with pytest.raises(ValueError):
+        unique_index(results, 'driverId')
+    assert lookup(drivers, 'driverId', 'surname')[3] == 'Rosberg'
+
+
+def test_hash_join():
+    joined = hash_join(select(results, ['raceId', 'driverId'], raceId=19), drivers,
+                       on='driverId')
+    assert joined == {'raceId': [19, 19], 'driverId': [1, 2],
+                      'surname': ['Hamilton', 'Heidfeld']}
+
+
+def test_group_by_and_top_k():
+    groups = group_by(results, 'driverId', starts=('count', None),
+                      mean_grid=('mean', 'grid'), best=('min', 'positionOrder'))
+    assert groups[1] == {'starts': 2, 'mean_grid': 2.0, 'best': 1}
+    assert list(group_by(results, ('raceId', 'positionOrder'), rows=[3, 4])) == [
+        (19, 2), (19, 1)
+    ]
+    assert [key for key, _ in top_k(groups, 2, 'starts')] == [1, 2]
+    assert [key for key, _ in top_k(groups, None, 'mean_grid')] == [2, 1, 3]
@@ -0,0 +1,109 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+from benchmarks.bench_features import baseline, read_tables, single_pass
+from src.learning import feature_store
+from src.parsers import snapshot
+from src.parsers.data_store import store
+
+
+TABLES = {
+    'results': ('resultId,raceId,driverId,constructorId,number,grid,position,'
+                'positionText,positionOrder,points,laps,time,milliseconds,'
+                'fastestLap,rank,fastestLapTime,fastestLapSpeed,statusId\n'
+                '1,1,1,1,44,2,1,"1",1,25,50,\\N,\\N,\\N,\\N,\\N,\\N,1\n'
+                '2,1,2,1,6,1,2,"2",2,18,50,\\N,\\N,\\N,\\N,\\N,\\N,1\n'
+                '3,1,3,2,5,3,\\N,"R",3,0,10,\\N,\\N,\\N,\\N,\\N,\\N,3\n'
+                '4,2,1,1,44,1,2,"2",2,18,50,\\N,\\N,\\N,\\N,\\N,\\N,1\n'
+                '5,2,2,1,6,3,1,"1",1,25,50,\\N,\\N,\\N,\\N,\\N,\\N,1\n'),
+    'lap_times': ('raceId,driverId,lap,position,time,milliseconds\n'
+                  '1,1,1,1,"1:30.000",90000\n1,1,2,1,"1:31.000",91000\n'
+                  '1,2,1,2,"1:32.000",92000\n'),
+    'qualifying': ('qualifyId,raceId,driverId,constructorId,number,position,'
+                   'q1,q2,q3\n1,1,2,1,6,1,"1:26.572",\\N,\\N\n'),
+    'pit_stops': ('raceId,driverId,stop,lap,time,duration,milliseconds\n'
+                  '1,1,1,20,"14:00:00","22.000",22000\n'
+                  '1,4,1,22,"14:02:00","24.000",24000\n'),
+}
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    for name in ['drivers', 'status']:
+        shutil.copy(os.path.join('data', f"{name}.csv"), tmp_path)
+    for name, text in TABLES.items():
+        (tmp_path / f"{name}.csv").write_text(text, encoding='utf-8')
+    monkeypatch.setattr(store, 'data_dir', str(tmp_path))
+    store.invalidate()
+    yield tmp_path
+    store.invalidate()
+
+
+def count_builds(monkeypatch):
+    builds = []
+    for name, group in feature_store.FEATURE_GROUPS.items():
+        def build(name=name, build=group['build']):
+            builds.append(name)
+            return build()
+        monkeypatch.setitem(group, 'build', build)
+    return builds
+
+
+def test_only_changed_groups_are_rebuilt(data_dir, monkeypatch):
+    cache = data_dir / "features"
+    builds = count_builds(monkeypatch)
+    features = feature_store.build_driver_features(cache)
+    assert sorted(builds) == sorted(feature_store.FEATURE_GROUPS)
+
+    assert features['driverId'].tolist() == [1, 2, 3, 4]
+    assert features['name'].tolist()[0] == 'Lewis Hamilton'
+    assert features['win_rate'].tolist() == [0.5, 0.5, 0.0, 0.0]
+    assert features['avg_pit_stop_count'].tolist() == [1.0, 0.0, 0.0, 1.0]
+    assert features['podium_when_finished_rate'].tolist() == [1.0, 1.0, 0.0, 0.0]
+
+    # read back without loading the tables
+    builds.clear()
+    store.invalidate()
+    again = feature_store.build_driver_features(cache)
+    assert builds == [] and not store._tables and not store._columns
+    assert again.equals(features)
+
+    (data_dir / "pit_stops.csv").write_text(
+        TABLES['pit_stops'] + '2,1,1,20,"15:00:00","30.000",30000\n',
+        encoding='utf-8'
+    )
+    changed = feature_store.build_driver_features(cache)
+    assert builds == ['pit_stops']
+    assert changed['avg_pit_stop_time'].tolist()[0] == 26000.0
+
+
+def test_touched_tables_are_hashed_once(data_dir, monkeypatch):
+    cache = data_dir / "features"
+    feature_store.build_driver_features(cache)
+    os.utime(data_dir / "lap_times.csv", ns=(1, 1))
+    hashed = []
+    file_hash = snapshot.file_hash
+    monkeypatch.setattr(snapshot, 'file_hash',
+                        lambda path: hashed.append(path) or file_hash(path))
+    builds = count_builds(monkeypatch)
+
+    for _ in range(2):
+        feature_store.build_driver_features(cache)
+    assert builds == []
+    assert hashed == [store.path('lap_times')]
+
+
+def test_new_version_is_rebuilt(data_dir, monkeypatch):
+    cache = data_dir / "features"
+    feature_store.build_driver_features(cache)
+    builds = count_builds(monkeypatch)
+    monkeypatch.setitem(feature_store.FEATURE_GROUPS['lap_times'], 'version', 2)
+    feature_store.build_driver_features(cache)
+    assert builds == ['lap_times']
+
+
+def test_single_pass_matches_baseline_features(data_dir):
+    pd.testing.assert_frame_equal(single_pass(), baseline(read_tables(data_dir)),
+                                  check_dtype=False)
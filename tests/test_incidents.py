@@ -0,0 +1,26 @@
+import pytest
+from src.analysis.pandas.incidents import (incident_counts, incident_cube,
+                                           most_dangerous_by_country)
+from src.analysis.pandas.statuses import results_with_status
+from src.analysis.statuses import ACCIDENT
+
+
+def test_cube_counts_every_accident():
+    results = results_with_status()
+    accidents = ((results['status_class'] & ACCIDENT) != 0).sum()
+    assert incident_cube().xs('accident', level='incident').sum() == accidents
+    assert incident_counts('accident').sum() == accidents
+
+
+def test_filters():
+    every_year = incident_counts('accident', 'Italy')
+    some_years = incident_counts('accident', 'Italy', 2000, 2010)
+    assert 0 < some_years.sum() < every_year.sum()
+    assert incident_counts('accident', 'Narnia').empty
+
+    by_country = most_dangerous_by_country()
+    assert by_country.at['Italy', 'circuitId'] == every_year.idxmax()
+    assert by_country.at['Italy', 'count'] == every_year.max()
+
+    with pytest.raises(ValueError):
+        incident_counts('meteor')
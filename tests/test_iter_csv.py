@@ -0,0 +1,39 @@
+import pytest
+from src.parsers.iter_csv import iter_csv
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "results.csv"
+    path.write_text(
+        'raceId,driverId,positionOrder\n'
+        '18,1,1\n'
+        '18,2,2\n'
+        '19,2,1\n',
+        encoding='utf-8'
+    )
+    return str(path)
+
+
+def test_is_lazy(csv_file):
+    lines = iter_csv(csv_file)
+    assert next(lines) == {'raceId': '18', 'driverId': '1', 'positionOrder': '1'}
+
+
+@pytest.mark.parametrize("where, expected", [
+    ({'positionOrder': '1'}, ['1', '2']),
+    ({'raceId': {'18'}}, ['1', '2']),
+    ({'raceId': '19', 'positionOrder': '1'}, ['2']),
+    ({'driverId': lambda d: int(d) > 1}, ['2', '2']),
+    ({'positionOrder': 1}, ['1', '2']),
+    ({'raceId': {18, '19'}, 'positionOrder': 2.0}, ['2']),
+])
+def test_filters_and_projection(csv_file, where, expected):
+    lines = list(iter_csv(csv_file, columns=['driverId'], where=where))
+    assert [line['driverId'] for line in lines] == expected
+    assert all(list(line) == ['driverId'] for line in lines)
+
+
+def test_unknown_column(csv_file):
+    with pytest.raises(ValueError):
+        next(iter_csv(csv_file, where={'unknown': '1'}))
@@ -0,0 +1,44 @@
+import math
+import subprocess
+import sys
+
+from sklearn.datasets import make_blobs
+from src.learning.model_selection import scores_table, select_models
+
+
+X, _ = make_blobs(n_samples=300, centers=3, random_state=0)
+
+
+def test_parallel_matches_serial():
+    serial = select_models(X, range(1, 5), workers=1)
+    parallel = select_models(X, range(1, 5), workers=2)
+    assert [c['k'] for c in parallel] == [1, 2, 3, 4]
+    for a, b in zip(serial, parallel):
+        assert a['inertia'] == b['inertia']
+        assert (a['labels'] == b['labels']).all()
+        assert (a['model'].predict(X) == a['labels']).all()
+
+
+def test_scores():
+    scores = scores_table(select_models(X, range(1, 6), workers=1))
+    assert math.isnan(scores['silhouette'][0])
+    assert scores['k'][scores['silhouette'].idxmax()] == 3
+    assert scores['k'][scores['davies_bouldin'].idxmin()] == 3
+
+    mini_batch = scores_table(select_models(X, [3], mini_batch=True, workers=1))
+    assert mini_batch['inertia'][0] < 1.05 * scores['inertia'][2]
+    assert mini_batch['silhouette'][0] > 0.9 * scores['silhouette'][2]
+
+
+def test_workers_do_not_import_the_interface():
+    # a worker process started with spawn runs src.__main__ again as
+    # __mp_main__, then imports the module of its task
+    code = ("import runpy, sys\n"
+            "runpy.run_module('src.__main__', run_name='__mp_main__')\n"
+            "import src.analysis.pit_stop_stats, src.learning.model_selection, "
+            "src.parsers.bulk_load\n"
+            "print(*[name for name in ('src.app', 'tkinter', 'customtkinter')\n"
+            "        if name in sys.modules])\n")
+    process = subprocess.run([sys.executable, '-c', code], capture_output=True,
+                             text=True, check=True)
+    assert process.stdout.strip() == ''
@@ -0,0 +1,60 @@
+import math
+from array import array
+
+import pytest
+from src.parsers.parse_columns import parse_columns
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "results.csv"
+    path.write_text(
+        'resultId,raceId,driverId,position,points,time,extra\n'
+        '1,18,1,1,10,"1:34:50.616",7\n'
+        '2,18,2,\\N,8,\\N,1.5\n',
+        encoding='utf-8'
+    )
+    return path
+
+
+def test_typed_columns_and_nulls(csv_file):
+    columns = parse_columns(str(csv_file))
+    assert columns['raceId'] == array('i', [18, 18])
+    assert columns['position'] == [1, None]
+    assert columns['points'] == array('d', [10.0, 8.0])
+    assert columns['time'] == ['1:34:50.616', None]
+    assert isinstance(columns['extra'], array) and columns['extra'].typecode == 'd'
+
+
+def test_projection_keeps_requested_order(csv_file):
+    columns = parse_columns(str(csv_file), columns=['points', 'driverId'])
+    assert list(columns) == ['points', 'driverId']
+    with pytest.raises(ValueError):
+        parse_columns(str(csv_file), columns=['unknown'])
+
+
+def test_float_nulls_are_nan(tmp_path):
+    path = tmp_path / "laps.csv"
+    path.write_text('lat\n1.5\n\\N\n', encoding='utf-8')
+    lat = parse_columns(str(path), schema={'lat': 'd'}, delimiter=',')['lat']
+    assert lat[0] == 1.5 and math.isnan(lat[1])
+
+
+def test_results_file_matches_row_count():
+    columns = parse_columns('./data/results.csv', columns=['driverId', 'grid'])
+    assert len(columns['driverId']) == len(columns['grid']) == 26519
+
+
+def test_dictionary_encoded_columns_share_codes(tmp_path):
+    path = tmp_path / "status.csv"
+    path.write_text('statusId,status\n1,"Finished"\n2,\\N\n3,"Finished"\n',
+                    encoding='utf-8')
+    status = parse_columns(str(path), schema={'statusId': 'i', 'status': 'c'})
+    column = status['status']
+    assert column == ['Finished', None, 'Finished']
+    assert column[0] == 'Finished' and column[1:] == [None, 'Finished']
+    assert column.codes[0] == column.codes[2] and column.codes[1] == -1
+
+    other = parse_columns(str(path), schema={'status': 'c'}, columns=['status'])
+    assert other['status'].codes == column.codes
+    assert column.table.lookup(['Finished', 'Unknown']) == {column.codes[0]}
@@ -0,0 +1,31 @@
+import pytest
+from src.analysis.pandas.pit_stop_outliers import (cleaned_pit_stops,
+                                                   cleaned_statistics,
+                                                   flag_outliers, robust_scores)
+from src.analysis.pandas.q8 import average_pit_stop_time
+
+
+def test_scores_are_per_race():
+    scores = robust_scores()
+    race_id = scores['raceId'].iloc[0]
+    race = scores[scores['raceId'] == race_id]
+    median = race['milliseconds'].median()
+    assert (race['race_median'] == median).all()
+    assert (race['race_mad'] == (race['milliseconds'] - median).abs().median()).all()
+
+    scores['robust_z'].to_numpy()[:] = 0
+    assert robust_scores()['robust_z'].abs().max() > 0
+
+
+def test_thresholds():
+    strict, loose = flag_outliers(2), flag_outliers(10)
+    assert loose.sum() < strict.sum() < len(strict)
+    assert not (loose & ~strict).any()
+    assert len(cleaned_pit_stops(2)) == len(strict) - strict.sum()
+    assert cleaned_statistics(10)['count'] > cleaned_statistics(2)['count']
+
+
+def test_q8_methods():
+    assert 'Mean' in average_pit_stop_time(False, 60, 'mad', 3.5)
+    with pytest.raises(ValueError):
+        average_pit_stop_time(False, 60, 'iqr')
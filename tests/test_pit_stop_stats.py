@@ -0,0 +1,77 @@
+import math
+import random
+import statistics
+
+from src.analysis.pandas.q8 import average_pit_stop_time
+from src.analysis.pit_stop_stats import (PitStopStats, QuantileSketch,
+                                         merge_partials, pit_stop_stats,
+                                         stream_pit_stop_stats)
+from src.parsers.data_store import store
+
+
+def test_merged_summaries_match_exact_statistics():
+    values = [random.Random(0).lognormvariate(10, 0.5) for _ in range(5000)]
+    left, right = PitStopStats(), PitStopStats()
+    for i, value in enumerate(values):
+        (left if i % 3 else right).add(value)
+    summary = left.merge(right).summary()
+
+    assert summary['count'] == len(values)
+    assert math.isclose(summary['mean'], statistics.mean(values))
+    assert math.isclose(summary['std'], statistics.stdev(values))
+    assert summary['min'] == min(values) and summary['max'] == max(values)
+    for name, q in [('p50', 0.5), ('p90', 0.9), ('p99', 0.99)]:
+        exact = sorted(values)[round(q * (len(values) - 1))]
+        assert abs(summary[name] - exact) <= 0.011 * exact
+
+
+def test_sketch_memory_is_bounded():
+    sketch = QuantileSketch(max_bins=64)
+    for value in range(1, 100000):
+        sketch.add(value)
+    assert len(sketch.bins) <= 64
+    assert abs(sketch.quantile(0.99) - 99000) <= 0.01 * 99000
+
+
+def test_quantiles_stay_within_the_values():
+    sketch = QuantileSketch()
+    for value in [29000, 29500, 30000]:
+        sketch.add(value)
+    assert sketch.quantile(0) >= 29000 and sketch.quantile(1) <= 30000
+
+    # every pit stop above the cutoff is excluded, so is every quantile
+    summary = pit_stop_stats(max_milliseconds=30000)['global'][None].summary()
+    assert summary['p99'] <= summary['max'] <= 30000
+
+
+def test_breakdowns():
+    stats = pit_stop_stats()
+    pit_stops = store.table('pit_stops')
+    assert stats['global'][None].stats.count == len(pit_stops)
+    assert sum(s.stats.count for s in stats['race'].values()) == len(pit_stops)
+    race_id = pit_stops['raceId'].iloc[0]
+    race = pit_stops[pit_stops['raceId'] == race_id]['milliseconds']
+    assert math.isclose(stats['race'][race_id].stats.mean, race.mean())
+    assert set(stats['season']) <= set(store.table('races')['year'])
+
+
+def test_chunks_merge_to_single_pass():
+    chunked = stream_pit_stop_stats(max_milliseconds=60000, workers=2,
+                                    chunk_size=50000)
+    single = stream_pit_stop_stats(max_milliseconds=60000)
+    for name in ('global', 'season', 'constructor'):
+        assert set(chunked[name]) == set(single[name])
+        for key, stats in single[name].items():
+            merged = chunked[name][key].summary()
+            for field, value in stats.summary().items():
+                assert (math.isclose(merged[field], value)
+                        or math.isnan(merged[field]) and math.isnan(value))
+    assert merge_partials([]) == {name: dict() for name in chunked}
+
+
+def test_answer_rounds_like_pandas():
+    # longest pit stop under 60 s: 59555 ms
+    lines = average_pit_stop_time.__wrapped__(False, 60).splitlines()
+    assert lines[5].split() == ['Max', '59.56', 's']
+    lines = average_pit_stop_time.__wrapped__(False, 10).splitlines()
+    assert lines[3].split() == ['Mean', 'nan', 's']
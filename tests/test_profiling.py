@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from src.tracing import profile_memory, stage, traced, tracing
+
+
+@traced
+def question(n):
+    with stage('filter', n=n):
+        values = [i for i in range(n) if i % 2]
+    with stage('format'):
+        return str(sum(values))
+
+
+def test_stage_without_recorder():
+    assert stage('format') is stage('filter')
+    assert question(10) == "25"
+
+
+def test_stages_are_measured_apart():
+    with profile_memory() as profile:
+        kept = [bytearray(1024) for _ in range(1000)]
+        with stage('format'):
+            text = "x" * 2 ** 20
+            del text
+    summary = profile.summary()
+    assert set(summary) == {'transform', 'format', 'total'}
+    assert summary['transform']['net'] >= 1000 * 1024
+    assert summary['format']['peak'] >= 2 ** 20
+    assert summary['format']['net'] < 2 ** 20
+    assert summary['total']['peak'] >= summary['format']['peak']
+    assert len(kept) == 1000
+
+    with profile_memory():
+        with pytest.raises(RuntimeError):
+            with profile_memory():
+                pass
+
+
+def test_trace(tmp_path):
+    with tracing() as trace:
+        question(10)
+        with stage('load', table='drivers'):
+            pass
+    root, load = trace.spans
+    assert root['name'].endswith('test_profiling.question')
+    assert [child['name'] for child in root['children']] == ['filter', 'format']
+    assert root['children'][0]['args'] == {'n': 10}
+    assert root['duration'] >= sum(child['duration'] for child in root['children'])
+    assert load['args'] == {'table': 'drivers'}
+    assert trace.totals()['filter']['count'] == 1
+
+    trace.write_chrome(tmp_path / "trace.json")
+    events = json.loads((tmp_path / "trace.json").read_text())['traceEvents']
+    assert [event['name'] for event in events][1:] == ['filter', 'format', 'load']
+    assert all(event['ph'] == 'X' for event in events)
+    trace.write_json(tmp_path / "spans.json")
+    spans = json.loads((tmp_path / "spans.json").read_text())['spans']
+    assert spans[1]['name'] == 'load'
+
+    with tracing():
+        with pytest.raises(RuntimeError):
+            with tracing():
+                pass
+
+
+def test_other_stages_count_in_the_enclosing_one():
+    with profile_memory() as profile:
+        question(100000)
+    assert set(profile.summary()) == {'transform', 'format', 'total'}
+
+
+def test_cprofile(tmp_path):
+    from src.analysis.profiling import profile_question
+    from src.analysis.questions import parse_arguments
+    from src.analysis.questions import question as registry_question
+
+    entry = registry_question('ranking')
+    arguments = parse_arguments(entry, ["2021"])
+    assert arguments == [2021]
+
+    report = profile_question(entry['vanilla'], arguments, top=5,
+                              output=str(tmp_path / "ranking"))
+    assert report['result'].startswith("Drivers' ranking")
+    assert 'ranking_nopd' in report['report']
+    assert report['files'] == [str(tmp_path / "ranking.pstats"),
+                               str(tmp_path / "ranking.collapsed")]
+
+    lines = (tmp_path / "ranking.collapsed").read_text().splitlines()
+    stacks = [line.rsplit(' ', 1) for line in lines]
+    assert all(stack.startswith('ranking_nopd (mandatory2.py') for stack, _ in stacks)
+    total = sum(int(value) for _, value in stacks) / 1e6
+    assert abs(total - report['stats'].total_tt) < 0.05 * report['stats'].total_tt
@@ -0,0 +1,75 @@
+import os
+
+from src.analysis import result_cache as result_cache_module
+from src.analysis.pandas.mandatory1 import at_least_n_races
+from src.analysis.result_cache import ResultCache, cached
+
+
+def test_lru_and_keys():
+    result_cache = ResultCache(maxsize=2)
+    calls = []
+
+    @cached(('status',), result_cache)
+    def question(n, label='x'):
+        calls.append(n)
+        return f"{label}{n}"
+
+    assert question(1) == question(1, 'x') == question(n=1) == 'x1'
+    assert calls == [1]
+    question(2)
+    question(3)
+    question(1)
+    assert calls == [1, 2, 3, 1]
+    assert result_cache.info()['hits'] == 2
+    assert question.__wrapped__(1) == 'x1'
+    assert question.tables == ('status',)
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    calls = []
+
+    def question(n):
+        calls.append(n)
+        return n * 2
+
+    first = ResultCache(disk_dir=str(tmp_path))
+    assert cached(('status',), first)(question)(21) == 42
+    second = ResultCache(disk_dir=str(tmp_path))
+    assert cached(('status',), second)(question)(21) == 42
+    assert calls == [21]
+    assert second.info()['disk_hits'] == 1
+
+    second.clear(disk=True)
+    assert not list(tmp_path.glob('*.pkl'))
+
+
+def test_disk_tier_is_not_served_to_new_code(tmp_path, monkeypatch):
+    calls = []
+
+    def question(n):
+        calls.append(n)
+        return n * 2
+
+    cached(('status',), ResultCache(disk_dir=str(tmp_path)))(question)(21)
+    monkeypatch.setattr(result_cache_module, 'code_version', lambda: 'changed')
+    assert cached(('status',), ResultCache(disk_dir=str(tmp_path)))(question)(21) == 42
+    assert calls == [21, 21]
+
+
+def test_disk_tier_is_bounded(tmp_path):
+    result_cache = ResultCache(maxsize=0, disk_dir=str(tmp_path), disk_maxsize=2)
+    result_cache.put('a', 1)
+    result_cache.put('b', 2)
+    for key, seconds in [('a', 1), ('b', 2)]:
+        os.utime(result_cache._disk_path(key), (seconds, seconds))
+
+    assert result_cache.get('a') == (True, 1)
+    result_cache.put('c', 3)
+    assert len(os.listdir(tmp_path)) == 2
+    assert result_cache.get('b') == (False, None)
+    assert result_cache.get('a') == (True, 1) and result_cache.get('c') == (True, 3)
+
+
+def test_questions_are_cached():
+    assert at_least_n_races(30) is at_least_n_races(30)
+    assert at_least_n_races.__wrapped__(30) == at_least_n_races(30)
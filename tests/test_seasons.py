@@ -0,0 +1,20 @@
+import pytest
+from src.analysis.seasons import season, season_index
+from src.parsers.data_store import store
+
+
+def test_season_index_matches_races():
+    races = store.table('races')
+    index = season_index()
+    assert set(index) == set(races['year'])
+
+    races_2023 = races[races['year'] == 2023]
+    entry = index[2023]
+    assert entry['final_race_id'] == (
+        races_2023.loc[races_2023['round'].idxmax(), 'raceId']
+    )
+
+
+def test_unknown_season():
+    with pytest.raises(ValueError):
+        season(1900)
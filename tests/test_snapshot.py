@@ -0,0 +1,50 @@
+import os
+
+import pandas as pd
+from src.parsers.snapshot import read_snapshot, snapshot_dir
+
+
+def write(path, text, mtime_ns=None):
+    path.write_text(text, encoding='utf-8')
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_matches_read_csv(tmp_path):
+    path = tmp_path / "drivers.csv"
+    write(path, 'driverId,name,number\n1,"Lewis",44\n2,,\\N\n')
+    expected = pd.read_csv(path)
+    pd.testing.assert_frame_equal(read_snapshot(str(path), tmp_path / "cache"),
+                                  expected)
+    pd.testing.assert_frame_equal(read_snapshot(str(path), tmp_path / "cache"),
+                                  expected)
+
+
+def test_numeric_columns_are_read_only_views(tmp_path):
+    path = tmp_path / "results.csv"
+    write(path, 'raceId,points\n1,10\n2,8\n')
+    df = read_snapshot(str(path), tmp_path / "cache")
+    assert not df['raceId'].to_numpy().flags.writeable
+
+
+def test_rebuilt_when_content_changes(tmp_path):
+    path = tmp_path / "results.csv"
+    cache = tmp_path / "cache"
+    write(path, 'raceId,points\n1,10\n', mtime_ns=10**18)
+    assert read_snapshot(str(path), cache)['points'].tolist() == [10]
+
+    # same size and modification time: only the hash can tell
+    write(path, 'raceId,points\n1,25\n', mtime_ns=10**18 + 1)
+    assert read_snapshot(str(path), cache)['points'].tolist() == [25]
+
+    write(path, 'raceId,points\n1,25\n2,18\n')
+    assert read_snapshot(str(path), cache)['points'].tolist() == [25, 18]
+
+
+def test_read_options_get_their_own_snapshot(tmp_path):
+    path = tmp_path / "results.csv"
+    write(path, 'raceId,points\n1,10\n')
+    cache = tmp_path / "cache"
+    assert snapshot_dir(str(path), cache) != snapshot_dir(str(path), cache,
+                                                          usecols=['raceId'])
+    assert list(read_snapshot(str(path), cache, usecols=['raceId'])) == ['raceId']
@@ -0,0 +1,23 @@
+from src.analysis.pandas.statuses import results_with_status
+from src.analysis.statuses import (ACCIDENT, CLASSIFIED, DNF, FINISHED, LAPPED,
+                                   NON_START, TECHNICAL, classify, result_classes)
+
+
+def test_classify():
+    assert classify('Finished') == FINISHED
+    assert classify('+1 Lap') == classify('+42 Laps') == LAPPED
+    assert classify('Did not qualify') == NON_START
+    assert classify('Collision') == DNF | ACCIDENT
+    assert classify('Engine') == DNF | TECHNICAL
+    assert classify('Disqualified') == DNF
+    assert not classify('+3 Laps') & (DNF | NON_START)
+
+
+def test_results_classes_agree():
+    results = results_with_status()
+    assert list(results['status_class']) == list(result_classes())
+    assert ((results['status_class'] & CLASSIFIED) != 0).sum() > 0
+    results['extra'] = 1
+    assert 'extra' not in results_with_status()
+    results['status_class'].to_numpy()[:] = 0
+    assert list(results_with_status()['status_class']) == list(result_classes())
@@ -0,0 +1,77 @@
+import csv
+import os
+
+import pytest
+
+from benchmarks.synthetic_data import GENERATED_TABLES, HEADERS, generate
+
+
+@pytest.fixture(scope='module')
+def synthetic(tmp_path_factory):
+    root = tmp_path_factory.mktemp("synthetic")
+    generate(str(root / "a"), scale=1, seed=3)
+    generate(str(root / "b"), scale=1, seed=3,
+             tables=[name for name in GENERATED_TABLES if name != 'lap_times'])
+    return root
+
+
+def read(folder, name):
+    with open(folder / f"{name}.csv", newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def test_same_columns_as_the_real_data(synthetic):
+    for name, header in HEADERS.items():
+        with open(synthetic / "a" / f"{name}.csv", encoding='utf-8') as f:
+            assert f.readline().strip().split(',') == header
+        if os.path.exists(f"./data/{name}.csv"):
+            with open(f"./data/{name}.csv", encoding='utf-8') as f:
+                assert f.readline().strip().split(',') == header
+
+
+def test_foreign_keys(synthetic):
+    folder = synthetic / "a"
+    drivers = {row['driverId'] for row in read(folder, 'drivers')}
+    constructors = {row['constructorId'] for row in read(folder, 'constructors')}
+    circuits = {row['circuitId'] for row in read(folder, 'circuits')}
+    statuses = {row['statusId'] for row in read(folder, 'status')}
+    races = read(folder, 'races')
+    race_ids = {race['raceId'] for race in races}
+    assert {race['circuitId'] for race in races} <= circuits
+    assert ({race['year'] for race in races}
+            == {season['year'] for season in read(folder, 'seasons')})
+
+    results = read(folder, 'results')
+    assert len({result['resultId'] for result in results}) == len(results)
+    assert {result['raceId'] for result in results} == race_ids
+    assert {result['driverId'] for result in results} <= drivers
+    assert {result['constructorId'] for result in results} <= constructors
+    assert {result['statusId'] for result in results} <= statuses
+    entries = {(result['raceId'], result['driverId']) for result in results}
+    for name in ('pit_stops', 'qualifying', 'lap_times', 'driver_standings'):
+        rows = read(folder, name)
+        assert {(row['raceId'], row['driverId']) for row in rows} <= entries
+
+
+def test_standings_add_up_the_points(synthetic):
+    folder = synthetic / "a"
+    final_race = read(folder, 'races')[-1]['raceId']
+    year = read(folder, 'races')[-1]['year']
+    season = {race['raceId'] for race in read(folder, 'races') if race['year'] == year}
+    points = dict()
+    for result in read(folder, 'results'):
+        if result['raceId'] in season:
+            points[result['driverId']] = (points.get(result['driverId'], 0)
+                                          + int(result['points']))
+    standings = [row for row in read(folder, 'driver_standings')
+                 if row['raceId'] == final_race]
+    assert {row['driverId']: int(row['points']) for row in standings} == points
+    assert [int(row['points']) for row in standings] == sorted(points.values(),
+                                                               reverse=True)
+
+
+def test_same_seed_same_files(synthetic):
+    assert not (synthetic / "b" / "lap_times.csv").exists()
+    for name in set(HEADERS) - {'lap_times'}:
+        assert ((synthetic / "a" / f"{name}.csv").read_bytes()
+                == (synthetic / "b" / f"{name}.csv").read_bytes())